@@ -0,0 +1,17 @@
+"""Screen Capture Defender 광고 서버 내부 모듈."""
+
+from adserver.snapshot import (
+    AdItem,
+    Banner,
+    ConfigSnapshot,
+    SnapshotHolder,
+    build_snapshot,
+)
+
+__all__ = [
+    "AdItem",
+    "Banner",
+    "ConfigSnapshot",
+    "SnapshotHolder",
+    "build_snapshot",
+]
@@ -0,0 +1,59 @@
+"""/admin 페이지 렌더링.
+
+템플릿은 import 시 한 번 컴파일하고, CSS/JS 는 내용 해시가 붙은 URL 로
+오래 캐시되는 정적 자산으로 분리합니다.
+"""
+
+import os
+
+from jinja2 import Environment, FileSystemLoader
+
+from adserver.responses import EncodedPayload
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(PACKAGE_DIR, "templates")
+STATIC_DIR = os.path.join(PACKAGE_DIR, "static")
+
+ASSET_MIMETYPES = {".css": "text/css", ".js": "text/javascript"}
+
+BANNER_LABELS = {"top": "상단 배너", "bottom": "하단 배너"}
+
+
+def _load_assets():
+    assets = {}
+    for name in sorted(os.listdir(STATIC_DIR)):
+        mimetype = ASSET_MIMETYPES.get(os.path.splitext(name)[1])
+        if mimetype is None:
+            continue
+        with open(os.path.join(STATIC_DIR, name), "rb") as fp:
+            assets[name] = EncodedPayload(fp.read(), mimetype)
+    return assets
+
+
+ASSETS = _load_assets()
+
+
+def asset_url(name):
+    """내용 해시를 쿼리로 붙여 배포마다 캐시가 갱신되는 자산 URL."""
+    return f"/admin/static/{name}?v={ASSETS[name].etag[:12]}"
+
+
+_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=True)
+_env.globals["asset_url"] = asset_url
+TEMPLATE = _env.get_template("admin.html")
+
+
+def render_admin(snapshot, clicks, stats=()):
+    """스냅샷과 클릭 집계로 관리 페이지 HTML 바이트를 만듭니다.
+
+    ``stats`` 는 리포트 저장소의 소재별 집계 행 (노출/클릭/CTR 표시용).
+    """
+    config = snapshot.as_dict(clicks)
+    by_item = {row["item"]: row for row in stats}
+    banners = []
+    for banner in snapshot.banners.values():
+        data = dict(config[banner.key], label=BANNER_LABELS.get(banner.position, banner.position))
+        for item, item_data in zip(banner.items, data["items"]):
+            item_data["stats"] = by_item.get(item.id)
+        banners.append(data)
+    return TEMPLATE.render(banners=banners).encode()
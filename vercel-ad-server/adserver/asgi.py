@@ -0,0 +1,313 @@
+"""ASGI 서빙 경로.
+
+Flask 앱(api/index.py)과 같은 라우트를 의존성 없는 ASGI 앱으로
+제공합니다. 설정 스냅샷, 리다이렉트 테이블, 카운터, 메트릭, 응답
+캐시는 adserver.runtime 에서 WSGI 앱과 공유합니다.
+
+    uvicorn adserver.asgi:app
+"""
+
+import asyncio
+import contextlib
+import time
+from urllib.parse import parse_qsl
+
+from adserver.admin import ASSETS
+from adserver.editing import MAX_BODY as ADMIN_BODY_LIMIT
+from adserver.events import BodyTooLarge
+from adserver.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from adserver.responses import dump_json
+from adserver.runtime import (
+    AD_CONFIG_HEADERS,
+    AD_SELECT_HEADERS,
+    ADMIN_API_HEADERS,
+    ADMIN_HEADERS,
+    ASSET_HEADERS,
+    EVENTS_HEADERS,
+    FEED_HEADERS,
+    HOME,
+    METRICS_ENABLED,
+    REPORT_HEADERS,
+    STREAM_HEADERS,
+    admin_api,
+    asset_response,
+    admin_payload_key,
+    admin_payloads,
+    counters,
+    config_payload,
+    event_batch,
+    experiment_results,
+    feed_since_async,
+    feed_stream_async,
+    filter_request,
+    finish_event_batch,
+    legacy_click,
+    metrics,
+    pacing,
+    report,
+    reports,
+    resolve_rotation,
+    serve_ad,
+    signed_click,
+    snapshots,
+    targeting_context,
+    tenant_payload,
+)
+from adserver.snapshot import DEFAULT_TENANT
+
+JSON = "application/json"
+TEXT_HTML = "text/html; charset=utf-8"
+
+HOME_BODY = dump_json(HOME)
+UNKNOWN_POSITION_BODY = dump_json({"error": "unknown position"})
+UNKNOWN_TENANT_BODY = dump_json({"error": "unknown tenant"})
+UNSUPPORTED_BODY = dump_json({"error": "unsupported content type"})
+TOO_LARGE_BODY = dump_json({"error": "batch too large"})
+DISCONNECTED_BODY = dump_json({"error": "client disconnected"})
+NOT_FOUND_BODY = b"Not found"
+
+# 응답 전에 클라이언트가 끊은 요청 (메트릭 상태 코드)
+CLIENT_CLOSED = 499
+
+
+def _header(scope, name):
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _query(scope):
+    return dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+
+
+def _payload(payload, scope, extra):
+    status, body, headers = payload.negotiate(
+        _header(scope, b"if-none-match"), _header(scope, b"accept-encoding"),
+    )
+    return status, body, headers + list(extra.items())
+
+
+def route(scope):
+    """경로를 (endpoint, status, body, headers) 로 해석합니다."""
+    path = scope["path"]
+    if path == "/":
+        return "home", 200, HOME_BODY, [("Content-Type", JSON)]
+    if path in ("/api/ad-config", "/api/ad-config.json"):
+        payload = config_payload(_query(scope).get("client"))
+        return ("ad_config",) + _payload(payload, scope, AD_CONFIG_HEADERS)
+    if path == "/admin":
+        return ("admin_page",) + _payload(admin_payloads.get(admin_payload_key()), scope, ADMIN_HEADERS)
+    if path == "/api/reports":
+        status, result = report(_query(scope))
+        return "reports_query", status, dump_json(result), [("Content-Type", JSON)] + list(REPORT_HEADERS.items())
+    if path == "/api/experiments":
+        body = dump_json(experiment_results())
+        return "experiments", 200, body, [("Content-Type", JSON)] + list(REPORT_HEADERS.items())
+    if path == "/metrics" and METRICS_ENABLED:
+        return "metrics", 200, metrics.render().encode(), [("Content-Type", METRICS_CONTENT_TYPE)]
+
+    parts = path.split("/")
+    if len(parts) == 5 and parts[1] == "api" and parts[2] == "tenants" and parts[4] == "ad-config":
+        payload = tenant_payload(parts[3], _query(scope).get("client"))
+        if payload is None:
+            return "tenant_ad_config", 404, UNKNOWN_TENANT_BODY, [("Content-Type", JSON)]
+        return ("tenant_ad_config",) + _payload(payload, scope, AD_CONFIG_HEADERS)
+    if len(parts) == 4 and parts[1] == "api" and parts[2] == "ad" and parts[3]:
+        args = _query(scope)
+        rotation = resolve_rotation(
+            parts[3], args.get("tenant"), args.get("locale"), args.get("platform"),
+            _header(scope, b"accept-language"),
+        )
+        if rotation is None:
+            return "ad_select", 404, UNKNOWN_POSITION_BODY, [("Content-Type", JSON)]
+        context = None
+        if rotation.matcher:
+            context = targeting_context(args, lambda name: _header(scope, name.lower().encode("latin-1")))
+        body = serve_ad(rotation, time.time(), context, args.get("user"), args.get("client"))
+        return "ad_select", 200, body, [("Content-Type", JSON)] + list(AD_SELECT_HEADERS.items())
+    # index 는 Flask 의 <int:> 처럼 ASCII 숫자만 ("²" 같은 유니코드 숫자는 404)
+    if (parts[1] == "click" and len(parts) in (4, 5) and all(parts[2:-1])
+            and parts[-1].isascii() and parts[-1].isdigit()):
+        tenant = parts[2] if len(parts) == 5 else DEFAULT_TENANT
+        target = legacy_click(snapshots.current().redirects.lookup(parts[-2], int(parts[-1]), tenant))
+        return "ad_click", target.status, target.body, list(target.headers)
+    if len(parts) == 3 and parts[1] == "c" and parts[2]:
+        target = signed_click(parts[2])
+        return "ad_signed_click", target.status, target.body, list(target.headers)
+    if len(parts) == 3 and parts[1] == "asset" and parts[2]:
+        result = asset_response(parts[2], _header(scope, b"if-none-match"), _header(scope, b"range"))
+        if result is not None:
+            return ("asset",) + result
+    if len(parts) == 4 and parts[1] == "admin" and parts[2] == "static":
+        payload = ASSETS.get(parts[3])
+        if payload is not None:
+            return ("admin_asset",) + _payload(payload, scope, ASSET_HEADERS)
+    return None, 404, NOT_FOUND_BODY, [("Content-Type", TEXT_HTML)]
+
+
+async def post_events(scope, receive):
+    """POST /api/events: 본문 청크가 도착하는 대로 디코딩/합산합니다."""
+    batch = event_batch(_header(scope, b"content-type"))
+    if batch is None:
+        return "post_events", 415, UNSUPPORTED_BODY, [("Content-Type", JSON)]
+    try:
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return "post_events", 400, DISCONNECTED_BODY, [("Content-Type", JSON)]
+            batch.feed(message.get("body", b""))
+            more = message.get("more_body", False)
+    except BodyTooLarge:
+        return "post_events", 413, TOO_LARGE_BODY, [("Content-Type", JSON)]
+    status, result = finish_event_batch(batch)
+    return "post_events", status, dump_json(result), [("Content-Type", JSON)] + list(EVENTS_HEADERS.items())
+
+
+async def admin_write_api(scope, receive):
+    """/api/admin/<action>: 본문을 다 읽은 뒤 인증/검증/커밋 (이미지 확인은 이벤트 루프에서)."""
+    chunks, size, more = [], 0, scope["method"] == "POST"
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return "admin_write_api", 400, DISCONNECTED_BODY, [("Content-Type", JSON)]
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > ADMIN_BODY_LIMIT:
+            return "admin_write_api", 413, TOO_LARGE_BODY, [("Content-Type", JSON)]
+        chunks.append(chunk)
+        more = message.get("more_body", False)
+    status, result, headers = await admin_api(
+        scope["method"], scope["path"][len("/api/admin/"):], _header(scope, b"authorization"), b"".join(chunks),
+    )
+    headers = {**ADMIN_API_HEADERS, **headers}
+    return "admin_write_api", status, dump_json(result), [("Content-Type", JSON)] + list(headers.items())
+
+
+def _filter_route(scope):
+    """봇/남용 필터 이름 (클릭/이벤트 경로), 아니면 None."""
+    path = scope["path"]
+    if path.startswith(("/click/", "/c/")):
+        return "click"
+    if path == "/api/events" and scope["method"] == "POST":
+        return "events"
+    return None
+
+
+def _rejected(scope):
+    route = _filter_route(scope)
+    if route is None:
+        return None
+    client = scope.get("client")
+    target = filter_request(
+        route, _header(scope, b"x-forwarded-for"), _header(scope, b"x-real-ip"),
+        client[0] if client else None, _header(scope, b"user-agent"),
+    )
+    if target is None:
+        return None
+    return "filtered", target.status, target.body, list(target.headers)
+
+
+async def _until_disconnect(receive):
+    """요청 본문을 다 받은 뒤 http.disconnect 가 올 때까지 기다립니다."""
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _cancel(task):
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+async def ad_config_feed(scope, receive):
+    """GET /api/ad-config?since=: long-poll 은 스레드 없이 기다리고, 클라이언트가 끊으면 그만둡니다."""
+    args = _query(scope)
+    if "since" not in args:
+        return None
+    task = asyncio.ensure_future(feed_since_async(args))
+    watcher = asyncio.ensure_future(_until_disconnect(receive))
+    await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    await _cancel(watcher)
+    if not task.done():
+        await _cancel(task)
+        return "ad_config", CLIENT_CLOSED, b"", []
+    status, body = task.result()
+    return "ad_config", status, body, [("Content-Type", JSON)] + list(FEED_HEADERS.items())
+
+
+async def ad_config_stream(scope, receive, send):
+    """GET /api/ad-config/stream: 교체 신호를 기다리며 SSE 로 보내고, 클라이언트가 끊으면 닫습니다."""
+    args = _query(scope)
+    since = _header(scope, b"last-event-id") or args.get("since")
+    events = feed_stream_async(since or None)
+    headers = [("Content-Type", "text/event-stream")] + list(STREAM_HEADERS.items())
+    await send({
+        "type": "http.response.start", "status": 200,
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    })
+    watcher = asyncio.ensure_future(_until_disconnect(receive))
+    try:
+        while True:
+            chunk = asyncio.ensure_future(events.__anext__())
+            await asyncio.wait({chunk, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not chunk.done():
+                await _cancel(chunk)
+                return
+            try:
+                body = chunk.result()
+            except StopAsyncIteration:
+                break
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        await _cancel(watcher)
+        await events.aclose()
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            counters.flush()
+            pacing.sync()
+            reports.flush()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI 3 진입점."""
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    started = time.perf_counter()
+    if scope["method"] == "GET" and scope["path"] == "/api/ad-config/stream":
+        return await ad_config_stream(scope, receive, send)
+    # 클릭/이벤트 경로는 본문을 읽기 전에 봇/남용 필터부터
+    result = _rejected(scope)
+    if result is None:
+        if scope["method"] == "POST" and scope["path"] == "/api/events":
+            result = await post_events(scope, receive)
+        elif scope["method"] in ("GET", "POST") and scope["path"].startswith("/api/admin/"):
+            result = await admin_write_api(scope, receive)
+        elif scope["method"] not in ("GET", "HEAD"):
+            result = None, 405, b"Method Not Allowed", [("Content-Type", TEXT_HTML)]
+        elif scope["path"] in ("/api/ad-config", "/api/ad-config.json"):
+            result = await ad_config_feed(scope, receive)
+        elif scope["path"].startswith("/asset/"):
+            # 캐시에서 밀려난 이미지는 다시 받아야 하므로 스레드 풀에서
+            result = await asyncio.get_running_loop().run_in_executor(None, route, scope)
+    endpoint, status, body, headers = result or route(scope)
+
+    raw_headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+    raw_headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+    if METRICS_ENABLED:
+        metrics.observe(endpoint or "unmatched", status, time.perf_counter() - started)
@@ -0,0 +1,251 @@
+"""배너 이미지 프록시와 내용 주소(content-addressed) 캐시.
+
+설정 스냅샷이 바뀔 때마다 모든 image_url 을 백그라운드에서 한 번씩
+받아 내용 해시로 저장하고, /api/ad-config 의 image_url 을
+``/asset/<hash>`` 로 바꿔 내보냅니다. 해시가 곧 내용이므로 응답은
+immutable 로 오래 캐시할 수 있습니다. 아직 받지 못했거나 받기에 실패한
+URL 은 원래 주소를 그대로 씁니다.
+
+fetcher 는 ``fetch(url) -> (body, content_type)`` 인 아무 호출 가능
+객체로 바꿔 끼울 수 있습니다 (기본: urllib, 로컬 HTTP 서버로 시험 가능).
+
+전처리 파이프라인(adserver.imaging)을 붙이면 받은 원본마다 크기/형식
+변형을 만들어 항목에 width/height/placeholder/variants 를 더합니다.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("adserver")
+
+# 소재 하나의 최대 크기
+MAX_ASSET_BYTES = 10 * 1024 * 1024
+
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class AssetError(Exception):
+    """이미지를 받을 수 없거나 이미지가 아닐 때."""
+
+
+class UrlFetcher:
+    """urllib 로 이미지를 받는 기본 fetcher."""
+
+    def __init__(self, timeout=5.0, max_bytes=MAX_ASSET_BYTES):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+
+    def __call__(self, url):
+        request = urllib.request.Request(url, headers={"User-Agent": "screen-capture-defender-ad-server"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = response.read(self.max_bytes + 1)
+            content_type = response.headers.get_content_type()
+        if len(body) > self.max_bytes:
+            raise AssetError(f"asset too large: {url}")
+        return body, content_type
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 내용 주소 LRU 캐시
+# ═══════════════════════════════════════════════════════════════════════
+
+class AssetCache:
+    """해시 → (본문, MIME) LRU. ``directory`` 가 있으면 본문을 파일로 둡니다.
+
+    전체 크기가 ``max_bytes`` 를 넘으면 가장 오래 안 쓴 항목부터 지웁니다.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.size = 0
+        self._entries = OrderedDict()  # hash → (size, mimetype, body 또는 None)
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __contains__(self, digest):
+        return digest in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, body, mimetype):
+        """본문을 저장하고 내용 해시를 돌려줍니다."""
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                return digest
+            if self.directory:
+                path = self._path(digest)
+                with open(path + ".tmp", "wb") as fp:
+                    fp.write(body)
+                os.replace(path + ".tmp", path)
+                self._entries[digest] = (len(body), mimetype, None)
+            else:
+                self._entries[digest] = (len(body), mimetype, body)
+            self.size += len(body)
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                self._evict()
+        return digest
+
+    def get(self, digest):
+        """(본문, MIME) 또는 None."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            self._entries.move_to_end(digest)
+        size, mimetype, body = entry
+        if body is None:
+            try:
+                with open(self._path(digest), "rb") as fp:
+                    body = fp.read()
+            except FileNotFoundError:
+                return None
+        return body, mimetype
+
+    def _evict(self):
+        digest, (size, _, body) = self._entries.popitem(last=False)
+        self.size -= size
+        if body is None:
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 프록시
+# ═══════════════════════════════════════════════════════════════════════
+
+class AssetProxy:
+    """image_url → 내용 해시 매핑을 유지하고 /asset/<hash> 응답을 만듭니다."""
+
+    def __init__(self, cache, fetcher=None, workers=4, pipeline=None):
+        self.cache = cache
+        self.fetcher = fetcher or UrlFetcher()
+        self.pipeline = pipeline
+        if pipeline is not None:
+            pipeline.on_done = self._processed
+        self.version = 0
+        self._urls = {}     # url → hash
+        self._sources = {}  # hash → url (LRU 에서 지워졌을 때 다시 받기용)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ad-asset")
+
+    def prefetch(self, snapshot):
+        """스냅샷의 모든 image_url 중 아직 없는 것을 백그라운드로 받습니다 (구독 리스너)."""
+        urls = {item.image_url for item in snapshot.items.values()}
+        futures = []
+        for url in urls:
+            if not url.startswith(("http://", "https://")):
+                continue
+            with self._lock:
+                if url in self._urls or url in self._pending:
+                    continue
+                self._pending.add(url)
+            futures.append(self._executor.submit(self._fetch, url))
+        return futures
+
+    def _fetch(self, url):
+        try:
+            body, mimetype = self.fetcher(url)
+            if not mimetype.startswith("image/"):
+                raise AssetError(f"not an image ({mimetype}): {url}")
+            digest = self.cache.put(body, mimetype)
+        except Exception as exc:
+            logger.warning("asset fetch failed for %s: %s", url, exc)
+            with self._lock:
+                self._pending.discard(url)
+            return None
+        with self._lock:
+            self._pending.discard(url)
+            if self._urls.get(url) != digest:
+                self._urls[url] = digest
+                self._sources[digest] = url
+                self.version += 1
+        if self.pipeline is not None:
+            self.pipeline.submit(digest, body)
+        return digest
+
+    def _processed(self, digest, info):
+        with self._lock:
+            self.version += 1
+
+    def url_for(self, url):
+        """받아 둔 이미지면 /asset/<hash>, 아니면 원래 URL."""
+        digest = self._urls.get(url)
+        return f"/asset/{digest}" if digest is not None else url
+
+    def rewrite(self, config):
+        """as_dict()/tenant_dict() 결과의 image_url 을 프록시 주소로 바꿉니다 (제자리 수정)."""
+        blocks = config["placements"].values() if "placements" in config else config.values()
+        results = self.pipeline.results if self.pipeline is not None else {}
+        for block in blocks:
+            for item in block.get("items", ()):
+                digest = self._urls.get(item["image_url"])
+                if digest is None:
+                    continue
+                item["image_url"] = f"/asset/{digest}"
+                info = results.get(digest)
+                if info:
+                    item.update(info)
+        return config
+
+    def get(self, digest):
+        """(본문, MIME) 또는 None.
+
+        LRU 에서 지워진 원본은 다시 받고, 지워진 변형은 백그라운드로 다시 만듭니다.
+        """
+        entry = self.cache.get(digest)
+        if entry is None:
+            url = self._sources.get(digest)
+            if url is not None and self._fetch(url) == digest:
+                entry = self.cache.get(digest)
+            elif self.pipeline is not None and digest in self.pipeline.sources:
+                source = self.pipeline.sources[digest]
+                original = self.cache.get(source)
+                self.pipeline.forget(source)
+                if original is not None:
+                    self.pipeline.submit(source, original[0])
+        return entry
+
+
+def serve_asset(body, mimetype, digest, if_none_match=None, range_header=None):
+    """프레임워크와 무관한 (status, body, headers). 단일 바이트 범위를 지원합니다."""
+    headers = [
+        ("ETag", f'"{digest}"'),
+        ("Cache-Control", ASSET_CACHE_CONTROL),
+        ("Accept-Ranges", "bytes"),
+    ]
+    if if_none_match and (if_none_match.strip() == "*" or digest in if_none_match):
+        return 304, b"", headers
+    headers.append(("Content-Type", mimetype))
+    size = len(body)
+    if range_header and range_header.startswith("bytes=") and "," not in range_header:
+        first, _, last = range_header[6:].strip().partition("-")
+        try:
+            if first:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+            else:
+                start, end = max(0, size - int(last)), size - 1
+        except ValueError:
+            return 200, body, headers
+        if start > end or start >= size:
+            headers.append(("Content-Range", f"bytes */{size}"))
+            return 416, b"", headers
+        headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+        return 206, body[start:end + 1], headers
+    return 200, body, headers
@@ -0,0 +1,210 @@
+"""서명된 클릭 토큰.
+
+/api/ad/<position> 응답의 tracking_url 을 ``/c/<token>`` 으로 내보냅니다.
+토큰에는 키 id, 설정 내용 버전(snapshot.version) 앞 4바이트, 발급 시각,
+난수(nonce), 게재 위치, 소재 index/id, (A/B 실험이면) 실험 id 와 arm 이
+들어 있고 HMAC-SHA256(앞 12바이트)으로 서명합니다.
+
+검증은 싼 검사부터 합니다: 길이/형식 → 키 id → 발급 시각 범위 →
+HMAC → 재사용(replay). 위조/만료 토큰은 카운터나 리다이렉트 테이블을
+건드리기 전에 거절됩니다. 키마다 HMAC 의 내부/외부 패드를 미리 해시한
+상태(key schedule)를 들고 있다가 복사해서 쓰므로 요청마다 키를 다시
+준비하지 않습니다.
+
+클릭은 토큰의 버전으로 보관 중인 리다이렉트 테이블을 찾아, 클라이언트가
+실제로 받은 소재로 보냅니다. 버전은 설정 내용의 해시라 프로세스마다 다른
+세대 번호와 달리 어느 인스턴스가 발급한 토큰이든 같은 테이블을 가리킵니다.
+재사용된 토큰은 리다이렉트만 하고 세지 않습니다. 재사용 기록은 프로세스
+단위입니다.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import random
+import struct
+import threading
+from collections import OrderedDict
+
+from adserver.redirects import NOT_FOUND
+
+TOKEN_VERSION = 1
+MAC_BYTES = 12
+
+# version, key id, config version tag, issued, nonce, item index
+_HEADER = struct.Struct("<BBIIIH")
+
+# 검증 결과 (메트릭 라벨로도 씀)
+OK = "ok"
+REPLAY = "replay"
+MALFORMED = "malformed"
+UNKNOWN_KEY = "unknown_key"
+EXPIRED = "expired"
+FORGED = "forged"
+
+
+def version_tag(version):
+    """snapshot.version(16진수 해시)의 앞 4바이트 → 토큰 헤더에 넣는 uint32."""
+    return int(version[:8], 16)
+
+
+class KeySchedule:
+    """비밀 키 하나의 HMAC-SHA256 내부/외부 패드 해시 상태."""
+
+    __slots__ = ("key_id", "_inner", "_outer")
+
+    def __init__(self, secret):
+        if isinstance(secret, str):
+            secret = secret.encode()
+        key = secret if len(secret) <= 64 else hashlib.sha256(secret).digest()
+        key = key.ljust(64, b"\0")
+        self._inner = hashlib.sha256(bytes(b ^ 0x36 for b in key))
+        self._outer = hashlib.sha256(bytes(b ^ 0x5C for b in key))
+        self.key_id = hashlib.blake2b(secret, digest_size=1).digest()[0]
+
+    def sign(self, message):
+        inner = self._inner.copy()
+        inner.update(message)
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()[:MAC_BYTES]
+
+
+class ClickClaims:
+    """검증된 토큰 내용."""
+
+    __slots__ = ("revision", "issued", "tenant", "position", "index", "item_id", "experiment", "arm")
+
+    def __init__(self, revision, issued, tenant, position, index, item_id, experiment=None, arm=None):
+        self.revision = revision
+        self.issued = issued
+        self.tenant = tenant
+        self.position = position
+        self.index = index
+        self.item_id = item_id
+        self.experiment = experiment
+        self.arm = arm
+
+
+class ClickSigner:
+    """클릭 토큰 발급/검증과 버전별 리다이렉트 테이블 이력.
+
+    ``secrets`` 의 첫 키로 서명하고 모든 키로 검증합니다 (키 교체용).
+    """
+
+    def __init__(self, secrets, ttl=86400, skew=300, replay_size=100000, history=16):
+        self.schedules = [KeySchedule(secret) for secret in secrets]
+        self._by_id = {}
+        for schedule in self.schedules:
+            self._by_id.setdefault(schedule.key_id, []).append(schedule)
+        self.ttl = ttl
+        self.skew = skew
+        self.replay_size = replay_size
+        self.history = history
+        self._seen = OrderedDict()  # mac → 만료 시각
+        self._tables = OrderedDict()  # version_tag(snapshot.version) → RedirectTable
+        self._lock = threading.Lock()
+        self._nonce = random.SystemRandom().getrandbits
+
+    @classmethod
+    def from_env(cls):
+        """AD_CLICK_SECRET(쉼표로 여러 개, 첫 키로 서명)이 없으면 None."""
+        secrets = [s.strip() for s in os.environ.get("AD_CLICK_SECRET", "").split(",") if s.strip()]
+        if not secrets:
+            return None
+        return cls(
+            secrets,
+            ttl=int(os.environ.get("AD_CLICK_TTL", "86400")),
+            replay_size=int(os.environ.get("AD_CLICK_REPLAY_SIZE", "100000")),
+            history=int(os.environ.get("AD_CLICK_HISTORY", "16")),
+        )
+
+    # ── 발급 ──────────────────────────────────────────────────────────
+
+    def issue(self, tenant, position, item, version, now, arm=None):
+        """소재 하나의 클릭 토큰 (base64url, 패딩 없음).
+
+        version 은 소재를 고른 스냅샷의 ``version``, arm 은 (실험 id, arm 이름).
+        """
+        schedule = self.schedules[0]
+        fields = f"{tenant}\0{position}\0{item.id}"
+        if arm is not None:
+            fields += f"\0{arm[0]}\0{arm[1]}"
+        message = _HEADER.pack(
+            TOKEN_VERSION, schedule.key_id, version_tag(version), int(now), self._nonce(32), item.index,
+        ) + fields.encode()
+        token = message + schedule.sign(message)
+        return base64.urlsafe_b64encode(token).rstrip(b"=").decode()
+
+    def url(self, banner, item, version, now, arm=None):
+        return "/c/" + self.issue(banner.tenant, banner.position, item, version, now, arm)
+
+    # ── 검증 ──────────────────────────────────────────────────────────
+
+    def verify(self, token, now):
+        """(결과, ClickClaims 또는 None). 결과가 OK/REPLAY 일 때만 claims 가 있습니다."""
+        if not 20 <= len(token) <= 512:
+            return MALFORMED, None
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (binascii.Error, ValueError):
+            return MALFORMED, None
+        if len(raw) < _HEADER.size + MAC_BYTES + 4:
+            return MALFORMED, None
+        message, mac = raw[:-MAC_BYTES], raw[-MAC_BYTES:]
+        version, key_id, revision, issued, _, index = _HEADER.unpack_from(message)
+        if version != TOKEN_VERSION:
+            return MALFORMED, None
+        schedules = self._by_id.get(key_id)
+        if schedules is None:
+            return UNKNOWN_KEY, None
+        if not now - self.ttl <= issued <= now + self.skew:
+            return EXPIRED, None
+        if not any(hmac.compare_digest(schedule.sign(message), mac) for schedule in schedules):
+            return FORGED, None
+        try:
+            fields = message[_HEADER.size:].decode().split("\0")
+        except UnicodeDecodeError:
+            return MALFORMED, None
+        if len(fields) not in (3, 5):
+            return MALFORMED, None
+        tenant, position, item_id = fields[:3]
+        experiment, arm = fields[3:] if len(fields) == 5 else (None, None)
+        claims = ClickClaims(revision, issued, tenant, position, index, item_id, experiment, arm)
+        return (REPLAY if self._replayed(mac, issued + self.ttl, now) else OK), claims
+
+    def _replayed(self, mac, expires, now):
+        with self._lock:
+            seen = self._seen
+            if mac in seen:
+                return True
+            seen[mac] = expires
+            while seen and (len(seen) > self.replay_size or next(iter(seen.values())) < now):
+                seen.popitem(last=False)
+        return False
+
+    # ── 버전별 리다이렉트 ─────────────────────────────────────────────
+
+    def remember(self, snapshot):
+        """스냅샷의 리다이렉트 테이블을 내용 버전별로 보관합니다 (구독 리스너)."""
+        tag = version_tag(snapshot.version)
+        with self._lock:
+            # 같은 내용으로 되돌아온 설정은 최근 것으로 옮김
+            self._tables.pop(tag, None)
+            self._tables[tag] = snapshot.redirects
+            while len(self._tables) > self.history:
+                self._tables.popitem(last=False)
+
+    def resolve(self, claims, current):
+        """토큰이 가리키는 소재의 준비된 리다이렉트 응답.
+
+        토큰 버전이 이력에서 밀려났으면 현재 스냅샷에서 같은 자리의 같은
+        소재를 찾고, 없으면 NOT_FOUND.
+        """
+        table = self._tables.get(claims.revision) or current.redirects
+        target = table.lookup(claims.position, claims.index, claims.tenant)
+        if target.item_id != claims.item_id:
+            return NOT_FOUND
+        return target
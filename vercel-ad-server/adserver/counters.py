@@ -0,0 +1,215 @@
+"""클릭/노출 카운터.
+
+요청 경로에서는 스레드별 샤드 카운터만 증가시키고, 백그라운드 플러셔가
+일정 간격으로 샤드를 비워 합산한 증가분(delta)을 싱크에 배치로 씁니다.
+싱크에 반영된 배치는 구독 리스너(리포트 저장소 등)에도 한 번에 넘깁니다.
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger("adserver")
+
+# ═══════════════════════════════════════════════════════════════════════
+# 싱크
+# ═══════════════════════════════════════════════════════════════════════
+
+class MemorySink:
+    """프로세스 메모리에만 누적하는 싱크 (테스트/기본값)."""
+
+    def __init__(self):
+        self.totals = Counter()
+
+    def load(self):
+        return dict(self.totals)
+
+    def write(self, deltas):
+        self.totals.update(deltas)
+
+
+class SQLiteSink:
+    """로컬 SQLite 파일에 (kind, item_id) 별 누적값을 저장하는 싱크."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ad_counts ("
+                " kind TEXT NOT NULL,"
+                " item_id TEXT NOT NULL,"
+                " count INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (kind, item_id))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def load(self):
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT kind, item_id, count FROM ad_counts").fetchall()
+        return {(kind, item_id): count for kind, item_id, count in rows}
+
+    def write(self, deltas):
+        rows = [(kind, item_id, count) for (kind, item_id), count in deltas.items()]
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO ad_counts (kind, item_id, count) VALUES (?, ?, ?)"
+                " ON CONFLICT(kind, item_id) DO UPDATE SET count = count + excluded.count",
+                rows,
+            )
+
+
+def sink_from_env(environ=None):
+    """AD_COUNTER_DB 가 있으면 SQLite 싱크, 없으면 메모리 싱크를 만듭니다."""
+    environ = os.environ if environ is None else environ
+    path = environ.get("AD_COUNTER_DB")
+    if path:
+        return SQLiteSink(path)
+    return MemorySink()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 샤드 카운터 + 플러셔
+# ═══════════════════════════════════════════════════════════════════════
+
+class _Shard:
+    __slots__ = ("lock", "counts", "thread")
+
+    def __init__(self):
+        # 같은 스레드만 증가시키므로 락은 거의 항상 경합 없이 잡힙니다
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        # 끝난 스레드의 샤드는 마지막으로 비운 뒤 목록에서 뺍니다
+        self.thread = threading.current_thread()
+
+
+class CounterStage:
+    """스레드별 샤드에 카운트를 모으고 배치로 싱크에 내보냅니다."""
+
+    def __init__(self, sink, flush_interval=5.0):
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.version = 0
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._totals_lock = threading.Lock()
+        self._totals = Counter(sink.load())
+        # 싱크 쓰기에 실패해 다음 플러시로 넘긴 증가분
+        self._pending = Counter()
+        self._listeners = []
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def increment(self, kind, item_id, amount=1):
+        """요청 경로용: 현재 스레드의 샤드만 증가시킵니다."""
+        shard = self._shard()
+        with shard.lock:
+            shard.counts[(kind, item_id)] += amount
+        if self._thread is None and self.flush_interval > 0:
+            self.start()
+
+    def drain(self):
+        """모든 샤드를 비우고 합산한 증가분을 반환합니다.
+
+        스레드가 끝난 샤드는 비운 뒤 목록에서 빼므로, 요청마다 스레드를
+        새로 만드는 서버에서도 샤드 목록이 늘어나지 않습니다.
+        """
+        deltas = Counter()
+        with self._shards_lock:
+            shards = list(self._shards)
+        dead = []
+        for shard in shards:
+            # is_alive 를 먼저 봐야 끝나기 직전의 증가분도 이번에 비워집니다
+            if not shard.thread.is_alive():
+                dead.append(shard)
+            with shard.lock:
+                counts, shard.counts = shard.counts, Counter()
+            deltas.update(counts)
+        if dead:
+            with self._shards_lock:
+                self._shards = [shard for shard in self._shards if shard not in dead]
+        return deltas
+
+    def flush(self):
+        """증가분을 싱크에 한 번에 쓰고 집계값을 갱신합니다.
+
+        싱크 쓰기에 실패하면 증가분을 버리지 않고 다음 플러시로 넘깁니다.
+        """
+        with self._flush_lock:
+            deltas = self.drain()
+            if self._pending:
+                deltas.update(self._pending)
+                self._pending = Counter()
+            if not deltas:
+                return 0
+            try:
+                self.sink.write(deltas)
+            except Exception:
+                logger.exception("counter flush failed; keeping %d deltas for the next flush", len(deltas))
+                self._pending = deltas
+                return 0
+            with self._totals_lock:
+                self._totals.update(deltas)
+            self.version += 1
+            now = time.time()
+            for listener in self._listeners:
+                try:
+                    listener(deltas, now)
+                except Exception:  # 리스너 오류가 이미 쓴 배치를 되돌리지 않도록
+                    logger.exception("counter flush listener failed")
+            return sum(deltas.values())
+
+    def subscribe(self, listener):
+        """배치가 싱크에 반영될 때마다 ``listener(deltas, now)`` 를 호출합니다.
+
+        deltas 는 {(kind, item_id): 증가분}, 플러셔 스레드에서 불립니다.
+        """
+        self._listeners.append(listener)
+        return listener
+
+    def pending(self):
+        """싱크 오류로 아직 쓰지 못한 증가분의 합."""
+        with self._flush_lock:
+            return sum(self._pending.values())
+
+    def totals(self, kind):
+        """kind 별 {item_id: 누적값} (플러시된 값 기준)."""
+        with self._totals_lock:
+            items = list(self._totals.items())
+        return {item_id: count for (k, item_id), count in items if k == kind}
+
+    def start(self):
+        with self._flush_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="ad-counter-flusher", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:  # 싱크 오류로 플러셔가 죽지 않도록
+                logger.exception("counter flusher failed")
+                time.sleep(self.flush_interval)
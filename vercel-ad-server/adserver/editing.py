@@ -0,0 +1,403 @@
+"""관리 쓰기 API: 소재 일괄 생성/수정/삭제와 되돌리기.
+
+관리 페이지가 환경변수 텍스트를 만들어 붙여 넣고 재배포하는 대신,
+변경 묶음을 한 번에 받아
+
+1. 현재 문서(리비전)에 연산을 차례로 적용하고 필드/URL/문서 전체를 검증,
+2. 새로 쓰이는 이미지 URL 만 fetcher 로 비동기로 받아 이미지인지 확인,
+3. 저장소에 한 트랜잭션으로 새 리비전을 커밋 (기준 리비전이 다르면 충돌),
+4. 이 인스턴스의 스냅샷을 바로 교체하고 다른 인스턴스에 리로드 신호
+
+순서로 처리합니다. 하나라도 실패하면 아무것도 쓰지 않습니다.
+
+    POST /api/admin/creatives
+    {"base_revision": 12, "note": "봄 캠페인", "operations": [
+        {"op": "create", "placement": "top", "item": {"image_url": "...", "click_url": "..."}},
+        {"op": "update", "id": "top-2", "item": {"weight": 3, "end": null}},
+        {"op": "delete", "id": "bottom-1"},
+        {"op": "replace", "placement": "bottom", "enabled": true, "items": [...]}
+    ]}
+
+``update`` 의 item 은 JSON merge patch 입니다 (null 이면 필드 삭제).
+``tenant`` 를 빼면 기본 테넌트입니다. fetcher 는 adserver.assets 와 같은
+``fetch(url) -> (body, content_type)`` 이고 코루틴 함수여도 됩니다.
+"""
+
+import asyncio
+import copy
+import hmac
+import inspect
+import json
+import logging
+import threading
+import urllib.request
+from urllib.parse import urlsplit
+
+from adserver.feed import apply_patch
+from adserver.imaging import image_size
+from adserver.pacing import parse_cap
+from adserver.snapshot import (
+    DEFAULT_TENANT,
+    POSITIONS,
+    assign_item_ids,
+    build_snapshot,
+    document_blocks,
+    parse_time,
+    parse_weight,
+)
+from adserver.stores import ConflictError
+from adserver.targeting import parse_rules
+
+logger = logging.getLogger("adserver")
+
+OPERATIONS = ("create", "update", "delete", "replace")
+
+# 한 요청의 최대 연산 수와 본문 크기 (WSGI/ASGI 공통, 넘으면 413)
+MAX_OPERATIONS = 1000
+MAX_BODY = 1024 * 1024
+
+
+class EditError(ValueError):
+    """검증 실패. ``errors`` 는 [{"operation": 번호, "error": 메시지, ...}]."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(error["error"] for error in errors))
+        self.errors = errors
+
+
+class ReadOnlyStore(Exception):
+    """설정 저장소가 쓰기(커밋)를 지원하지 않을 때."""
+
+
+def authorized(authorization, token):
+    """``Authorization: Bearer <token>`` 이 설정된 토큰과 같은지 (상수 시간 비교)."""
+    if not token or not authorization:
+        return False
+    scheme, _, value = authorization.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(value.strip().encode(), token.encode())
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 연산 적용과 검증
+# ═══════════════════════════════════════════════════════════════════════
+
+def _http_url(value):
+    if not isinstance(value, str):
+        return False
+    parts = urlsplit(value)
+    return parts.scheme in ("http", "https") and bool(parts.netloc)
+
+
+def item_errors(item):
+    """소재 dict 한 개의 필드 오류 메시지 목록."""
+    errors = []
+    if not isinstance(item, dict):
+        return ["item must be an object"]
+    if not _http_url(item.get("image_url")):
+        errors.append("image_url must be an http(s) URL")
+    if item.get("click_url") and not _http_url(item["click_url"]):
+        errors.append("click_url must be an http(s) URL")
+    checks = (
+        ("weight", parse_weight),
+        ("start", parse_time),
+        ("end", parse_time),
+        ("targeting", parse_rules),
+        ("frequency_cap", parse_cap),
+        ("daily_impressions", lambda v: int(v or 0) >= 0),
+        ("daily_clicks", lambda v: int(v or 0) >= 0),
+    )
+    for field, check in checks:
+        if field not in item:
+            continue
+        try:
+            valid = check(item[field]) is not False
+        except (TypeError, ValueError) as exc:
+            valid, detail = False, str(exc)
+        else:
+            detail = "must be a finite, non-negative number"
+        if not valid:
+            errors.append(f"invalid {field}: {detail}")
+    if not errors and item.get("start") and item.get("end"):
+        if parse_time(item["end"]) <= parse_time(item["start"]):
+            errors.append("end must be after start")
+    return errors
+
+
+def _block(document, tenant, placement, create=False):
+    """(tenant, placement) 의 배너 블록 dict. 없으면 create 일 때만 만듭니다."""
+    if tenant == DEFAULT_TENANT and placement in POSITIONS:
+        block = document.get(f"{placement}_banner")
+        if block is None and create:
+            block = document[f"{placement}_banner"] = {"enabled": True, "items": []}
+        return block
+    placements = document.get("tenants", {}).get(tenant, {}).get("placements", {})
+    block = placements.get(placement)
+    if block is None and create:
+        tenant_block = document.setdefault("tenants", {}).setdefault(tenant, {})
+        block = tenant_block.setdefault("placements", {})[placement] = {"enabled": True, "items": []}
+    return block
+
+
+def _new_id(tenant, placement, used):
+    prefix = placement if tenant == DEFAULT_TENANT and placement in POSITIONS else f"{tenant}:{placement}"
+    number = 1
+    while f"{prefix}-{number}" in used:
+        number += 1
+    return f"{prefix}-{number}"
+
+
+def apply_operations(document, operations):
+    """연산들을 적용한 새 문서를 돌려줍니다 (원본은 그대로). 오류가 있으면 EditError."""
+    if not isinstance(operations, list) or not operations:
+        raise EditError([{"operation": None, "error": "operations must be a non-empty list"}])
+    if len(operations) > MAX_OPERATIONS:
+        raise EditError([{"operation": None, "error": f"at most {MAX_OPERATIONS} operations per request"}])
+    document = assign_item_ids(copy.deepcopy(document))
+    # 소재 id → 소재 dict 를 담고 있는 items 리스트
+    owners = {}
+    for _, _, block, _ in document_blocks(document):
+        for item in block.get("items") or ():
+            owners[item["id"]] = block["items"]
+
+    errors = []
+    for number, operation in enumerate(operations):
+        def fail(message, number=number):
+            errors.append({"operation": number, "error": message})
+
+        if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+            fail(f"op must be one of {', '.join(OPERATIONS)}")
+            continue
+        op = operation["op"]
+        tenant = str(operation.get("tenant") or DEFAULT_TENANT)
+        placement = str(operation.get("placement") or "")
+        if op in ("create", "replace") and not placement:
+            fail(f"{op} needs a placement")
+            continue
+
+        if op == "create":
+            if not isinstance(operation.get("item"), dict):
+                fail("create needs an item object")
+                continue
+            item = dict(operation["item"])
+            item.setdefault("id", _new_id(tenant, placement, owners))
+            problems = item_errors(item)
+            if item["id"] in owners:
+                problems.append(f"duplicate item id: {item['id']}")
+            if problems:
+                for problem in problems:
+                    fail(problem)
+                continue
+            items = _block(document, tenant, placement, create=True).setdefault("items", [])
+            items.append(item)
+            owners[item["id"]] = items
+        elif op == "replace":
+            block = _block(document, tenant, placement, create=True)
+            for old in block.get("items") or ():
+                owners.pop(old["id"], None)
+            items = []
+            for item in operation.get("items") or ():
+                item = dict(item) if isinstance(item, dict) else item
+                problems = item_errors(item)
+                if not problems:
+                    item.setdefault("id", _new_id(tenant, placement, owners))
+                    if item["id"] in owners:
+                        problems.append(f"duplicate item id: {item['id']}")
+                if problems:
+                    for problem in problems:
+                        fail(problem)
+                    continue
+                items.append(item)
+                owners[item["id"]] = items
+            block["items"] = items
+            if "enabled" in operation:
+                block["enabled"] = bool(operation["enabled"])
+        else:
+            item_id = operation.get("id")
+            items = owners.get(item_id)
+            if items is None:
+                fail(f"unknown item id: {item_id!r}")
+                continue
+            index = next(i for i, item in enumerate(items) if item["id"] == item_id)
+            if op == "delete":
+                del items[index]
+                del owners[item_id]
+                continue
+            patch = operation.get("item")
+            if not isinstance(patch, dict):
+                fail("update needs an item object")
+                continue
+            updated = apply_patch(items[index], dict(patch, id=item_id))
+            problems = item_errors(updated)
+            if problems:
+                for problem in problems:
+                    fail(problem)
+                continue
+            items[index] = updated
+
+    if not errors:
+        # 실험 설정처럼 여러 소재에 걸친 규칙은 문서 전체를 빌드해 확인
+        try:
+            build_snapshot(document)
+        except (TypeError, ValueError) as exc:
+            errors.append({"operation": None, "error": str(exc)})
+    if errors:
+        raise EditError(errors)
+    return document
+
+
+def _image_urls(document):
+    return {
+        item["image_url"]
+        for _, _, block, _ in document_blocks(document)
+        for item in block.get("items") or () if item.get("image_url")
+    }
+
+
+async def check_images(urls, fetcher, concurrency=8, timeout=10.0):
+    """URL 들을 동시에 받아 이미지가 아닌 것의 {url: 오류 메시지} 를 돌려줍니다.
+
+    동기 fetcher 는 기본 스레드 풀에서, 코루틴 함수 fetcher 는 그대로 await 합니다.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    coroutine = inspect.iscoroutinefunction(fetcher) or inspect.iscoroutinefunction(
+        getattr(fetcher, "__call__", None)
+    )
+
+    async def check(url):
+        async with semaphore:
+            call = fetcher(url) if coroutine else loop.run_in_executor(None, fetcher, url)
+            try:
+                body, content_type = await asyncio.wait_for(call, timeout)
+            except asyncio.TimeoutError:
+                return url, "image fetch timed out"
+            except Exception as exc:
+                return url, f"image unreachable: {exc}"
+        if not (content_type or "").startswith("image/") and image_size(body) is None:
+            return url, f"not an image ({content_type})"
+        return url, None
+
+    results = await asyncio.gather(*(check(url) for url in sorted(urls)))
+    return {url: error for url, error in results if error}
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 트랜잭션과 스냅샷 교체
+# ═══════════════════════════════════════════════════════════════════════
+
+class ConfigEditor:
+    """검증 → 커밋 → 스냅샷 교체. 저장소는 ``commit()`` 을 지원해야 합니다 (SQLite).
+
+    ``peers`` 는 다른 서빙 인스턴스의 기준 URL 들로, 커밋 후
+    ``POST <peer>/api/admin/reload`` 로 알립니다 (저장소 감시 주기를 기다리지 않도록).
+    """
+
+    def __init__(self, holder, fetcher, token=None, peers=(), concurrency=8, timeout=10.0):
+        self.holder = holder
+        self.fetcher = fetcher
+        self.token = token
+        self.peers = tuple(peer.rstrip("/") for peer in peers if peer)
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    @property
+    def writable(self):
+        return callable(getattr(self.holder.store, "commit", None))
+
+    def _store(self):
+        if not self.writable:
+            raise ReadOnlyStore("config store is read-only; use AD_CONFIG_STORE=sqlite:<path>")
+        return self.holder.store
+
+    def current(self):
+        """{"revision", "generation", "document"} (소재 id 가 채워진 문서)."""
+        store = self._store()
+        revision = store.revision()
+        return {
+            "revision": revision,
+            "generation": self.holder.current().generation,
+            "document": assign_item_ids(store.load()),
+        }
+
+    def history(self, limit=50):
+        return {"revision": self._store().revision(), "history": self._store().history(limit)}
+
+    async def submit(self, operations, base=None, note=""):
+        """연산 묶음을 검증해 한 리비전으로 커밋합니다. {"revision", "generation", "validated_images"}."""
+        store = self._store()
+        base = _revision(base, "base_revision", optional=True)
+        loop = asyncio.get_running_loop()
+        revision, document = await loop.run_in_executor(None, self._read, store)
+        if base is not None and base != revision:
+            raise ConflictError(base, revision)
+        updated = apply_operations(document, operations)
+        # 이미 커밋된 문서에 있던 이미지는 다시 받지 않음
+        urls = _image_urls(updated) - _image_urls(document)
+        failures = await check_images(urls, self.fetcher, self.concurrency, self.timeout)
+        if failures:
+            raise EditError([
+                {"operation": None, "image_url": url, "error": error} for url, error in sorted(failures.items())
+            ])
+        result = await loop.run_in_executor(None, self._commit, store, updated, revision, note)
+        result["validated_images"] = len(urls)
+        return result
+
+    async def rollback(self, revision, base=None):
+        """이력의 리비전 문서를 새 리비전으로 다시 커밋합니다."""
+        store = self._store()
+        revision = _revision(revision, "revision")
+        base = _revision(base, "base_revision", optional=True)
+        loop = asyncio.get_running_loop()
+        document = await loop.run_in_executor(None, store.document_at, revision)
+        if document is None:
+            raise EditError([{"operation": None, "error": f"unknown revision: {revision!r}"}])
+        try:
+            build_snapshot(document)
+        except (TypeError, ValueError) as exc:
+            raise EditError([{"operation": None, "error": str(exc)}]) from None
+        return await loop.run_in_executor(None, self._commit, store, document, base, f"rollback to {revision}")
+
+    @staticmethod
+    def _read(store):
+        # 리비전과 문서를 따로 읽는 사이의 커밋은 commit 의 기준 리비전 확인이 잡음
+        revision = store.revision()
+        return revision, store.load()
+
+    def _commit(self, store, document, expected, note):
+        revision = store.commit(document, expected, note)
+        snapshot = self.holder.reload()
+        if self.peers:
+            threading.Thread(target=self._signal, name="ad-config-signal", daemon=True).start()
+        return {"revision": revision, "generation": snapshot.generation}
+
+    def _signal(self):
+        for peer in self.peers:
+            request = urllib.request.Request(
+                f"{peer}/api/admin/reload", data=b"", method="POST",
+                headers={"Authorization": f"Bearer {self.token}"} if self.token else {},
+            )
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except Exception as exc:
+                # 신호를 못 받은 인스턴스도 저장소 감시(지문 폴링)로 곧 따라옴
+                logger.warning("config reload signal to %s failed: %s", peer, exc)
+
+
+def _revision(value, field, optional=False):
+    """JSON 의 리비전 번호. bool(true/false)이나 정수가 아니면 EditError."""
+    if value is None and optional:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise EditError([{"operation": None, "error": f"{field} must be an integer revision: {value!r}"}])
+    return value
+
+
+def parse_body(body):
+    """요청 본문 JSON → dict. 아니면 EditError."""
+    try:
+        value = json.loads(body or b"{}")
+    except ValueError:
+        raise EditError([{"operation": None, "error": "request body must be JSON"}]) from None
+    if not isinstance(value, dict):
+        raise EditError([{"operation": None, "error": "request body must be a JSON object"}])
+    return value
@@ -0,0 +1,342 @@
+"""클라이언트 이벤트(노출/클릭/노출 시간) 배치 수집.
+
+POST /api/events 본문을 청크 단위로 받아 바로 디코딩하고, 배치 안에서
+먼저 (윈도우, 종류, 소재) 별로 합산한 뒤 한 번의 락으로 윈도우 집계에
+더합니다. 본문 전체를 메모리에 올리거나 이벤트마다 락을 잡지 않습니다.
+
+본문 형식:
+
+- NDJSON (``application/x-ndjson``): 줄마다
+  ``{"type": "impression", "item": "top-1", "generation": 3, "ts": 1700000000, "value": 0}``
+  (``type`` 은 impression/click/view, view 의 ``value`` 는 노출 시간 ms,
+  ``ts`` 를 생략하면 수신 시각)
+- 바이너리 (``application/vnd.adserver.events``): 매직 ``AEV1`` 다음에
+  레코드마다 ``<BIIIB`` (종류 코드, generation, ts 초, value, id 길이) +
+  UTF-8 소재 id. 종류 코드는 1=impression, 2=click, 3=view.
+
+``generation`` 은 클라이언트가 설정을 받은 세대로 참고용입니다. 세대 번호는
+프로세스마다 따로 세므로 다른 인스턴스나 콜드 스타트 전에 받은 값일 수
+있어, 현재 세대와 비교하지 않습니다. 소재는 현재 스냅샷의 id 로 확인합니다.
+"""
+
+import json
+import math
+import struct
+import threading
+from collections import Counter
+
+KINDS = ("impression", "click", "view")
+KIND_CODES = {1: "impression", 2: "click", 3: "view"}
+
+NDJSON = "application/x-ndjson"
+BINARY = "application/vnd.adserver.events"
+BINARY_MAGIC = b"AEV1"
+BINARY_RECORD = struct.Struct("<BIIIB")
+
+# 배치 하나의 최대 이벤트 수 / 본문 크기
+MAX_EVENTS = 10000
+MAX_BODY = 4 * 1024 * 1024
+
+# 수신 시각보다 이만큼 넘게 미래인 이벤트는 버림 (초)
+MAX_CLOCK_SKEW = 300
+
+# value(ms)/ts(초) 상한: 바이너리 형식의 uint32 와 같음
+MAX_VALUE = 2 ** 32 - 1
+MAX_TS = 2 ** 32 - 1
+
+
+class BodyTooLarge(Exception):
+    """본문이 MAX_BODY 를 넘었을 때."""
+
+
+def encode_binary(events):
+    """(kind, item_id, generation, ts, value) 목록을 바이너리 배치로 만듭니다."""
+    codes = {kind: code for code, kind in KIND_CODES.items()}
+    parts = [BINARY_MAGIC]
+    for kind, item_id, generation, ts, value in events:
+        raw = item_id.encode()
+        parts.append(BINARY_RECORD.pack(codes[kind], generation, int(ts), int(value), len(raw)))
+        parts.append(raw)
+    return b"".join(parts)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 스트리밍 디코더
+# ═══════════════════════════════════════════════════════════════════════
+
+class NdjsonDecoder:
+    """청크를 받는 대로 완성된 줄만 디코딩합니다.
+
+    숫자가 유한하지 않거나 범위를 벗어난 이벤트는 그 이벤트만 버리고
+    ``invalid`` 에 사유(value/ts/generation)별로 셉니다.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+        self.malformed = 0
+        self.invalid = Counter()
+
+    def feed(self, chunk):
+        data = self._buffer + chunk
+        lines = data.split(b"\n")
+        self._buffer = lines.pop()
+        return [event for event in map(self._decode, lines) if event is not None]
+
+    def finish(self):
+        line, self._buffer = self._buffer, b""
+        event = self._decode(line)
+        return [event] if event is not None else []
+
+    def _decode(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            data = json.loads(line)
+            kind = data["type"]
+            item_id = str(data["item"])
+            value = float(data.get("value") or 0)
+            ts = data.get("ts")
+            ts = None if ts is None else float(ts)
+            generation = data.get("generation") or 0
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.malformed += 1
+            return None
+        # 1e400(inf), NaN, 너무 큰 값은 int 변환/윈도우 계산 전에 거절
+        if not (math.isfinite(value) and value <= MAX_VALUE):
+            self.invalid["value"] += 1
+            return None
+        if ts is not None and not (math.isfinite(ts) and 0 <= ts <= MAX_TS):
+            self.invalid["ts"] += 1
+            return None
+        if isinstance(generation, float) and not math.isfinite(generation):
+            self.invalid["generation"] += 1
+            return None
+        try:
+            generation = int(generation)
+        except (ValueError, TypeError):
+            self.malformed += 1
+            return None
+        return kind, item_id, generation, ts, max(0, int(value))
+
+
+class BinaryDecoder:
+    """고정 길이 헤더 + id 레코드를 청크 경계와 무관하게 디코딩합니다."""
+
+    def __init__(self):
+        self._buffer = b""
+        self._magic = False
+        self.malformed = 0
+        self.invalid = Counter()
+
+    def feed(self, chunk):
+        data = self._buffer + chunk
+        offset = 0
+        if not self._magic:
+            if len(data) < len(BINARY_MAGIC):
+                self._buffer = data
+                return []
+            if data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+                raise ValueError("bad magic")
+            self._magic = True
+            offset = len(BINARY_MAGIC)
+        events = []
+        size = BINARY_RECORD.size
+        unpack = BINARY_RECORD.unpack_from
+        end = len(data)
+        while end - offset >= size:
+            code, generation, ts, value, length = unpack(data, offset)
+            if end - offset - size < length:
+                break
+            raw = data[offset + size:offset + size + length]
+            offset += size + length
+            kind = KIND_CODES.get(code)
+            try:
+                item_id = raw.decode()
+            except UnicodeDecodeError:
+                kind = None
+            if kind is None:
+                self.malformed += 1
+                continue
+            events.append((kind, item_id, generation, float(ts) if ts else None, value))
+        self._buffer = data[offset:]
+        return events
+
+    def finish(self):
+        if self._buffer or not self._magic:
+            self.malformed += 1
+        self._buffer = b""
+        return []
+
+
+def decoder_for(content_type):
+    """Content-Type 으로 디코더를 고릅니다. 모르는 형식이면 None."""
+    mimetype = (content_type or "").split(";", 1)[0].strip().lower()
+    if mimetype in (NDJSON, "application/jsonl", "application/json", "text/plain", ""):
+        return NdjsonDecoder()
+    if mimetype in (BINARY, "application/octet-stream"):
+        return BinaryDecoder()
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 윈도우 집계
+# ═══════════════════════════════════════════════════════════════════════
+
+class EventAggregator:
+    """``window`` 초 단위 텀블링 윈도우별 (kind, item_id) → [횟수, value 합].
+
+    최근 ``retention`` 개 윈도우만 보관하고, 그보다 오래된 이벤트는 stale 로
+    거절합니다.
+    """
+
+    def __init__(self, window=60, retention=60):
+        self.window = window
+        self.retention = retention
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """배치가 반영될 때마다 ``listener(folded)`` 를 호출합니다.
+
+        folded 는 {(window_start, kind, item_id): [count, value_sum]}.
+        """
+        self._listeners.append(listener)
+
+    def batch(self, decoder, snapshot, now):
+        """요청 하나의 본문을 받을 EventBatch 를 만듭니다."""
+        return EventBatch(self, decoder, snapshot, now)
+
+    def ingest(self, decoder, chunks, snapshot, now):
+        """청크 이터러블을 한 번에 처리하는 편의 함수 (WSGI/벤치마크용)."""
+        batch = self.batch(decoder, snapshot, now)
+        for chunk in chunks:
+            batch.feed(chunk)
+        return batch.finish()
+
+    def _merge(self, folded, oldest):
+        with self._lock:
+            windows = self._windows
+            for (start, kind, item_id), (count, value) in folded.items():
+                bucket = windows.get(start)
+                if bucket is None:
+                    bucket = windows[start] = {}
+                entry = bucket.get((kind, item_id))
+                if entry is None:
+                    bucket[(kind, item_id)] = [count, value]
+                else:
+                    entry[0] += count
+                    entry[1] += value
+            for start in [start for start in windows if start < oldest]:
+                del windows[start]
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(folded)
+
+    def windows(self, since=None):
+        """[{"start", "kind", "item", "count", "value"}] (시작 시각 순)."""
+        with self._lock:
+            rows = [
+                {"start": start, "kind": kind, "item": item_id, "count": count, "value": value}
+                for start, bucket in self._windows.items() if since is None or start >= since
+                for (kind, item_id), (count, value) in bucket.items()
+            ]
+        rows.sort(key=lambda row: (row["start"], row["kind"], row["item"]))
+        return rows
+
+
+class EventBatch:
+    """본문 청크를 받는 대로 디코딩/검증해 배치 로컬 dict 에 합산합니다.
+
+    ``finish()`` 에서 한 번만 EventAggregator 에 반영합니다.
+    """
+
+    def __init__(self, aggregator, decoder, snapshot, now):
+        self.aggregator = aggregator
+        self.decoder = decoder
+        self.items = snapshot.items
+        self.version = snapshot.version
+        self.now = now
+        self.oldest = (int(now // aggregator.window) - aggregator.retention + 1) * aggregator.window
+        self.folded = {}
+        self.rejected = Counter()
+        self.accepted = 0
+        self.received = 0
+
+    def feed(self, chunk):
+        """본문 청크 하나. MAX_BODY 를 넘으면 BodyTooLarge."""
+        self.received += len(chunk)
+        if self.received > MAX_BODY:
+            raise BodyTooLarge()
+        try:
+            self._fold(self.decoder.feed(chunk))
+        except ValueError:  # 바이너리 매직 불일치 등: 이후 청크는 무시
+            self.decoder = _Discard(self.decoder)
+
+    def finish(self):
+        """집계에 반영하고 결과 요약을 돌려줍니다."""
+        self._fold(self.decoder.finish())
+        rejected = self.rejected
+        if self.decoder.malformed:
+            rejected["malformed"] += self.decoder.malformed
+        rejected.update(self.decoder.invalid)
+        if self.folded:
+            self.aggregator._merge(self.folded, self.oldest)
+        return {
+            "accepted": self.accepted,
+            "rejected": sum(rejected.values()),
+            "reasons": dict(rejected),
+            "version": self.version,
+        }
+
+    def _fold(self, events):
+        folded, rejected, items = self.folded, self.rejected, self.items
+        now, oldest = self.now, self.oldest
+        window = self.aggregator.window
+        accepted = self.accepted
+        for kind, item_id, event_generation, ts, value in events:
+            if accepted >= MAX_EVENTS:
+                rejected["overflow"] += 1
+                continue
+            if kind not in KINDS:
+                rejected["kind"] += 1
+                continue
+            if event_generation < 0:
+                rejected["generation"] += 1
+                continue
+            if item_id not in items:
+                rejected["item"] += 1
+                continue
+            if ts is None:
+                ts = now
+            elif ts > now + MAX_CLOCK_SKEW:
+                rejected["future"] += 1
+                continue
+            start = int(ts // window) * window
+            if start < oldest:
+                rejected["stale"] += 1
+                continue
+            key = (start, kind, item_id)
+            entry = folded.get(key)
+            if entry is None:
+                folded[key] = [1, value]
+            else:
+                entry[0] += 1
+                entry[1] += value
+            accepted += 1
+        self.accepted = accepted
+
+
+class _Discard:
+    """형식이 깨진 본문의 나머지를 버리는 디코더."""
+
+    def __init__(self, decoder):
+        self.malformed = decoder.malformed + 1
+        self.invalid = decoder.invalid
+
+    def feed(self, chunk):
+        return []
+
+    def finish(self):
+        return []
@@ -0,0 +1,278 @@
+"""소재 A/B 실험.
+
+설정 문서의 ``experiments`` 로 게재 위치 하나의 소재들을 arm 으로 나눕니다.
+
+    "experiments": [{
+        "id": "hero-copy", "placement": "top", "tenant": "default", "traffic": 100,
+        "arms": [{"name": "control", "items": ["top-1"]},
+                 {"name": "b", "items": ["top-2"], "weight": 1}]
+    }]
+
+배정은 사용자별 상태 없이 클라이언트 id 의 해시 버킷(0..9999)으로
+정합니다. 실험마다 id 에서 만든 시드를 CRC32 시작값으로 써서 문자열을
+이어 붙이지 않고, 정수 섞기만 합니다. 버킷이 ``traffic`` % 안이면 arm
+경계(가중치 누적)로 arm 을 고르고, 밖이면 미참여입니다. 미참여나
+클라이언트 id 가 없는 요청은 첫 arm(control) 소재만 보지만 실험 결과에는
+들어가지 않습니다.
+
+노출은 /api/ad/<position> 선택 시, 클릭은 arm 이 담긴 서명된 클릭
+토큰에서 기록합니다 (AD_CLICK_SECRET 이 없으면 클릭을 셀 수 없어 CTR 은
+None). 결과는 arm 별 노출/클릭/CTR 과 Wilson 95% 신뢰구간이며
+NumPy 가 있으면 벡터 연산으로 계산합니다.
+"""
+
+import bisect
+import math
+import threading
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 없이도 동작 (순수 파이썬 집계)
+    np = None
+
+BUCKETS = 10000
+
+# 95% 신뢰구간
+Z = 1.959964
+
+KIND_CODES = {"impression": 0, "click": 1}
+
+
+class ExperimentError(ValueError):
+    """잘못된 실험 설정."""
+
+
+def bucket(client, seed):
+    """클라이언트 id 의 0..BUCKETS-1 버킷. 같은 (client, seed) 는 항상 같은 값."""
+    h = zlib.crc32(client.encode(), seed)
+    h = ((h ^ (h >> 16)) * 0x45D9F3B) & 0xFFFFFFFF
+    return (h ^ (h >> 16)) % BUCKETS
+
+
+class Arm:
+    """실험의 한 갈래와 그 소재 id 들."""
+
+    __slots__ = ("name", "weight", "items")
+
+    def __init__(self, name, weight, items):
+        self.name = name
+        self.weight = weight
+        self.items = frozenset(items)
+
+
+class Experiment:
+    """게재 위치 하나의 실험. arm 마다 숨길 소재(다른 arm 의 소재)를 미리 계산합니다."""
+
+    __slots__ = ("id", "tenant", "position", "arms", "traffic", "seed", "bounds", "hidden")
+
+    def __init__(self, id, tenant, position, arms, traffic=100.0):
+        self.id = id
+        self.tenant = tenant
+        self.position = position
+        self.arms = tuple(arms)
+        self.traffic = traffic
+        self.seed = zlib.crc32(id.encode())
+        enrolled = BUCKETS * traffic / 100.0
+        total = sum(arm.weight for arm in self.arms)
+        bounds, acc = [], 0.0
+        for arm in self.arms:
+            acc += arm.weight
+            bounds.append(enrolled * acc / total)
+        self.bounds = bounds
+        everything = frozenset().union(*(arm.items for arm in self.arms))
+        self.hidden = tuple(everything - arm.items for arm in self.arms)
+
+    def assign(self, client):
+        """arm index, 미참여면 None."""
+        b = bucket(client, self.seed)
+        if b >= self.bounds[-1]:
+            return None
+        return bisect.bisect_right(self.bounds, b)
+
+    def as_dict(self):
+        return {
+            "id": self.id, "tenant": self.tenant, "placement": self.position, "traffic": self.traffic,
+            "arms": [{"name": arm.name, "weight": arm.weight, "items": sorted(arm.items)} for arm in self.arms],
+        }
+
+
+class ExperimentSet:
+    """스냅샷 한 세대의 실험 목록."""
+
+    __slots__ = ("experiments", "_by_placement")
+
+    def __init__(self, experiments=()):
+        self.experiments = tuple(experiments)
+        self._by_placement = {(e.tenant, e.position): e for e in self.experiments}
+
+    def __bool__(self):
+        return bool(self.experiments)
+
+    def __iter__(self):
+        return iter(self.experiments)
+
+    def for_placement(self, tenant, position):
+        return self._by_placement.get((tenant, position))
+
+    def assign(self, client):
+        """실험별 arm index 튜플 (응답 캐시 키로도 씀). client 가 없으면 모두 None."""
+        if not client:
+            return (None,) * len(self.experiments)
+        return tuple(e.assign(client) for e in self.experiments)
+
+    def apply(self, config, snapshot, assignment=None):
+        """as_dict()/tenant_dict() 결과에서 배정되지 않은 arm 의 소재를 뺍니다 (제자리 수정).
+
+        실험이 걸린 배너의 소재에는 id 와 tracking_url 을 붙여 목록 위치가
+        바뀌어도 클릭 슬롯을 알 수 있게 합니다. 참여한 실험은 ``experiments``
+        에 {실험 id: arm 이름} 으로 넣습니다.
+        """
+        if assignment is None:
+            assignment = (None,) * len(self.experiments)
+        tenant = config.get("tenant") if "placements" in config else None
+        assigned = {}
+        for experiment, arm in zip(self.experiments, assignment):
+            banner = snapshot.placements.get((experiment.tenant, experiment.position))
+            if tenant is not None:
+                block = config["placements"].get(experiment.position) if experiment.tenant == tenant else None
+            else:
+                block = config.get(banner.key) if banner is not None and banner.tenant == "default" else None
+            if block is None:
+                continue
+            hidden = experiment.hidden[arm or 0]
+            block["items"] = [
+                dict(data, id=item.id, tracking_url=banner.tracking_url(item))
+                for item, data in zip(banner.items, block["items"]) if item.id not in hidden
+            ]
+            if arm is not None:
+                assigned[experiment.id] = experiment.arms[arm].name
+        if assigned:
+            config["experiments"] = assigned
+        return config
+
+
+def _number(value):
+    """유한한 float, 숫자가 아니면 None."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_experiments(values, placements):
+    """설정 문서의 experiments 목록 → ExperimentSet. placements 는 {(tenant, position): Banner}."""
+    experiments = []
+    seen = set()
+    for value in values or ():
+        experiment_id = str(value.get("id") or "")
+        tenant = str(value.get("tenant") or "default")
+        position = str(value.get("placement") or "")
+        banner = placements.get((tenant, position))
+        if not experiment_id or banner is None:
+            raise ExperimentError(f"experiment needs an id and a known placement: {value!r}")
+        if (tenant, position) in seen:
+            raise ExperimentError(f"only one experiment per placement: {tenant}/{position}")
+        seen.add((tenant, position))
+        known = {item.id for item in banner.items}
+        arms = []
+        for arm in value.get("arms") or ():
+            items = [str(item) for item in arm.get("items") or ()]
+            if not arm.get("name") or not items or not known.issuperset(items):
+                raise ExperimentError(f"experiment {experiment_id}: invalid arm {arm!r}")
+            weight = _number(arm.get("weight", 1.0))
+            if weight is None or weight < 0:
+                raise ExperimentError(f"experiment {experiment_id}: arm weight must be a finite, non-negative number")
+            arms.append(Arm(str(arm["name"]), weight, items))
+        if len(arms) < 2:
+            raise ExperimentError(f"experiment {experiment_id}: needs at least two arms")
+        if not sum(arm.weight for arm in arms) > 0:
+            raise ExperimentError(f"experiment {experiment_id}: at least one arm needs a positive weight")
+        traffic = _number(value.get("traffic", 100))
+        if traffic is None or not 0 < traffic <= 100:
+            raise ExperimentError(f"experiment {experiment_id}: traffic must be in (0, 100]")
+        experiments.append(Experiment(experiment_id, tenant, position, arms, traffic))
+    return ExperimentSet(experiments)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 노출/클릭 기록과 결과
+# ═══════════════════════════════════════════════════════════════════════
+
+class ExperimentLog:
+    """(실험, arm) 별 노출/클릭 카운터 (프로세스 메모리).
+
+    이벤트 수와 관계없이 arm 하나에 정수 두 개만 들고 있습니다.
+    """
+
+    def __init__(self):
+        self._counts = {}  # (실험 id, arm 이름) → [노출, 클릭]
+        self._lock = threading.Lock()
+
+    def append(self, experiment_id, arm, kind):
+        column = KIND_CODES[kind]
+        key = (experiment_id, arm)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0, 0]
+            counts[column] += 1
+
+    def totals(self):
+        """{(실험 id, arm 이름): (노출, 클릭)}."""
+        with self._lock:
+            return {key: tuple(counts) for key, counts in self._counts.items()}
+
+    def results(self, experiments, clicks_tracked=True):
+        """실험별 arm 결과 목록 (ExperimentSet 순서).
+
+        클릭을 세지 않는 설정(clicks_tracked=False)이면 CTR/신뢰구간은 None 입니다.
+        """
+        totals = self.totals()
+        rows = [
+            (experiment, arm, *totals.get((experiment.id, arm.name), (0, 0)))
+            for experiment in experiments for arm in experiment.arms
+        ]
+        bounds = wilson([row[2] for row in rows], [row[3] for row in rows])
+        output, by_id = [], {}
+        for (experiment, arm, impressions, clicks), (ctr, low, high) in zip(rows, bounds):
+            if not clicks_tracked:
+                clicks, ctr, low, high = None, None, None, None
+            entry = by_id.get(experiment.id)
+            if entry is None:
+                entry = by_id[experiment.id] = dict(experiment.as_dict(), arms=[])
+                output.append(entry)
+            entry["arms"].append({
+                "name": arm.name, "weight": arm.weight, "impressions": impressions, "clicks": clicks,
+                "ctr": ctr, "ci_low": low, "ci_high": high,
+            })
+        return output
+
+
+def wilson(impressions, clicks, z=Z):
+    """노출/클릭 목록 → [(ctr, 하한, 상한)] (Wilson 점수 구간). 노출 0 이면 None 들."""
+    if np is not None and len(impressions):
+        n = np.asarray(impressions, dtype=float)
+        c = np.minimum(np.asarray(clicks, dtype=float), n)
+        safe = np.where(n > 0, n, 1.0)
+        p = c / safe
+        denom = 1 + z * z / safe
+        center = (p + z * z / (2 * safe)) / denom
+        half = z * np.sqrt(p * (1 - p) / safe + z * z / (4 * safe * safe)) / denom
+        return [
+            (round(float(p[i]), 6), round(float(center[i] - half[i]), 6), round(float(center[i] + half[i]), 6))
+            if n[i] > 0 else (None, None, None)
+            for i in range(len(n))
+        ]
+    result = []
+    for n, c in zip(impressions, clicks):
+        if n <= 0:
+            result.append((None, None, None))
+            continue
+        p = min(c, n) / n
+        denom = 1 + z * z / n
+        center = (p + z * z / (2 * n)) / denom
+        half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+        result.append((round(p, 6), round(center - half, 6), round(center + half, 6)))
+    return result
@@ -0,0 +1,180 @@
+"""빌드 시점 정적 내보내기 (edge export).
+
+설정 저장소에서 스냅샷을 한 번 만들어 CDN 이 그대로 서빙할 파일과
+vercel.json 규칙을 생성합니다. 함수 호출 없이 나가는 경로:
+
+- /api/ad-config(.json), /api/tenants/<tenant>/ad-config
+  → ``<out>/_export/...json`` 로 rewrite (``since``/``client`` 쿼리가 있으면 함수로)
+- /click/<position>/<index> → 슬롯별 302 redirect
+- /admin/static/* → 관리 페이지 CSS/JS
+- /admin (``--admin`` 일 때) → 내보낸 시점의 관리 페이지 (클릭 수/CTR 없음)
+
+엣지 redirect 는 클릭을 세지 않으므로, 일일 클릭 예산(daily_clicks)이
+걸린 소재의 슬롯은 내보내지 않고 함수가 계속 처리합니다. 서명된 클릭
+(/c/<token>)과 나머지 동적 라우트도 그대로 함수로 갑니다.
+
+    python -m adserver.export [--out public] [--vercel vercel.json] [--admin] [--no-redirects]
+
+vercel.json 은 빌드 전에 읽히므로 배포 전에(로컬 또는 CI) 실행하고 결과와
+함께 배포합니다. 다시 실행하면 이전에 생성한 규칙을 지우고 새로 씁니다.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+from adserver.admin import ASSETS, render_admin
+from adserver.responses import dump_json
+from adserver.snapshot import SnapshotHolder
+from adserver.stores import store_from_env
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXPORT_PREFIX = "/_export"
+
+# 생성한 파일은 배포마다 CDN 캐시가 비워지므로 엣지에서는 오래 캐시
+EXPORT_HEADERS = [
+    {"key": "Access-Control-Allow-Origin", "value": "*"},
+    {"key": "Cache-Control", "value": "public, max-age=60, s-maxage=31536000, stale-while-revalidate"},
+]
+ADMIN_ASSET_HEADERS = [{"key": "Cache-Control", "value": "public, max-age=31536000, immutable"}]
+
+# 피드/롱폴, 실험 배정(client) 요청은 정적 파일이 아니라 함수로
+DYNAMIC_QUERY = [{"type": "query", "key": "since"}, {"type": "query", "key": "client"}]
+
+
+def export_files(snapshot):
+    """{상대 경로: 바이트}. 경로는 출력 디렉터리 기준.
+
+    A/B 실험이 걸린 위치는 control arm 소재만 (client 별 배정은 함수가 처리).
+    """
+    control = snapshot.experiments.apply
+    files = {"_export/ad-config.json": dump_json(control(snapshot.as_dict({}), snapshot))}
+    for tenant in snapshot.tenants:
+        config = control(snapshot.tenant_dict(tenant, {}), snapshot)
+        # generation 은 빌드 머신 프로세스의 카운터라 배포마다 같은 내용에도 바뀜 → 내용 해시로
+        del config["generation"]
+        config["version"] = snapshot.version
+        files[f"_export/tenants/{tenant}/ad-config.json"] = dump_json(config)
+    files["_export/admin.html"] = render_admin(snapshot, {})
+    for name, payload in ASSETS.items():
+        files[f"admin/static/{name}"] = payload.bodies["identity"]
+    return files
+
+
+def export_rules(snapshot, admin=False, redirects=True):
+    """vercel.json 에 넣을 (rewrites, redirects, headers)."""
+    rewrites = [
+        {"source": source, "missing": DYNAMIC_QUERY, "destination": f"{EXPORT_PREFIX}/ad-config.json"}
+        for source in ("/api/ad-config.json", "/api/ad-config")
+    ]
+    for tenant in snapshot.tenants:
+        rewrites.append({
+            "source": f"/api/tenants/{tenant}/ad-config", "missing": DYNAMIC_QUERY[1:],
+            "destination": f"{EXPORT_PREFIX}/tenants/{tenant}/ad-config.json",
+        })
+    if admin:
+        rewrites.append({"source": "/admin", "destination": f"{EXPORT_PREFIX}/admin.html"})
+
+    rules = []
+    if redirects:
+        for banner in snapshot.placements.values():
+            for item in banner.items:
+                if item.click_url and not item.daily_clicks:
+                    rules.append({
+                        "source": banner.tracking_url(item), "destination": item.click_url, "statusCode": 302,
+                    })
+
+    headers = [
+        {"source": f"{EXPORT_PREFIX}/(.*)", "headers": EXPORT_HEADERS},
+        {"source": "/admin/static/(.*)", "headers": ADMIN_ASSET_HEADERS},
+    ]
+    return rewrites, rules, headers
+
+
+def _generated(entry):
+    """이전 내보내기가 만든 vercel.json 항목인지."""
+    return (
+        entry.get("destination", "").startswith(EXPORT_PREFIX + "/")
+        or entry.get("source", "").startswith(EXPORT_PREFIX + "/")
+        or (entry.get("source", "").startswith("/admin/static/") and "headers" in entry)
+        or ("statusCode" in entry and entry.get("source", "").startswith("/click/"))
+    )
+
+
+def merge_vercel(config, rewrites, redirects, headers):
+    """기존 vercel.json dict 에서 생성 항목을 지우고 새 규칙을 넣은 dict.
+
+    정적 rewrite 는 함수 rewrite 보다 앞에 둡니다 (위에서부터 첫 일치).
+    """
+    config = dict(config)
+    config["rewrites"] = rewrites + [r for r in config.get("rewrites", ()) if not _generated(r)]
+    kept = [r for r in config.get("redirects", ()) if not _generated(r)]
+    if kept or redirects:
+        config["redirects"] = kept + redirects
+    else:
+        config.pop("redirects", None)
+    config["headers"] = [h for h in config.get("headers", ()) if not _generated(h)] + headers
+    return config
+
+
+def _inline(value):
+    if isinstance(value, dict):
+        return "{ " + ", ".join(f"{json.dumps(k)}: {_inline(v)}" for k, v in value.items()) + " }"
+    if isinstance(value, list):
+        return "[" + ", ".join(_inline(v) for v in value) + "]"
+    return json.dumps(value, ensure_ascii=False)
+
+
+def format_vercel(config):
+    """기존 vercel.json 처럼 규칙 하나를 한 줄에 쓰는 JSON 텍스트."""
+    blocks = []
+    for key, value in config.items():
+        if isinstance(value, list):
+            lines = ",\n".join(f"    {_inline(entry)}" for entry in value)
+            blocks.append(f'  {json.dumps(key)}: [\n{lines}\n  ]')
+        elif isinstance(value, dict):
+            lines = ",\n".join(f"    {json.dumps(k)}: {_inline(v)}" for k, v in value.items())
+            blocks.append(f'  {json.dumps(key)}: {{\n{lines}\n  }}')
+        else:
+            blocks.append(f"  {json.dumps(key)}: {_inline(value)}")
+    return "{\n" + ",\n".join(blocks) + "\n}\n"
+
+
+def export(out_dir, vercel_path, admin=False, redirects=True, environ=None):
+    """정적 파일과 vercel.json 을 씁니다. (파일 수, redirect 수) 를 돌려줍니다."""
+    snapshot = SnapshotHolder(store_from_env(environ)).current()
+    export_dir = os.path.join(out_dir, EXPORT_PREFIX.lstrip("/"))
+    shutil.rmtree(export_dir, ignore_errors=True)
+    files = export_files(snapshot)
+    for relative, body in files.items():
+        path = os.path.join(out_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fp:
+            fp.write(body)
+
+    rewrites, rules, headers = export_rules(snapshot, admin, redirects)
+    with open(vercel_path) as fp:
+        config = json.load(fp)
+    config = merge_vercel(config, rewrites, rules, headers)
+    with open(vercel_path + ".tmp", "w") as fp:
+        fp.write(format_vercel(config))
+    os.replace(vercel_path + ".tmp", vercel_path)
+    return len(files), len(rules)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="광고 설정/클릭 리다이렉트/관리 페이지를 정적 파일로 내보냅니다")
+    parser.add_argument("--out", default=os.path.join(PROJECT_DIR, "public"), help="정적 파일 출력 디렉터리")
+    parser.add_argument("--vercel", default=os.path.join(PROJECT_DIR, "vercel.json"), help="갱신할 vercel.json")
+    parser.add_argument("--admin", action="store_true", help="/admin 도 내보낸 정적 페이지로 (클릭 수/CTR 은 0)")
+    parser.add_argument("--no-redirects", action="store_true", help="/click 슬롯 redirect 를 만들지 않음")
+    args = parser.parse_args(argv)
+    files, redirects = export(args.out, args.vercel, admin=args.admin, redirects=not args.no_redirects)
+    print(f"exported {files} files and {redirects} click redirects to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
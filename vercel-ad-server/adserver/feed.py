@@ -0,0 +1,177 @@
+"""폴링 클라이언트용 증분(delta) 설정 피드.
+
+revision 은 설정 문서(클릭 수 제외)의 내용 해시(blake2b)라서 프로세스
+재시작이나 다른 서버리스 인스턴스에서도 같은 문서면 같은 값입니다.
+문서가 바뀔 때마다 최근 ``depth`` 개 revision 의 문서를 보관합니다.
+클라이언트가 마지막으로 받은 revision 을 ``since`` 로 보내면
+
+- 같으면 ``{"unchanged": true}``
+- 보관 중이면 JSON Merge Patch(RFC 7386) 형식의 ``patch``
+- 너무 오래됐거나 모르는 값이면 ``full`` 문서
+
+를 돌려줍니다. ``wait()`` 로 새 revision 을 기다릴 수 있어 long-poll 과
+SSE 가 같은 경로를 씁니다. ASGI 에서는 ``wait_async()`` 가 스레드를 잡지
+않고 스냅샷 교체 신호(asyncio.Event)를 기다립니다.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from adserver.responses import dump_json
+
+
+def merge_patch(old, new):
+    """old 에 적용하면 new 가 되는 JSON Merge Patch. 리스트는 통째로 바꿉니다."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            patch[key] = merge_patch(old[key], value)
+    return patch
+
+
+def apply_patch(document, patch):
+    """merge_patch 의 역 (클라이언트 구현 참고용)."""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(document) if isinstance(document, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_patch(result.get(key), value)
+    return result
+
+
+class ConfigFeed:
+    """revision 별 설정 문서 이력과 since 응답 본문 캐시.
+
+    ``render(key)`` 는 (generation, 문서 dict) 를 돌려줍니다. key 는
+    PayloadCache 와 같은 방식으로 ``==`` 비교합니다.
+    """
+
+    def __init__(self, render, depth=16):
+        self._render = render
+        self.depth = depth
+        self.revision = None
+        self.generation = 0
+        self._key = None
+        self._history = OrderedDict()  # revision(내용 해시) → 문서
+        self._bodies = {}               # 해석된 since(현재/이력 revision, 전체는 None) → 응답 본문
+        self._condition = threading.Condition()
+        self._async_waiters = set()     # (이벤트 루프, asyncio.Event)
+
+    def refresh(self, key):
+        """key 가 바뀌었으면 문서를 다시 만들고, 내용이 달라졌으면 새 revision 으로 바꿉니다."""
+        if key == self._key:
+            return self.revision
+        with self._condition:
+            if key == self._key:
+                return self.revision
+            generation, document = self._render(key)
+            self._key = key
+            revision = document_revision(document)
+            if revision != self.revision:
+                self.revision = revision
+                self._history.pop(revision, None)
+                self._history[revision] = document
+                while len(self._history) > self.depth:
+                    self._history.popitem(last=False)
+                self._bodies = {}
+                self._condition.notify_all()
+            self.generation = generation
+        return self.revision
+
+    def notify(self, *_):
+        """대기 중인 long-poll/SSE 를 깨웁니다 (스냅샷 구독 리스너)."""
+        with self._condition:
+            self._condition.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def response(self, since):
+        """since revision 에 대한 응답 dict."""
+        revision = self.revision
+        data = {"revision": revision, "generation": self.generation}
+        if since == revision:
+            data["unchanged"] = True
+        elif since in self._history:
+            data["since"] = since
+            data["patch"] = merge_patch(self._history[since], self._history[revision])
+        else:
+            data["full"] = self._history[revision]
+        return data
+
+    def body(self, since):
+        """response(since) 의 JSON 바이트 (revision 이 바뀔 때까지 캐시).
+
+        캐시 키는 클라이언트가 보낸 값이 아니라 해석된 경우입니다. 모르는
+        since 는 모두 전체 문서 항목 하나를 같이 쓰므로 항목 수는 이력
+        깊이 + 1 을 넘지 않습니다.
+        """
+        key = since if since == self.revision or since in self._history else None
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._bodies[key] = dump_json(self.response(key))
+        return body
+
+    def wait(self, since, timeout, key_func):
+        """revision 이 since 와 달라지거나 timeout 이 지날 때까지 기다립니다.
+
+        기다리는 동안 1초마다 ``key_func()`` 로 새 key 를 확인합니다.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.refresh(key_func()) != since:
+                return self.revision
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self.revision
+            with self._condition:
+                self._condition.wait(min(1.0, remaining))
+
+    async def wait_async(self, since, timeout, key_func):
+        """wait() 의 asyncio 판. 스레드 풀을 쓰지 않고 notify() 신호나 1초 주기로 확인합니다."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiter = (loop, asyncio.Event())
+        with self._condition:
+            self._async_waiters.add(waiter)
+        try:
+            while True:
+                if self.refresh(key_func()) != since:
+                    return self.revision
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return self.revision
+                waiter[1].clear()
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), min(1.0, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
+
+
+def document_revision(document):
+    """문서의 내용 해시 revision (정렬된 키의 JSON 기준, 16자 hex)."""
+    text = json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def sse_event(feed, since):
+    """since 이후 변경을 담은 SSE 이벤트 바이트."""
+    data = json.dumps(feed.response(since), sort_keys=True, separators=(",", ":"))
+    return f"id: {feed.revision}\nevent: config\ndata: {data}\n\n".encode()
+
+
+SSE_KEEPALIVE = b": keepalive\n\n"
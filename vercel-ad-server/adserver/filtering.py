@@ -0,0 +1,195 @@
+"""클릭/이벤트 경로 앞단의 봇·남용 필터.
+
+요청 하나마다 싼 검사부터 차례로 합니다.
+
+1. User-Agent 거부 목록: 패턴들을 대소문자 무시 정규식 하나로 묶고,
+   같은 UA 문자열의 판정은 작은 캐시에 둡니다. 기본 목록은 단어 경계와
+   알려진 크롤러 이름이라 CUBOT 같은 기기 이름에는 걸리지 않습니다.
+2. IP 대역 거부 목록: CIDR 들을 접두사 길이별 정수 집합으로 컴파일해
+   주소 하나를 길이 종류 수만큼의 집합 조회로 판정합니다 (트라이를
+   길이별로 펼친 형태).
+3. 빈도 제한: 클라이언트 IP 별 슬라이딩 윈도우 카운터 (요청이 정하는
+   X-Client-Id 같은 값은 키로 쓰지 않음). 표는 ``max_keys`` 를 넘으면
+   가장 오래 안 쓴 키부터 지웁니다.
+
+거절된 요청은 본문을 읽거나 설정을 조회하기 전에 미리 만든 403/429
+응답으로 끝납니다.
+"""
+
+import ipaddress
+import re
+import threading
+from collections import OrderedDict
+
+from adserver.pacing import parse_cap
+from adserver.redirects import PreparedResponse
+
+# 판정 결과 (메트릭 라벨로도 씀)
+USER_AGENT = "user_agent"
+IP_RANGE = "ip_range"
+RATE = "rate"
+
+# 정규식 조각 (AD_FILTER_UA_DENY 로 준 값은 부분 문자열로 취급)
+DEFAULT_UA_DENY = (
+    r"\bbot\b", r"bot/", r"\bbot;", r"spider", r"crawler", r"\bcrawl", r"slurp", r"facebookexternalhit",
+    r"headlesschrome", r"phantomjs", r"curl/", r"wget/", r"scrapy", r"python-requests",
+)
+
+# UA 판정 캐시 상한 (넘으면 비움)
+UA_CACHE_SIZE = 4096
+
+FORBIDDEN = PreparedResponse(403, b"Forbidden", [("Content-Type", "text/plain; charset=utf-8")])
+RATE_LIMITED = PreparedResponse(429, b"Too Many Requests", [
+    ("Content-Type", "text/plain; charset=utf-8"),
+    ("Retry-After", "60"),
+])
+
+
+class UserAgentMatcher:
+    """정규식 조각 거부 목록. 빈 UA 도 거절합니다 (``deny_empty``).
+
+    ``literal`` 이면 패턴을 부분 문자열로 취급합니다.
+    """
+
+    def __init__(self, patterns, deny_empty=True, literal=False):
+        patterns = sorted({p.strip().lower() for p in patterns if p.strip()}, key=len, reverse=True)
+        if literal:
+            patterns = [re.escape(p) for p in patterns]
+        self._regex = re.compile("|".join(patterns), re.IGNORECASE) if patterns else None
+        self.deny_empty = deny_empty
+        self._cache = {}
+
+    def denied(self, user_agent):
+        if not user_agent:
+            return self.deny_empty
+        verdict = self._cache.get(user_agent)
+        if verdict is None:
+            verdict = self._regex is not None and self._regex.search(user_agent) is not None
+            if len(self._cache) >= UA_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[user_agent] = verdict
+        return verdict
+
+
+class IpPrefixMatcher:
+    """CIDR 거부 목록. IPv4/IPv6 각각 {접두사 길이: 네트워크 정수 집합}."""
+
+    def __init__(self, networks):
+        tables = {4: {}, 6: {}}
+        for network in networks:
+            network = ipaddress.ip_network(network.strip(), strict=False)
+            shift = network.max_prefixlen - network.prefixlen
+            tables[network.version].setdefault(shift, set()).add(int(network.network_address) >> shift)
+        # 짧은 접두사(넓은 대역)부터 검사: [(시프트, 네트워크 집합), ...]
+        self._levels = {
+            version: sorted(table.items(), key=lambda level: -level[0]) for version, table in tables.items()
+        }
+
+    def __bool__(self):
+        return any(self._levels.values())
+
+    def denied(self, address):
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        if ip.version == 6 and ip.ipv4_mapped is not None:
+            ip = ip.ipv4_mapped
+        value = int(ip)
+        for shift, networks in self._levels[ip.version]:
+            if value >> shift in networks:
+                return True
+        return False
+
+
+class SlidingWindowLimiter:
+    """키별 슬라이딩 윈도우 카운터 (직전 창 개수를 경과 비율만큼 가중).
+
+    표 항목은 [창 번호, 직전 창 개수, 현재 창 개수] 이고 LRU 로 ``max_keys`` 개까지.
+    """
+
+    def __init__(self, limit, window, max_keys=65536):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def allow(self, key, now):
+        """허용이면 세고 True, 한도를 넘었으면 세지 않고 False."""
+        index, offset = divmod(now, self.window)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [index, 0, 0]
+                if len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+                if entry[0] != index:
+                    entry[1] = entry[2] if index - entry[0] == 1 else 0
+                    entry[2] = 0
+                    entry[0] = index
+            if entry[1] * (1 - offset / self.window) + entry[2] >= self.limit:
+                return False
+            entry[2] += 1
+        return True
+
+
+class RequestFilter:
+    """UA → IP 대역 → 빈도 제한 순서로 검사합니다. 통과면 None, 아니면 사유."""
+
+    def __init__(self, user_agents, networks, limiter=None):
+        self.user_agents = user_agents
+        self.networks = networks
+        self.limiter = limiter
+
+    def check(self, address, user_agent, now):
+        if self.user_agents.denied(user_agent):
+            return USER_AGENT
+        if address and self.networks and self.networks.denied(address):
+            return IP_RANGE
+        if self.limiter is not None and not self.limiter.allow(address, now):
+            return RATE
+        return None
+
+
+def response_for(reason):
+    """거절 사유의 준비된 응답."""
+    return RATE_LIMITED if reason == RATE else FORBIDDEN
+
+
+def filters_from_env(environ):
+    """{"click": RequestFilter, "events": RequestFilter}. AD_FILTER=0 이면 빈 dict.
+
+    AD_FILTER_UA_DENY / AD_FILTER_IP_DENY 는 쉼표 구분 (UA 기본값은 흔한 봇 패턴),
+    AD_FILTER_CLICK_RATE / AD_FILTER_EVENT_RATE 는 "20/60s" 형식.
+    """
+    if environ.get("AD_FILTER", "1") == "0":
+        return {}
+    ua_deny = environ.get("AD_FILTER_UA_DENY")
+    if ua_deny is None:
+        user_agents = UserAgentMatcher(DEFAULT_UA_DENY)
+    else:
+        user_agents = UserAgentMatcher(ua_deny.split(","), literal=True)
+    networks = IpPrefixMatcher(n for n in environ.get("AD_FILTER_IP_DENY", "").split(",") if n.strip())
+    max_keys = int(environ.get("AD_FILTER_MAX_KEYS", "65536"))
+    filters = {}
+    for name, variable, default in (
+        ("click", "AD_FILTER_CLICK_RATE", "20/60s"),
+        ("events", "AD_FILTER_EVENT_RATE", "120/60s"),
+    ):
+        rate = parse_cap(environ.get(variable, default))
+        limiter = SlidingWindowLimiter(rate[0], rate[1], max_keys) if rate else None
+        filters[name] = RequestFilter(user_agents, networks, limiter)
+    return filters
+
+
+def client_address(forwarded_for, real_ip, remote_addr):
+    """프록시 헤더를 고려한 클라이언트 IP (Vercel 은 X-Forwarded-For 첫 주소)."""
+    if forwarded_for:
+        return forwarded_for.split(",", 1)[0].strip()
+    return real_ip or remote_addr
@@ -0,0 +1,178 @@
+"""배너 이미지 전처리: 크기/형식 변형(variant), 치수, LQIP 자리표시자.
+
+이미지 프록시(adserver.assets)가 원본을 받으면 프로세스 풀에서 900x100
+기준 1x/2x 크기로 잘라 WebP/AVIF/JPEG 로 다시 인코딩하고, 아주 작은
+흐린 JPEG data URI(LQIP)를 만듭니다. 요청 경로는 결과만 읽습니다.
+
+Pillow 는 선택 의존성입니다. 없으면 헤더만 읽어 원본 치수만 채우고
+변형은 만들지 않습니다. 이 Pillow 빌드가 인코딩하지 못하는 형식(예:
+AVIF)은 건너뜁니다.
+"""
+
+import base64
+import io
+import logging
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow 는 선택 의존성
+    Image = ImageOps = None
+
+logger = logging.getLogger("adserver")
+
+# 관리 페이지 가이드의 권장 배너 크기
+BASE_SIZE = (900, 100)
+SCALES = (1, 2)
+FORMATS = ("webp", "avif", "jpeg")
+FORMAT_MIMETYPES = {"webp": "image/webp", "avif": "image/avif", "jpeg": "image/jpeg"}
+QUALITY = {"webp": 80, "avif": 55, "jpeg": 82}
+
+LQIP_WIDTH = 24
+
+
+def image_size(body):
+    """PNG/GIF/JPEG/WebP 헤더에서 (width, height) 를 읽습니다. 모르면 None."""
+    if body[:8] == b"\x89PNG\r\n\x1a\n" and len(body) >= 24:
+        return struct.unpack(">II", body[16:24])
+    if body[:6] in (b"GIF87a", b"GIF89a") and len(body) >= 10:
+        return struct.unpack("<HH", body[6:10])
+    if body[:4] == b"RIFF" and body[8:12] == b"WEBP" and len(body) >= 30:
+        chunk = body[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", body[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(body[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(body[24:27], "little") + 1, int.from_bytes(body[27:30], "little") + 1
+        return None
+    if body[:2] == b"\xff\xd8":
+        offset = 2
+        while offset + 9 < len(body):
+            if body[offset] != 0xFF:
+                return None
+            marker = body[offset + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                offset += 2
+                continue
+            length = struct.unpack(">H", body[offset + 2:offset + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", body[offset + 5:offset + 9])
+                return width, height
+            offset += 2 + length
+    return None
+
+
+def process_image(body, base_size=BASE_SIZE, scales=SCALES, formats=FORMATS):
+    """원본 바이트로 변형들을 만듭니다 (프로세스 풀 워커에서 실행).
+
+    반환: {"width", "height", "placeholder", "variants": [(scale, format, w, h, bytes), ...]}
+    """
+    image = Image.open(io.BytesIO(body))
+    image.seek(0)
+    width, height = image.size
+    image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    flat = image
+    if image.mode == "RGBA":  # JPEG 용으로 흰 바탕에 합성
+        flat = Image.new("RGB", image.size, (255, 255, 255))
+        flat.paste(image, mask=image.getchannel("A"))
+
+    variants = []
+    for scale in scales:
+        target = (base_size[0] * scale, base_size[1] * scale)
+        if scale > 1 and (width < target[0] or height < target[1]):
+            continue  # 원본보다 큰 고해상도 변형은 만들지 않음
+        for fmt in formats:
+            source = flat if fmt == "jpeg" else image
+            resized = ImageOps.fit(source, target, Image.LANCZOS)
+            out = io.BytesIO()
+            try:
+                resized.save(out, fmt.upper(), quality=QUALITY[fmt])
+            except (KeyError, OSError, ValueError):
+                continue  # 이 Pillow 빌드가 지원하지 않는 형식
+            variants.append((scale, fmt, target[0], target[1], out.getvalue()))
+
+    tiny = ImageOps.fit(flat, (LQIP_WIDTH, max(1, LQIP_WIDTH * base_size[1] // base_size[0])), Image.BILINEAR)
+    out = io.BytesIO()
+    tiny.save(out, "JPEG", quality=40)
+    placeholder = "data:image/jpeg;base64," + base64.b64encode(out.getvalue()).decode()
+    return {"width": width, "height": height, "placeholder": placeholder, "variants": variants}
+
+
+class ImagePipeline:
+    """원본 해시별 전처리 결과를 만들고 보관합니다.
+
+    ``on_done(digest, info)`` 는 결과가 생길 때마다 호출됩니다. info 는
+    {"width", "height", "placeholder",
+    "variants": {"1x": {"webp": {"url", "width", "height"}, ...}, "2x": ...}}.
+    """
+
+    def __init__(self, cache, workers=2, on_done=None):
+        self.cache = cache
+        self.workers = workers
+        self.on_done = on_done
+        self.results = {}
+        self.sources = {}  # 변형 해시 → 원본 해시
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def submit(self, digest, body):
+        """원본 하나의 전처리를 예약합니다. 이미 했거나 진행 중이면 무시."""
+        with self._lock:
+            if digest in self.results or digest in self._pending:
+                return
+            self._pending.add(digest)
+        if not self.enabled:
+            # Pillow 없이: 헤더의 원본 치수만
+            size = image_size(body)
+            self._finish(digest, {"width": size[0], "height": size[1]} if size else {})
+            return
+        future = self._pool().submit(process_image, body)
+        future.add_done_callback(lambda future: self._collect(digest, future))
+
+    def _collect(self, digest, future):
+        try:
+            result = future.result()
+        except Exception as exc:
+            logger.warning("image preprocessing failed for %s: %s", digest, exc)
+            with self._lock:
+                self._pending.discard(digest)
+            return
+        variants = {}
+        for scale, fmt, width, height, data in result["variants"]:
+            variant = self.cache.put(data, FORMAT_MIMETYPES[fmt])
+            self.sources[variant] = digest
+            variants.setdefault(f"{scale}x", {})[fmt] = {
+                "url": f"/asset/{variant}", "width": width, "height": height,
+            }
+        self._finish(digest, {
+            "width": result["width"], "height": result["height"],
+            "placeholder": result["placeholder"], "variants": variants,
+        })
+
+    def _finish(self, digest, info):
+        with self._lock:
+            self._pending.discard(digest)
+            self.results[digest] = info
+        if self.on_done is not None:
+            self.on_done(digest, info)
+
+    def forget(self, digest):
+        """변형이 캐시에서 지워졌을 때 다시 만들 수 있도록 결과를 버립니다."""
+        with self._lock:
+            self.results.pop(digest, None)
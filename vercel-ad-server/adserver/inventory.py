@@ -0,0 +1,63 @@
+"""테넌트/게재 위치/로케일/플랫폼 인벤토리 인덱스.
+
+설정 세대마다 (tenant, placement, locale, platform) 키로 후보 소재와
+로테이션을 미리 나눠 두어, 인벤토리가 수천 개로 늘어나도 요청당 비용은
+dict 조회 몇 번으로 일정합니다. 로케일/플랫폼 제한이 없는 소재는 모든
+버킷에 들어가고, ``"*"`` 버킷에는 제한 없는 소재만 들어갑니다.
+"""
+
+from adserver.rotation import BannerRotation, encode_selection
+
+ANY = "*"
+
+
+def _matches(tags, value):
+    return not tags or value in tags
+
+
+class InventoryIndex:
+    """(tenant, placement, locale, platform) → BannerRotation."""
+
+    __slots__ = ("_buckets", "size")
+
+    def __init__(self, banners, generation):
+        buckets = {}
+        size = 0
+        for banner in banners:
+            size += len(banner.items)
+            bodies = {item.id: encode_selection(banner, item, generation) for item in banner.items}
+            locales = {ANY}.union(*(item.locales for item in banner.items))
+            platforms = {ANY}.union(*(item.platforms for item in banner.items))
+            for locale in locales:
+                for platform in platforms:
+                    items = [
+                        item for item in banner.items
+                        if _matches(item.locales, locale) and _matches(item.platforms, platform)
+                    ]
+                    buckets[(banner.tenant, banner.position, locale, platform)] = BannerRotation(
+                        banner, generation, items, bodies,
+                    )
+        self._buckets = buckets
+        self.size = size
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def resolve(self, tenant, placement, locale=None, platform=None):
+        """요청 속성에 가장 구체적으로 맞는 로테이션. 없는 위치면 None.
+
+        로케일은 "ko-KR" → "ko" → "*", 플랫폼은 지정값 → "*" 순으로 찾습니다.
+        """
+        buckets = self._buckets
+        locale = locale.lower() if locale else ANY
+        platform = platform.lower() if platform else ANY
+        locale_keys = (locale, locale.split("-", 1)[0], ANY) if "-" in locale else (locale, ANY)
+        for loc in locale_keys:
+            rotation = buckets.get((tenant, placement, loc, platform))
+            if rotation is not None:
+                return rotation
+            if platform != ANY:
+                rotation = buckets.get((tenant, placement, loc, ANY))
+                if rotation is not None:
+                    return rotation
+        return None
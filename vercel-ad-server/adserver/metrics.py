@@ -0,0 +1,159 @@
+"""라우트별 지연 시간 히스토그램과 Prometheus 텍스트 내보내기.
+
+요청 경로에서는 현재 스레드 전용 샤드의 정수만 증가시키므로 락이
+필요 없습니다. /metrics 를 읽을 때 모든 샤드를 합산하고, 끝난 스레드의
+샤드는 은퇴 집계 하나로 접어 목록에서 뺍니다.
+"""
+
+import bisect
+import threading
+import time
+
+from flask import Response, request
+
+# 초 단위 고정 버킷 (마지막 +Inf 는 암묵적)
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Shard:
+    __slots__ = ("histograms", "statuses", "counters", "thread")
+
+    def __init__(self, thread=None):
+        # route -> [bucket counts..., +Inf count, sum]
+        self.histograms = {}
+        # (route, status) -> count
+        self.statuses = {}
+        # (name, labels) -> count
+        self.counters = {}
+        # 기록하는 스레드 (은퇴 집계는 None)
+        self.thread = thread
+
+    def merge(self, other, size):
+        """other 샤드의 값을 이 샤드에 더합니다."""
+        for route, hist in list(other.histograms.items()):
+            total = self.histograms.setdefault(route, [0] * (size - 1) + [0.0])
+            for i, value in enumerate(hist):
+                total[i] += value
+        for key, count in list(other.statuses.items()):
+            self.statuses[key] = self.statuses.get(key, 0) + count
+        for key, count in list(other.counters.items()):
+            self.counters[key] = self.counters.get(key, 0) + count
+
+
+class MetricsRegistry:
+    """스레드별 샤드에 기록하고 내보낼 때 합산하는 메트릭 저장소."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards = []
+        # 끝난 스레드들의 샤드를 합친 값 (_lock 아래에서만 바뀜)
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+        self._gauges = {}
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, route, status, seconds):
+        """요청 하나의 지연 시간과 상태 코드를 기록합니다."""
+        shard = self._shard()
+        hist = shard.histograms.get(route)
+        if hist is None:
+            hist = shard.histograms[route] = [0] * (len(self.buckets) + 1) + [0.0]
+        hist[bisect.bisect_left(self.buckets, seconds)] += 1
+        hist[-1] += seconds
+        key = (route, status)
+        shard.statuses[key] = shard.statuses.get(key, 0) + 1
+
+    def inc(self, name, labels=(), amount=1):
+        """이름/라벨별 카운터를 증가시킵니다. labels 는 ((key, value), ...) 튜플."""
+        shard = self._shard()
+        key = (name, labels)
+        shard.counters[key] = shard.counters.get(key, 0) + amount
+
+    def gauge(self, name, func, help_text=""):
+        """내보낼 때 ``func()`` 값을 읽는 게이지를 등록합니다."""
+        self._gauges[name] = (func, help_text)
+
+    def collect(self):
+        """모든 샤드를 합산한 (histograms, statuses, counters)."""
+        size = len(self.buckets) + 2
+        total = _Shard()
+        with self._lock:
+            # 끝난 스레드는 더 쓰지 않으므로 은퇴 집계로 접어도 안전합니다
+            live = []
+            for shard in self._shards:
+                if shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    self._retired.merge(shard, size)
+            self._shards = live
+            total.merge(self._retired, size)
+        for shard in live:
+            total.merge(shard, size)
+        return total.histograms, total.statuses, total.counters
+
+    def render(self):
+        """Prometheus 텍스트 형식으로 직렬화합니다."""
+        histograms, statuses, counters = self.collect()
+        lines = [
+            "# HELP adserver_request_duration_seconds Request latency by route.",
+            "# TYPE adserver_request_duration_seconds histogram",
+        ]
+        for route in sorted(histograms):
+            hist = histograms[route]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), hist[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'adserver_request_duration_seconds_bucket{{route="{route}",le="{le}"}} {cumulative}')
+            lines.append(f'adserver_request_duration_seconds_sum{{route="{route}"}} {hist[-1]:.6f}')
+            lines.append(f'adserver_request_duration_seconds_count{{route="{route}"}} {cumulative}')
+        lines.append("# HELP adserver_requests_total Requests by route and status code.")
+        lines.append("# TYPE adserver_requests_total counter")
+        for (route, status), count in sorted(statuses.items()):
+            lines.append(f'adserver_requests_total{{route="{route}",status="{status}"}} {count}')
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (counter_name, labels), count in sorted(counters.items()):
+                if counter_name == name:
+                    label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+                    lines.append(f"{name}{{{label_text}}} {count}" if label_text else f"{name} {count}")
+        for name, (func, help_text) in sorted(self._gauges.items()):
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {func()}")
+        return "\n".join(lines) + "\n"
+
+
+def install(app, registry):
+    """Flask 앱의 모든 요청을 registry 에 기록하고 /metrics 라우트를 추가합니다."""
+    perf_counter = time.perf_counter
+
+    @app.before_request
+    def _metrics_start():
+        request.environ["adserver.started"] = perf_counter()
+
+    @app.after_request
+    def _metrics_observe(response):
+        started = request.environ.get("adserver.started")
+        if started is not None:
+            registry.observe(request.endpoint or "unmatched", response.status_code, perf_counter() - started)
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+    return registry
@@ -0,0 +1,515 @@
+"""사용자별 노출 빈도 제한(frequency cap)과 소재별 일일 노출/클릭 페이싱.
+
+요청 경로는 프로세스 안의 상태만 읽고 씁니다.
+
+- 빈도 제한: 창(window)을 여러 시간 버킷으로 나눈 count-min 스케치 링.
+  "사용자 × 소재" 키가 아무리 많아도 메모리는 창마다 고정 크기입니다.
+- 일일 예산: 소재/일 단위 정수 카운터.
+
+공유 상태가 필요하면 백그라운드 동기화가 일정 간격으로 로컬 증가분을
+백엔드(프로세스 메모리 또는 Redis 프로토콜 저장소)에 한 번에 보내고
+전역 값을 받아옵니다. 요청마다 네트워크 왕복은 없습니다.
+
+소재 설정:
+
+    {"frequency_cap": "3/24h", "daily_impressions": 10000, "daily_clicks": 200}
+"""
+
+import array
+import atexit
+import hashlib
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from urllib.parse import unquote, urlparse
+
+from adserver.targeting import UTC_OFFSET_HOURS
+
+logger = logging.getLogger("adserver")
+
+# 일일 예산을 하루에 고르게 나눌 때 허용하는 앞당김 (하루의 비율)
+PACING_SLACK = 0.05
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_cap(value):
+    """"3/24h" → (3, 86400). 빈 값이면 None."""
+    if not value:
+        return None
+    count, _, window = str(value).partition("/")
+    window = window.strip().lower() or "24h"
+    unit = _UNITS.get(window[-1])
+    try:
+        seconds = float(window[:-1] or 1) * unit if unit else float(window)
+        count = int(count)
+    except ValueError:
+        raise ValueError(f"invalid frequency_cap: {value!r}") from None
+    if count < 1 or seconds <= 0:
+        raise ValueError(f"invalid frequency_cap: {value!r}")
+    return count, int(seconds)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 백엔드
+# ═══════════════════════════════════════════════════════════════════════
+
+class MemoryBackend:
+    """프로세스 안에서만 공유하는 백엔드 (기본값)."""
+
+    def __init__(self):
+        self._counters = {}
+        self._cells = {}
+        self._lock = threading.Lock()
+
+    def exchange(self, counters, cells, counter_keys, cell_keys, ttl):
+        """증가분을 반영하고 요청한 키들의 전역 값을 돌려줍니다.
+
+        counters: {key: delta}, cells: {key: (size, {index: delta})},
+        반환: ({key: total}, {key: array('I')}).
+        """
+        with self._lock:
+            for key, delta in counters.items():
+                self._counters[key] = self._counters.get(key, 0) + delta
+            for key, (size, deltas) in cells.items():
+                values = self._cells.get(key)
+                if values is None:
+                    values = self._cells[key] = array.array("I", bytes(4 * size))
+                for index, delta in deltas.items():
+                    values[index] = min(values[index] + delta, 0xFFFFFFFF)
+            return (
+                {key: self._counters.get(key, 0) for key in counter_keys},
+                {key: array.array("I", self._cells[key]) for key, _ in cell_keys if key in self._cells},
+            )
+
+
+class RedisBackend:
+    """Redis 프로토콜 저장소 백엔드.
+
+    동기화 한 번이 파이프라인 한 번입니다. 일일 카운터는 INCRBY/MGET,
+    스케치 버킷은 u32 배열 문자열(BITFIELD INCRBY / GET)로 저장합니다.
+    ``connection`` 은 ``pipeline(commands) -> replies`` 를 가진 객체로,
+    테스트에서는 FakeRedis 로 바꿔 끼울 수 있습니다.
+    """
+
+    def __init__(self, connection, prefix="adserver:pacing:"):
+        self.connection = connection
+        self.prefix = prefix
+
+    def exchange(self, counters, cells, counter_keys, cell_keys, ttl):
+        p = self.prefix
+        commands = []
+        for key, delta in counters.items():
+            commands.append(("INCRBY", p + key, delta))
+            commands.append(("EXPIRE", p + key, ttl))
+        for key, (size, deltas) in cells.items():
+            command = ["BITFIELD", p + key, "OVERFLOW", "SAT"]
+            for index, delta in sorted(deltas.items()):
+                command += ["INCRBY", "u32", f"#{index}", delta]
+            commands.append(tuple(command))
+            commands.append(("EXPIRE", p + key, ttl))
+        counter_keys = list(counter_keys)
+        if counter_keys:
+            commands.append(("MGET",) + tuple(p + key for key in counter_keys))
+        for key, _ in cell_keys:
+            commands.append(("GET", p + key))
+        replies = self.connection.pipeline(commands)
+
+        cell_replies = replies[len(replies) - len(cell_keys):] if cell_keys else []
+        totals = {}
+        if counter_keys:
+            values = replies[len(replies) - len(cell_keys) - 1]
+            totals = {key: int(value or 0) for key, value in zip(counter_keys, values)}
+        arrays = {}
+        for (key, size), raw in zip(cell_keys, cell_replies):
+            if raw is not None:
+                arrays[key] = _u32_array(raw, size)
+        return totals, arrays
+
+
+def _u32_array(raw, size):
+    """BITFIELD u32 문자열(빅엔디언) → 길이 size 의 array('I')."""
+    raw = bytes(raw[:4 * size]).ljust(4 * size, b"\0")
+    values = array.array("I", raw)
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values
+
+
+class RespConnection:
+    """최소한의 RESP2 클라이언트 (파이프라인 전용, 외부 의존성 없음)."""
+
+    def __init__(self, host="localhost", port=6379, db=0, password=None, timeout=1.0):
+        self.address = (host, port)
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+
+    @classmethod
+    def from_url(cls, url):
+        parsed = urlparse(url)
+        return cls(
+            parsed.hostname or "localhost", parsed.port or 6379,
+            int(parsed.path.lstrip("/") or 0),
+            unquote(parsed.password) if parsed.password else None,
+        )
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        self._sock, self._file = sock, sock.makefile("rb")
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._send(setup)
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = self._file = None
+
+    @staticmethod
+    def _encode(command):
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RuntimeError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise ConnectionError(f"unexpected reply: {line!r}")
+
+    def _send(self, commands):
+        self._sock.sendall(b"".join(self._encode(command) for command in commands))
+        return [self._read() for _ in commands]
+
+    def pipeline(self, commands):
+        if self._sock is None:
+            self._connect()
+        try:
+            return self._send(commands)
+        except Exception:
+            self.close()
+            raise
+
+
+class FakeRedis:
+    """RespConnection 대신 쓰는 인메모리 가짜 (INCRBY/MGET/GET/BITFIELD/EXPIRE).
+
+    테스트와 로컬 개발에서 Redis 없이 RedisBackend 경로를 그대로 돌립니다.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.commands = []
+
+    def pipeline(self, commands):
+        self.commands.extend(commands)
+        return [getattr(self, "_" + command[0].lower())(*command[1:]) for command in commands]
+
+    def _incrby(self, key, amount):
+        value = int(self.data.get(key, 0)) + int(amount)
+        self.data[key] = str(value).encode()
+        return value
+
+    def _mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _expire(self, key, seconds):
+        self.expiry[key] = int(seconds)
+        return 1
+
+    def _bitfield(self, key, *args):
+        data = bytearray(self.data.get(key, b""))
+        replies = []
+        i = 0
+        while i < len(args):
+            if args[i] == "OVERFLOW":
+                i += 2
+                continue
+            assert args[i] == "INCRBY" and args[i + 1] == "u32"
+            offset = 4 * int(args[i + 2].lstrip("#"))
+            if len(data) < offset + 4:
+                data.extend(bytes(offset + 4 - len(data)))
+            value = min(int.from_bytes(data[offset:offset + 4], "big") + int(args[i + 3]), 0xFFFFFFFF)
+            data[offset:offset + 4] = value.to_bytes(4, "big")
+            replies.append(value)
+            i += 4
+        self.data[key] = bytes(data)
+        return replies
+
+
+def backend_from_env(environ=None):
+    """AD_PACING_REDIS (redis://host:port/db) 가 있으면 Redis, 없으면 메모리 백엔드."""
+    environ = os.environ if environ is None else environ
+    url = environ.get("AD_PACING_REDIS")
+    if url:
+        return RedisBackend(RespConnection.from_url(url))
+    return MemoryBackend()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# count-min 스케치 링
+# ═══════════════════════════════════════════════════════════════════════
+
+class _Cells:
+    """동기화된 기준값 + 전송 중 + 아직 안 보낸 증가분."""
+
+    __slots__ = ("base", "inflight", "pending")
+
+    def __init__(self, size):
+        self.base = array.array("I", bytes(4 * size))
+        self.inflight = {}
+        self.pending = {}
+
+    def value(self, index):
+        return self.base[index] + self.inflight.get(index, 0) + self.pending.get(index, 0)
+
+
+class RingSketch:
+    """창 하나를 ``buckets`` 개의 시간 버킷으로 나눈 count-min 스케치 링.
+
+    추정치는 실제 횟수 이상(과대 추정만)이라 빈도 제한이 느슨해지는 일은
+    없습니다. 창 경계는 버킷 하나 크기만큼 보수적으로 잡힙니다.
+    """
+
+    def __init__(self, window, buckets=12, width=2048, depth=4):
+        self.window = window
+        self.buckets = buckets
+        self.span = window / buckets
+        self.width = width
+        self.depth = depth
+        self.size = width * depth
+        self.slots = {}
+
+    def cells(self, key):
+        h = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        width = self.width
+        return [d * width + (h1 + d * h2) % width for d in range(self.depth)]
+
+    def epoch(self, now):
+        return int(now // self.span)
+
+    def slot(self, epoch):
+        cells = self.slots.get(epoch)
+        if cells is None:
+            cells = self.slots[epoch] = _Cells(self.size)
+        return cells
+
+    def add(self, key, now, amount=1):
+        pending = self.slot(self.epoch(now)).pending
+        for index in self.cells(key):
+            pending[index] = pending.get(index, 0) + amount
+
+    def estimate(self, key, now):
+        indexes = self.cells(key)
+        current = self.epoch(now)
+        total = 0
+        for epoch in range(current - self.buckets + 1, current + 1):
+            cells = self.slots.get(epoch)
+            if cells is not None:
+                total += min(cells.value(index) for index in indexes)
+        return total
+
+    def live_epochs(self, now):
+        """창 안의 버킷 번호들. 지난 버킷은 버리고, 없는 버킷은 만들어 둡니다."""
+        current = self.epoch(now)
+        for epoch in list(self.slots):
+            if epoch <= current - self.buckets:
+                del self.slots[epoch]
+        epochs = range(current - self.buckets + 1, current + 1)
+        for epoch in epochs:
+            self.slot(epoch)
+        return list(epochs)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 페이싱 컨트롤러
+# ═══════════════════════════════════════════════════════════════════════
+
+class PacingController:
+    """빈도 제한/일일 예산 판정과 로컬 증가분의 주기적 동기화."""
+
+    def __init__(self, backend, sync_interval=2.0, slack=PACING_SLACK, utc_offset_hours=UTC_OFFSET_HOURS):
+        self.backend = backend
+        self.sync_interval = sync_interval
+        self.slack = slack
+        self.offset = utc_offset_hours * 3600
+        self.sketches = {}
+        self._counters = {}  # (kind, item_id, day) → _Cells(1)
+        self._click_budgeted = frozenset()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def update(self, snapshot):
+        """스냅샷 교체 시 클릭 예산이 있는 소재 목록을 갱신합니다 (구독 리스너)."""
+        self._click_budgeted = frozenset(
+            item.id for banner in snapshot.placements.values() for item in banner.items
+            if item.daily_clicks
+        )
+
+    def _day(self, now):
+        return int((now + self.offset) // 86400)
+
+    def _counter(self, kind, item_id, day):
+        key = (kind, item_id, day)
+        cells = self._counters.get(key)
+        if cells is None:
+            with self._lock:
+                cells = self._counters.setdefault(key, _Cells(1))
+        return cells
+
+    def _sketch(self, window):
+        sketch = self.sketches.get(window)
+        if sketch is None:
+            with self._lock:
+                sketch = self.sketches.setdefault(window, RingSketch(window))
+        return sketch
+
+    def allows(self, item, user, now):
+        """지금 이 사용자에게 소재를 노출해도 되면 True."""
+        if item.frequency_cap is not None and user:
+            count, window = item.frequency_cap
+            if self._sketch(window).estimate(f"{user}\0{item.id}", now) >= count:
+                return False
+        if item.daily_impressions or item.daily_clicks:
+            day = self._day(now)
+            if item.daily_clicks and self._counter("click", item.id, day).value(0) >= item.daily_clicks:
+                return False
+            if item.daily_impressions:
+                # 하루 경과 비율만큼만 예산을 열어 고르게 소진
+                elapsed = ((now + self.offset) % 86400) / 86400
+                budget = item.daily_impressions * min(1.0, elapsed + self.slack)
+                if self._counter("impression", item.id, day).value(0) >= budget:
+                    return False
+        return True
+
+    def record_impression(self, item, user, now):
+        """노출 한 번을 로컬에 기록합니다 (페이싱 설정이 없는 소재는 무시)."""
+        if not item.paced:
+            return
+        sketch = self._sketch(item.frequency_cap[1]) if item.frequency_cap is not None and user else None
+        counter = self._counter("impression", item.id, self._day(now)) if item.daily_impressions else None
+        with self._lock:
+            if sketch is not None:
+                sketch.add(f"{user}\0{item.id}", now)
+            if counter is not None:
+                counter.pending[0] = counter.pending.get(0, 0) + 1
+        self._ensure_started()
+
+    def record_click(self, item_id, now):
+        """클릭 한 번을 로컬에 기록합니다 (일일 클릭 예산이 있는 소재만)."""
+        if item_id not in self._click_budgeted:
+            return
+        counter = self._counter("click", item_id, self._day(now))
+        with self._lock:
+            counter.pending[0] = counter.pending.get(0, 0) + 1
+        self._ensure_started()
+
+    def sync(self, now=None):
+        """로컬 증가분을 백엔드에 보내고 전역 값으로 기준값을 갱신합니다."""
+        now = time.time() if now is None else now
+        with self._sync_lock:
+            today = self._day(now)
+            with self._lock:
+                for key in [key for key in self._counters if key[2] < today - 1]:
+                    del self._counters[key]
+                counters = {}
+                counter_keys = {}
+                for key, cells in self._counters.items():
+                    cells.inflight, cells.pending = cells.pending, {}
+                    name = "%s:%s:%s" % key
+                    counter_keys[name] = cells
+                    if cells.inflight:
+                        counters[name] = cells.inflight[0]
+                sketch_cells = {}
+                cell_keys = {}
+                for window, sketch in self.sketches.items():
+                    for epoch in sketch.live_epochs(now):
+                        cells = sketch.slots[epoch]
+                        cells.inflight, cells.pending = cells.pending, {}
+                        name = f"fc:{window}:{epoch}"
+                        cell_keys[name] = (sketch.size, cells)
+                        if cells.inflight:
+                            sketch_cells[name] = (sketch.size, cells.inflight)
+            try:
+                totals, arrays = self.backend.exchange(
+                    counters, sketch_cells, list(counter_keys),
+                    [(name, size) for name, (size, _) in cell_keys.items()], ttl=2 * 86400,
+                )
+            except Exception:
+                # 보내지 못한 증가분은 다음 동기화 때 다시 보냅니다
+                with self._lock:
+                    for cells in list(counter_keys.values()) + [c for _, c in cell_keys.values()]:
+                        for index, delta in cells.inflight.items():
+                            cells.pending[index] = cells.pending.get(index, 0) + delta
+                        cells.inflight = {}
+                raise
+            with self._lock:
+                for name, cells in counter_keys.items():
+                    cells.base[0] = min(totals.get(name, cells.base[0]), 0xFFFFFFFF)
+                    cells.inflight = {}
+                for name, (_, cells) in cell_keys.items():
+                    if name in arrays:
+                        cells.base = arrays[name]
+                    cells.inflight = {}
+
+    def _ensure_started(self):
+        if self._thread is None and self.sync_interval > 0:
+            self.start()
+
+    def start(self):
+        with self._sync_lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._run, name="ad-pacing-sync", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        try:
+            self.sync()
+        except Exception:
+            logger.exception("pacing sync failed at shutdown")
+
+    def _run(self):
+        while not self._stopped.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception:  # 백엔드 오류로 동기화 스레드가 죽지 않도록
+                logger.exception("pacing sync failed")
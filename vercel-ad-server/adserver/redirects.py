@@ -0,0 +1,67 @@
+"""클릭 리다이렉트 테이블.
+
+(tenant, position, index) 를 키로 미리 만들어 둔 302 응답 재료를 들고 있어
+클릭 요청마다 설정을 다시 읽거나 범위를 검사하지 않습니다.
+"""
+
+from html import escape
+
+from flask import Response
+from werkzeug.urls import iri_to_uri
+
+
+class PreparedResponse:
+    """요청마다 Response 객체만 새로 감싸면 되는 고정 응답."""
+
+    __slots__ = ("status", "body", "headers", "item_id")
+
+    def __init__(self, status, body, headers, item_id=None):
+        self.status = status
+        self.body = body
+        self.headers = tuple(headers)
+        self.item_id = item_id
+
+    def to_response(self):
+        # Response 는 after_request 훅이 수정할 수 있으므로 매번 새로 만듭니다
+        return Response(self.body, status=self.status, headers=self.headers)
+
+
+def prepare_redirect(location, code=302, item_id=None):
+    """werkzeug.utils.redirect 와 같은 본문/헤더를 한 번만 만들어 둡니다."""
+    html_location = escape(location)
+    body = (
+        "<!doctype html>\n"
+        "<html lang=en>\n"
+        "<title>Redirecting...</title>\n"
+        "<h1>Redirecting...</h1>\n"
+        "<p>You should be redirected automatically to the target URL: "
+        f'<a href="{html_location}">{html_location}</a>. If not, click the link.\n'
+    ).encode()
+    return PreparedResponse(code, body, [
+        ("Content-Type", "text/html; charset=utf-8"),
+        # WSGI/ASGI 어디서든 latin-1 헤더로 보낼 수 있게 미리 URI 로 변환
+        ("Location", iri_to_uri(location)),
+    ], item_id)
+
+
+NOT_FOUND = PreparedResponse(404, b"Link not found", [("Content-Type", "text/html; charset=utf-8")])
+
+
+class RedirectTable:
+    """(tenant, position, index) → 준비된 리다이렉트 응답."""
+
+    __slots__ = ("_routes",)
+
+    def __init__(self, banners):
+        self._routes = {
+            (banner.tenant, banner.position, item.index): prepare_redirect(item.click_url, item_id=item.id)
+            for banner in banners
+            for item in banner.items
+        }
+
+    def __len__(self):
+        return len(self._routes)
+
+    def lookup(self, position, index, tenant="default"):
+        """준비된 응답을 반환합니다. 없는 슬롯이면 고정 404 응답."""
+        return self._routes.get((tenant, position, index), NOT_FOUND)
@@ -0,0 +1,361 @@
+"""노출/클릭 리포트용 추가 전용(append-only) 컬럼 저장소.
+
+행은 (ts, kind, item, placement, count, value) 이고 컬럼마다 ``array`` 에
+쌓습니다. 소재 id 와 게재 위치 문자열은 사전(dictionary) 인코딩해 정수
+코드로 저장합니다. 활성 세그먼트가 ``segment_rows`` 행을 채우면 봉인하고,
+``directory`` 가 있으면 세그먼트 파일(JSON 헤더 한 줄 + 컬럼 바이트)로
+씁니다. 세그먼트마다 최소/최대 ts 를 보관해 조회 범위 밖의 세그먼트는
+읽지 않습니다.
+
+group-by 는 NumPy 가 있으면 벡터 연산(np.unique + np.bincount)으로,
+없으면 순수 파이썬 루프로 계산합니다.
+"""
+
+import array
+import json
+import os
+import sys
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 없이도 동작 (순수 파이썬 group-by)
+    np = None
+
+KIND_CODES = {"impression": 0, "click": 1, "view": 2}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+
+# (컬럼 이름, array typecode)
+COLUMNS = (
+    ("ts", "q"),
+    ("kind", "B"),
+    ("item", "I"),
+    ("placement", "I"),
+    ("count", "I"),
+    ("value", "Q"),
+)
+
+DIMENSIONS = ("item", "placement", "hour", "day")
+
+# 컬럼 타입의 범위 ("q", "I", "Q")
+MAX_TS = 2 ** 63 - 1
+MAX_COUNT = 2 ** 32 - 1
+MAX_VALUE = 2 ** 64 - 1
+
+
+class ReportError(ValueError):
+    """잘못된 리포트 조회 인자."""
+
+
+def _clamp(value, limit):
+    return min(max(int(value), 0), limit)
+
+
+def _row(ts, kind, item_id, placement="", count=1, value=0):
+    """컬럼 타입에 맞게 검증/범위 제한한 행. kind 를 모르면 ValueError."""
+    code = KIND_CODES.get(kind)
+    if code is None:
+        raise ValueError(f"unknown report kind: {kind!r}")
+    return (
+        min(max(int(ts), -MAX_TS), MAX_TS), code, str(item_id), str(placement),
+        _clamp(count, MAX_COUNT), _clamp(value, MAX_VALUE),
+    )
+
+
+class Segment:
+    """컬럼 배열 묶음과 ts 최소/최대값. 파일 세그먼트는 처음 조회할 때 읽습니다."""
+
+    def __init__(self, columns=None, rows=0, min_ts=None, max_ts=None, path=None, offset=0,
+                 byteorder=sys.byteorder):
+        self._columns = columns
+        self.rows = rows
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+        self.path = path
+        self._offset = offset
+        self._byteorder = byteorder
+
+    @classmethod
+    def empty(cls):
+        return cls({name: array.array(code) for name, code in COLUMNS})
+
+    @classmethod
+    def open(cls, path):
+        """헤더만 읽어 지연 로드 세그먼트를 만듭니다."""
+        with open(path, "rb") as fp:
+            header = fp.readline()
+        meta = json.loads(header)
+        return cls(rows=meta["rows"], min_ts=meta["min_ts"], max_ts=meta["max_ts"], path=path,
+                   offset=len(header), byteorder=meta["byteorder"])
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            columns = {}
+            with open(self.path, "rb") as fp:
+                fp.seek(self._offset)
+                for name, code in COLUMNS:
+                    values = array.array(code)
+                    values.fromfile(fp, self.rows)
+                    if self._byteorder != sys.byteorder:
+                        values.byteswap()
+                    columns[name] = values
+            self._columns = columns
+        return self._columns
+
+    def overlaps(self, start, end):
+        return self.rows and (end is None or self.min_ts < end) and (start is None or self.max_ts >= start)
+
+    def write(self, path):
+        header = json.dumps({
+            "rows": self.rows, "min_ts": self.min_ts, "max_ts": self.max_ts,
+            "byteorder": sys.byteorder, "columns": COLUMNS,
+        }).encode() + b"\n"
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fp:
+            fp.write(header)
+            for name, _ in COLUMNS:
+                self.columns[name].tofile(fp)
+        os.replace(tmp, path)
+        self.path = path
+
+
+class EventStore:
+    """추가 전용 컬럼 이벤트 저장소."""
+
+    def __init__(self, directory=None, segment_rows=65536):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.version = 0
+        self._lock = threading.Lock()
+        self._items = []
+        self._item_codes = {}
+        self._placements = []
+        self._placement_codes = {}
+        self._sealed = []
+        self._active = Segment.empty()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    # ── 저장 ──────────────────────────────────────────────────────────
+
+    def _load(self):
+        path = os.path.join(self.directory, "dictionary.json")
+        if os.path.exists(path):
+            with open(path) as fp:
+                dictionary = json.load(fp)
+            self._items = dictionary["items"]
+            self._placements = dictionary["placements"]
+            self._item_codes = {value: code for code, value in enumerate(self._items)}
+            self._placement_codes = {value: code for code, value in enumerate(self._placements)}
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith("segment-") and name.endswith(".col"):
+                self._sealed.append(Segment.open(os.path.join(self.directory, name)))
+
+    def _code(self, value, codes, values):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, ts, kind, item_id, placement="", count=1, value=0):
+        """행 하나를 활성 세그먼트에 추가합니다."""
+        self.append_many(((ts, kind, item_id, placement, count, value),))
+
+    def append_many(self, rows):
+        """(ts, kind, item_id, placement, count, value) 행들을 한 번의 락으로 추가합니다.
+
+        모든 필드를 먼저 검증/범위 제한한 뒤에 컬럼에 넣으므로, 잘못된 행
+        때문에 컬럼 길이가 어긋나는 일은 없습니다 (잘못된 kind 는 ValueError).
+        """
+        prepared = [_row(*row) for row in rows]
+        with self._lock:
+            for ts, kind, item_id, placement, count, value in prepared:
+                active = self._active
+                columns = active.columns
+                item = self._code(item_id, self._item_codes, self._items)
+                place = self._code(placement, self._placement_codes, self._placements)
+                columns["ts"].append(ts)
+                columns["kind"].append(kind)
+                columns["item"].append(item)
+                columns["placement"].append(place)
+                columns["count"].append(count)
+                columns["value"].append(value)
+                active.rows += 1
+                if active.min_ts is None or ts < active.min_ts:
+                    active.min_ts = ts
+                if active.max_ts is None or ts > active.max_ts:
+                    active.max_ts = ts
+                if active.rows >= self.segment_rows:
+                    self._seal()
+            if prepared:
+                self.version += 1
+
+    def _seal(self):
+        active, self._active = self._active, Segment.empty()
+        if self.directory:
+            active.write(os.path.join(self.directory, f"segment-{len(self._sealed) + 1:06d}.col"))
+            self._write_dictionary()
+        self._sealed.append(active)
+
+    def _write_dictionary(self):
+        path = os.path.join(self.directory, "dictionary.json")
+        with open(path + ".tmp", "w") as fp:
+            json.dump({"items": self._items, "placements": self._placements}, fp)
+        os.replace(path + ".tmp", path)
+
+    def flush(self):
+        """활성 세그먼트를 봉인합니다 (디렉터리가 있으면 파일로). 종료 시 호출."""
+        with self._lock:
+            if self._active.rows:
+                self._seal()
+
+    @property
+    def rows(self):
+        return sum(segment.rows for segment in self._sealed) + self._active.rows
+
+    # ── 조회 ──────────────────────────────────────────────────────────
+
+    def _segments(self, start, end):
+        """범위와 겹치는 세그먼트의 (컬럼 dict, 범위 안에 완전히 들어가는지)."""
+        with self._lock:
+            sealed = list(self._sealed)
+            active = self._active
+            active_copy = None
+            if active.overlaps(start, end):
+                active_copy = Segment(
+                    {name: array.array(code, active.columns[name]) for name, code in COLUMNS},
+                    active.rows, active.min_ts, active.max_ts,
+                )
+            items, placements = list(self._items), list(self._placements)
+        segments = [segment for segment in sealed if segment.overlaps(start, end)]
+        if active_copy is not None:
+            segments.append(active_copy)
+        scans = []
+        for segment in segments:
+            inside = (start is None or segment.min_ts >= start) and (end is None or segment.max_ts < end)
+            scans.append((segment.columns, inside))
+        return scans, items, placements
+
+    def query(self, start=None, end=None, group_by=("item",), item=None, placement=None):
+        """[start, end) 범위 행을 group_by 차원으로 묶은 집계 행 목록.
+
+        각 행: 차원 값들 + impressions, clicks, views, view_ms, ctr.
+        """
+        group_by = tuple(group_by)
+        for dimension in group_by:
+            if dimension not in DIMENSIONS:
+                raise ReportError(f"unknown dimension: {dimension}")
+        scans, items, placements = self._segments(start, end)
+        item_code = None if item is None else _index(items, item)
+        placement_code = None if placement is None else _index(placements, placement)
+        if (item is not None and item_code is None) or (placement is not None and placement_code is None):
+            return []
+        aggregate = _aggregate_numpy if np is not None else _aggregate_python
+        groups = aggregate(scans, start, end, group_by, item_code, placement_code)
+
+        rows = []
+        for key, (impressions, clicks, views, view_ms) in groups.items():
+            row = {}
+            for dimension, value in zip(group_by, key):
+                if dimension == "item":
+                    value = items[value]
+                elif dimension == "placement":
+                    value = placements[value]
+                row[dimension] = value
+            row.update(
+                impressions=impressions, clicks=clicks, views=views, view_ms=view_ms,
+                ctr=round(clicks / impressions, 6) if impressions else None,
+            )
+            rows.append(row)
+        rows.sort(key=lambda row: tuple(row[dimension] for dimension in group_by))
+        return rows
+
+
+def _index(values, value):
+    try:
+        return values.index(value)
+    except ValueError:
+        return None
+
+
+def _aggregate_python(scans, start, end, group_by, item_code, placement_code):
+    groups = {}
+    for columns, inside in scans:
+        for ts, kind, item, placement, count, value in zip(*(columns[name] for name, _ in COLUMNS)):
+            if not inside and ((start is not None and ts < start) or (end is not None and ts >= end)):
+                continue
+            if (item_code is not None and item != item_code) or \
+                    (placement_code is not None and placement != placement_code):
+                continue
+            key = tuple(
+                item if d == "item" else placement if d == "placement"
+                else ts // 3600 * 3600 if d == "hour" else ts // 86400 * 86400
+                for d in group_by
+            )
+            totals = groups.get(key)
+            if totals is None:
+                totals = groups[key] = [0, 0, 0, 0]
+            if kind == 0:
+                totals[0] += count
+            elif kind == 1:
+                totals[1] += count
+            else:
+                totals[2] += count
+                totals[3] += value
+    return groups
+
+
+def _aggregate_numpy(scans, start, end, group_by, item_code, placement_code):
+    if not scans:
+        return {}
+    parts = {name: [] for name, _ in COLUMNS}
+    for columns, inside in scans:
+        arrays = {name: np.frombuffer(columns[name], dtype=columns[name].typecode) for name, _ in COLUMNS}
+        mask = None
+        if not inside:
+            ts = arrays["ts"]
+            mask = np.ones(len(ts), dtype=bool)
+            if start is not None:
+                mask &= ts >= start
+            if end is not None:
+                mask &= ts < end
+        if item_code is not None:
+            mask = (arrays["item"] == item_code) if mask is None else mask & (arrays["item"] == item_code)
+        if placement_code is not None:
+            hit = arrays["placement"] == placement_code
+            mask = hit if mask is None else mask & hit
+        for name, values in arrays.items():
+            parts[name].append(values if mask is None else values[mask])
+    data = {name: np.concatenate(values) for name, values in parts.items()}
+    if not len(data["ts"]):
+        return {}
+
+    dims = []
+    for dimension in group_by:
+        if dimension == "hour":
+            dims.append(data["ts"] // 3600 * 3600)
+        elif dimension == "day":
+            dims.append(data["ts"] // 86400 * 86400)
+        else:
+            dims.append(data[dimension].astype(np.int64))
+    if dims:
+        keys, inverse = np.unique(np.stack(dims, axis=1), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+    else:
+        keys, inverse = np.zeros((1, 0), dtype=np.int64), np.zeros(len(data["ts"]), dtype=np.int64)
+    size = len(keys)
+    kind, count, value = data["kind"], data["count"].astype(np.int64), data["value"].astype(np.int64)
+
+    def total(kind_code, weights):
+        selected = kind == kind_code
+        return np.bincount(inverse[selected], weights=weights[selected], minlength=size)
+
+    impressions, clicks = total(0, count), total(1, count)
+    views, view_ms = total(2, count), total(2, value)
+    return {
+        tuple(int(v) for v in key): [int(impressions[i]), int(clicks[i]), int(views[i]), int(view_ms[i])]
+        for i, key in enumerate(keys)
+    }
@@ -0,0 +1,132 @@
+"""미리 인코딩해 둔 응답 본문과 조건부 GET 처리.
+
+같은 설정 세대 동안은 JSON 직렬화와 압축을 다시 하지 않도록 본문
+바이트(identity/gzip/br)와 강한 ETag 를 한 번만 만들어 둡니다.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # brotli 는 선택 의존성
+    brotli = None
+
+# 압축 효과가 없는 작은 본문은 그대로 보냅니다
+MIN_COMPRESS_SIZE = 256
+
+
+def dump_json(obj):
+    """Flask jsonify 와 같은 형식(정렬된 키, 공백 없음, 끝 줄바꿈)으로 직렬화합니다."""
+    return (json.dumps(obj, ensure_ascii=True, sort_keys=True, separators=(",", ":")) + "\n").encode()
+
+
+class EncodedPayload:
+    """한 본문의 인코딩별 바이트와 ETag."""
+
+    __slots__ = ("mimetype", "etag", "bodies", "etags")
+
+    def __init__(self, body, mimetype="application/json"):
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.mimetype = mimetype
+        self.etag = digest
+        self.bodies = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(body)
+        # 표현(인코딩)마다 다른 강한 ETag
+        self.etags = {
+            encoding: digest if encoding == "identity" else f"{digest}-{encoding}"
+            for encoding in self.bodies
+        }
+
+    def choose_encoding(self, accept_encoding):
+        """Accept-Encoding 헤더를 보고 br > gzip > identity 순으로 고릅니다."""
+        if not accept_encoding or len(self.bodies) == 1:
+            return "identity"
+        accepted = set()
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(name.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and encoding in accepted:
+                return encoding
+        return "identity"
+
+    def matches(self, if_none_match):
+        """If-None-Match 헤더 값이 이 본문의 어떤 표현과든 일치하면 True (약한 비교)."""
+        if not if_none_match:
+            return False
+        etags = self.etags.values()
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"') in etags:
+                return True
+        return False
+
+    def negotiate(self, if_none_match, accept_encoding):
+        """프레임워크와 무관한 (status, body, headers) 를 고릅니다 (WSGI/ASGI 공용)."""
+        if self.matches(if_none_match):
+            headers = [("ETag", f'"{self.etag}"')]
+            status, body = 304, b""
+        else:
+            encoding = self.choose_encoding(accept_encoding)
+            body = self.bodies[encoding]
+            headers = [("Content-Type", self.content_type), ("ETag", f'"{self.etags[encoding]}"')]
+            if encoding != "identity":
+                headers.append(("Content-Encoding", encoding))
+            status = 200
+        if len(self.bodies) > 1:
+            headers.append(("Vary", "Accept-Encoding"))
+        return status, body, headers
+
+    @property
+    def content_type(self):
+        if self.mimetype.startswith("text/"):
+            return f"{self.mimetype}; charset=utf-8"
+        return self.mimetype
+
+    def to_response(self, request, headers=None):
+        """조건부 GET 과 인코딩 협상을 처리한 Flask 응답을 만듭니다."""
+        status, body, negotiated = self.negotiate(
+            request.headers.get("If-None-Match"), request.headers.get("Accept-Encoding"),
+        )
+        response = Response(body, status=status, headers=negotiated)
+        if headers:
+            response.headers.update(headers)
+        return response
+
+
+class PayloadCache:
+    """키(설정 스냅샷 등)가 바뀔 때만 본문을 다시 만드는 1칸짜리 캐시.
+
+    키는 ``==`` 로 비교하므로 (snapshot, version) 같은 튜플도 쓸 수 있습니다.
+    """
+
+    def __init__(self, render, mimetype="application/json"):
+        self._render = render
+        self._mimetype = mimetype
+        self._lock = threading.Lock()
+        self._entry = (None, None)
+
+    def get(self, key):
+        cached_key, payload = self._entry
+        if payload is not None and cached_key == key:
+            return payload
+        with self._lock:
+            cached_key, payload = self._entry
+            if payload is None or cached_key != key:
+                payload = EncodedPayload(self._render(key), self._mimetype)
+                self._entry = (key, payload)
+            return payload
@@ -0,0 +1,192 @@
+"""가중치 기반 배너 로테이션.
+
+설정 세대마다 배너별로 별칭(alias) 테이블을 미리 만들어 두어, 소재가
+몇 개든 요청당 난수 한 번과 배열 조회 두 번으로 소재를 고릅니다.
+시작/종료 일정이 있는 소재는 일정 경계 사이 구간마다 테이블을 따로
+만들어 캐시합니다. 타기팅 규칙이 있으면 요청이 통과한 소재 비트마스크별로
+하위 로테이션을 만들어 캐시합니다.
+"""
+
+import bisect
+import json
+import random
+import threading
+
+from adserver.targeting import TargetingMatcher
+
+# 비트마스크별 하위 로테이션 캐시 상한 (넘으면 비움)
+TARGETED_CACHE_SIZE = 1024
+
+# admit 로 거절된 소재를 빼고 다시 뽑는 최대 횟수
+MAX_DRAWS = 8
+
+
+class AliasTable:
+    """Vose 별칭 방법으로 만든 O(1) 가중치 샘플러."""
+
+    __slots__ = ("values", "prob", "alias", "size")
+
+    def __init__(self, values, weights):
+        n = len(values)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = g
+            scaled[g] = scaled[g] + scaled[s] - 1.0
+            (small if scaled[g] < 1.0 else large).append(g)
+        for i in large + small:  # 부동소수 오차로 남은 칸은 1.0
+            prob[i] = 1.0
+        self.values = tuple(values)
+        self.prob = prob
+        self.alias = alias
+        self.size = n
+
+    def pick(self, rand=random.random):
+        u = rand() * self.size
+        i = int(u)
+        if u - i >= self.prob[i]:
+            i = self.alias[i]
+        return self.values[i]
+
+
+class BannerRotation:
+    """한 배너(또는 그 일부 소재)의 일정 구간별 별칭 테이블과 응답 본문."""
+
+    def __init__(self, banner, generation, items=None, bodies=None, targeting=True, templates=None):
+        self.banner = banner
+        self.generation = generation
+        items = banner.items if items is None else items
+        self.candidates = tuple(
+            item for item in items if item.weight > 0
+        ) if banner.enabled else ()
+        # 일정 경계: 이 시각들 사이에서는 후보 집합이 바뀌지 않습니다
+        edges = set()
+        for item in self.candidates:
+            if item.start is not None:
+                edges.add(item.start)
+            if item.end is not None:
+                edges.add(item.end)
+        self.edges = sorted(edges)
+        if bodies is None:
+            bodies = {item.id: encode_selection(banner, item, generation) for item in self.candidates}
+        self.bodies = bodies
+        self.empty_body = encode_selection(banner, None, generation)
+        self._templates = {} if templates is None else templates
+        self._segments = {}
+        self._lock = threading.Lock()
+        # 빈도 제한/일일 예산이 걸린 소재가 있는지 (없으면 admit 검사 생략)
+        self.paced = any(item.paced for item in self.candidates)
+        self._bits = {item.index: bit for bit, item in enumerate(self.candidates)}
+        self.matcher = None
+        if targeting and any(item.targeting for item in self.candidates):
+            self.matcher = TargetingMatcher(self.candidates)
+        self._targeted = {}
+        self._exclusions = {}
+
+    def _segment(self, now):
+        index = bisect.bisect_right(self.edges, now)
+        table = self._segments.get(index, False)
+        if table is False:
+            with self._lock:
+                live = [item for item in self.candidates if item.is_live(now)]
+                table = AliasTable(live, [item.weight for item in live]) if live else None
+                self._segments[index] = table
+        return table
+
+    def _subset(self, mask):
+        rotation = self._targeted.get(mask)
+        if rotation is None:
+            items = [item for bit, item in enumerate(self.candidates) if mask >> bit & 1]
+            rotation = BannerRotation(
+                self.banner, self.generation, items, self.bodies, targeting=False, templates=self._templates,
+            )
+            if len(self._targeted) >= TARGETED_CACHE_SIZE:
+                self._targeted.clear()
+            self._targeted[mask] = rotation
+        return rotation
+
+    def exclusion(self, item_ids):
+        """소재 id 집합 → 후보 비트마스크 (select 의 exclude 인자용, 캐시)."""
+        mask = self._exclusions.get(item_ids)
+        if mask is None:
+            mask = 0
+            for bit, item in enumerate(self.candidates):
+                if item.id in item_ids:
+                    mask |= 1 << bit
+            self._exclusions[item_ids] = mask
+        return mask
+
+    def select(self, now, context=None, admit=None, exclude=0):
+        """지금 노출할 소재를 고릅니다. 후보가 없으면 None.
+
+        ``context`` (TargetingContext) 를 넘기면 타기팅 규칙을 통과한 소재 중에서 고릅니다.
+        ``exclude`` 는 뺄 후보 비트마스크입니다 (A/B 실험의 다른 arm 소재).
+        ``admit(item)`` 이 False 인 소재(빈도 제한/예산 소진)는 후보에서 빼고
+        다시 뽑습니다. MAX_DRAWS 번 안에 못 찾으면 None.
+        """
+        if not self.candidates:
+            return None
+        everyone = (1 << len(self.candidates)) - 1
+        mask = everyone
+        if context is not None and self.matcher is not None:
+            mask = self.matcher.match(context)
+        mask &= ~exclude
+        if mask != everyone:
+            return self._subset(mask).select(now, admit=admit) if mask else None
+        table = self._segment(now)
+        if table is None:
+            return None
+        if admit is None or not self.paced:
+            return table.pick()
+        rejected = 0
+        for _ in range(MAX_DRAWS):
+            item = table.pick()
+            if admit(item):
+                return item
+            rejected |= 1 << self._bits[item.index]
+            table = self._subset(everyone & ~rejected)._segment(now) if rejected != everyone else None
+            if table is None:
+                return None
+        return None
+
+    def select_body(self, now, context=None):
+        return self.body(self.select(now, context))
+
+    def body(self, item):
+        """선택 결과(소재 또는 None)의 응답 본문."""
+        return self.empty_body if item is None else self.bodies[item.id]
+
+    def tracked_body(self, item, tracking_url):
+        """tracking_url 만 바꾼 응답 본문 (서명된 클릭 URL 용).
+
+        미리 만든 본문을 tracking_url 자리에서 한 번 잘라 두고 이어 붙입니다.
+        """
+        if item is None:
+            return self.empty_body
+        parts = self._templates.get(item.id)
+        if parts is None:
+            marker = b'"tracking_url":' + json.dumps(self.banner.tracking_url(item)).encode()
+            parts = self._templates[item.id] = self.bodies[item.id].split(marker, 1)
+        return b"".join((parts[0], b'"tracking_url":', json.dumps(tracking_url).encode(), parts[1]))
+
+
+def encode_selection(banner, item, generation):
+    """선택 응답 JSON 바이트."""
+    data = {"position": banner.position, "generation": generation, "item": None}
+    if banner.tenant != "default":
+        data["tenant"] = banner.tenant
+    if item is not None:
+        data["item"] = {
+            "id": item.id,
+            "image_url": item.image_url,
+            "click_url": item.click_url,
+            "tracking_url": banner.tracking_url(item),
+        }
+    return (json.dumps(data, sort_keys=True, separators=(",", ":")) + "\n").encode()
@@ -0,0 +1,619 @@
+"""프로세스 단위 서빙 상태.
+
+Flask(WSGI) 앱과 ASGI 앱이 같은 프로세스에서 같은 설정 스냅샷,
+리다이렉트 테이블, 카운터, 메트릭, 응답 캐시를 공유하도록 한 곳에서
+만듭니다.
+"""
+
+import asyncio
+import atexit
+import math
+import os
+import time
+
+from adserver.startup import StartupProfile
+
+# AD_STARTUP_PROFILE=1 일 때만 콜드 스타트 구간을 기록
+startup = StartupProfile(time.perf_counter())
+
+from adserver.admin import render_admin  # noqa: E402
+from adserver.assets import AssetCache, AssetProxy, UrlFetcher, serve_asset  # noqa: E402
+from adserver.clicks import OK, ClickSigner  # noqa: E402
+from adserver.counters import CounterStage, sink_from_env  # noqa: E402
+from adserver.editing import ConfigEditor, EditError, ReadOnlyStore, authorized, parse_body  # noqa: E402
+from adserver.events import EventAggregator, decoder_for  # noqa: E402
+from adserver.experiments import ExperimentLog  # noqa: E402
+from adserver.feed import SSE_KEEPALIVE, ConfigFeed, sse_event  # noqa: E402
+from adserver.filtering import client_address, filters_from_env, response_for  # noqa: E402
+from adserver.imaging import ImagePipeline  # noqa: E402
+from adserver.metrics import MetricsRegistry  # noqa: E402
+from adserver.pacing import PacingController, backend_from_env  # noqa: E402
+from adserver.redirects import NOT_FOUND  # noqa: E402
+from adserver.reports import EventStore  # noqa: E402
+from adserver.responses import PayloadCache, dump_json  # noqa: E402
+from adserver.snapshot import DEFAULT_TENANT, SnapshotHolder, parse_time  # noqa: E402
+from adserver.stores import ConfigWatcher, ConflictError, EnvStore, store_from_env  # noqa: E402
+from adserver.targeting import TargetingContext  # noqa: E402
+
+# ═══════════════════════════════════════════════════════════════════════
+# 광고 설정 - 설정 저장소(환경변수/JSON 파일/SQLite)에서 가져오기
+# ═══════════════════════════════════════════════════════════════════════
+
+# 콜드 스타트 시 한 번 파싱해 두고, 리로드 훅이나 지문 변경 때만 다시 빌드
+with startup.timed("first_config_build"):
+    snapshots = SnapshotHolder(
+        store_from_env(),
+        check_interval=float(os.environ.get("AD_CONFIG_CHECK_INTERVAL", "0")),
+    )
+
+# 파일/SQLite 저장소는 백그라운드에서 지문을 폴링해 재시작 없이 교체
+config_watcher = None
+if not isinstance(snapshots.store, EnvStore):
+    config_watcher = ConfigWatcher(
+        snapshots, interval=float(os.environ.get("AD_CONFIG_WATCH_INTERVAL", "1")),
+    ).start()
+
+
+# 클릭 카운터: 요청 경로는 샤드 증가만, 싱크 쓰기는 백그라운드 배치
+counters = CounterStage(
+    sink_from_env(),
+    flush_interval=float(os.environ.get("AD_COUNTER_FLUSH_INTERVAL", "5")),
+)
+
+# 배너 이미지 프록시: 스냅샷마다 image_url 을 백그라운드로 받아 /asset/<hash> 로 제공
+# (AD_ASSET_PROXY=0 이면 원래 URL 그대로). 받은 원본은 프로세스 풀에서
+# 1x/2x WebP/AVIF/JPEG 변형과 LQIP 로 전처리 (AD_IMAGE_VARIANTS=0 이면 끔)
+ASSET_PROXY_ENABLED = os.environ.get("AD_ASSET_PROXY", "1") != "0"
+asset_cache = AssetCache(
+    max_bytes=int(os.environ.get("AD_ASSET_CACHE_BYTES", str(64 * 1024 * 1024))),
+    directory=os.environ.get("AD_ASSET_DIR") or None,
+)
+image_pipeline = None
+if os.environ.get("AD_IMAGE_VARIANTS", "1") != "0":
+    image_pipeline = ImagePipeline(asset_cache, workers=int(os.environ.get("AD_IMAGE_WORKERS", "2")))
+assets = AssetProxy(asset_cache, pipeline=image_pipeline)
+if ASSET_PROXY_ENABLED:
+    assets.prefetch(snapshots.current())
+    snapshots.subscribe(assets.prefetch)
+
+# 리포트용 컬럼 저장소 (AD_REPORT_DIR 이 있으면 세그먼트를 파일로 보관)
+reports = EventStore(os.environ.get("AD_REPORT_DIR") or None)
+atexit.register(reports.flush)
+
+# 클라이언트 이벤트: 배치마다 윈도우 집계에 합산하고 노출/노출 시간은 카운터와
+# 리포트 저장소로도 보냄 (클릭은 /click 리다이렉트에서 이미 세므로 더하지 않음)
+events = EventAggregator(window=int(os.environ.get("AD_EVENT_WINDOW", "60")))
+
+
+def _count_events(folded):
+    placements = snapshots.current().item_placements
+    for (start, kind, item_id), (count, value) in folded.items():
+        if kind == "impression":
+            counters.increment("impression", item_id, count)
+        elif kind == "view":
+            counters.increment("view_ms", item_id, value)
+        else:
+            continue
+        reports.append(start, kind, item_id, placements.get(item_id, ""), count, value)
+
+
+events.subscribe(_count_events)
+
+
+@counters.subscribe
+def _report_clicks(deltas, now):
+    """카운터 플러시마다 소재별 클릭 합계를 리포트 저장소에 한 번의 락으로 추가."""
+    placements = snapshots.current().item_placements
+    reports.append_many(
+        (now, "click", item_id, placements.get(item_id, ""), count)
+        for (kind, item_id), count in deltas.items() if kind == "click"
+    )
+
+# 빈도 제한/일일 예산: 요청 경로는 로컬 상태만, 공유 백엔드와는 주기적으로 동기화
+pacing = PacingController(
+    backend_from_env(),
+    sync_interval=float(os.environ.get("AD_PACING_SYNC_INTERVAL", "2")),
+)
+pacing.update(snapshots.current())
+snapshots.subscribe(pacing.update)
+
+# 서명된 클릭 토큰 (AD_CLICK_SECRET 이 있을 때만). 내용 버전별 리다이렉트 테이블을
+# 보관해 클라이언트가 받은 소재로 보냄. AD_CLICK_REQUIRE_TOKEN=1 이면
+# 서명 없는 /click/<position>/<index> 는 리다이렉트만 하고 세지 않음
+click_signer = ClickSigner.from_env()
+if click_signer is not None:
+    click_signer.remember(snapshots.current())
+    snapshots.subscribe(click_signer.remember)
+CLICK_REQUIRE_TOKEN = os.environ.get("AD_CLICK_REQUIRE_TOKEN", "0") == "1"
+
+# 클릭/이벤트 경로 앞단 필터: UA/IP 대역 거부 목록과 클라이언트별 빈도 제한
+# (AD_FILTER=0 이면 끔). 거절은 본문/설정을 보기 전에 준비된 403/429 로 끝냄
+request_filters = filters_from_env(os.environ)
+
+# 관리 쓰기 API (AD_ADMIN_TOKEN 이 있을 때만, 저장소는 sqlite). 검증한 변경 묶음을
+# 한 리비전으로 커밋하고 이 인스턴스 스냅샷을 바로 교체, AD_ADMIN_PEERS(쉼표 구분
+# 기준 URL)에는 리로드 신호. 신호를 못 받은 인스턴스도 저장소 감시로 따라옴
+editor = ConfigEditor(
+    snapshots,
+    UrlFetcher(timeout=float(os.environ.get("AD_ADMIN_FETCH_TIMEOUT", "5"))),
+    token=os.environ.get("AD_ADMIN_TOKEN") or None,
+    peers=os.environ.get("AD_ADMIN_PEERS", "").split(","),
+    concurrency=int(os.environ.get("AD_ADMIN_FETCH_CONCURRENCY", "8")),
+)
+
+# 라우트별 지연 히스토그램/상태 코드 카운터 (AD_METRICS=0 이면 끔)
+metrics = MetricsRegistry()
+metrics.gauge("adserver_config_generation", lambda: snapshots.current().generation,
+              "Generation of the config snapshot being served.")
+METRICS_ENABLED = os.environ.get("AD_METRICS", "1") != "0"
+
+
+def get_ad_config():
+    """현재 스냅샷을 기존 응답 모양의 dict로 반환합니다 (집계된 클릭 수 포함)."""
+    return snapshots.current().as_dict(counters.totals("click"))
+
+
+def reload_config():
+    """설정 저장소를 다시 읽어 스냅샷을 교체합니다."""
+    return snapshots.reload()
+
+
+def payload_key():
+    """응답 캐시 키: 설정 세대, 카운터 플러시 버전, 이미지 프록시 버전."""
+    return (snapshots.current(), counters.version, assets.version)
+
+
+def record_click(item_id):
+    """/click 경로의 클릭 한 번: 카운터와 일일 클릭 예산에 기록.
+
+    리포트 저장소 행은 요청 경로에서 쓰지 않고 카운터 플러시 때 소재별로
+    합쳐서 추가합니다 (_report_clicks).
+    """
+    counters.increment("click", item_id)
+    pacing.record_click(item_id, time.time())
+
+
+def filter_request(route, forwarded_for, real_ip, remote_addr, user_agent):
+    """route("click"/"events") 필터를 통과하면 None, 아니면 준비된 거절 응답.
+
+    빈도 제한 키는 항상 클라이언트 IP 입니다.
+    """
+    request_filter = request_filters.get(route)
+    if request_filter is None:
+        return None
+    address = client_address(forwarded_for, real_ip, remote_addr)
+    reason = request_filter.check(address, user_agent, time.time())
+    if reason is None:
+        return None
+    metrics.inc("adserver_filtered_total", (("route", route), ("reason", reason)))
+    return response_for(reason)
+
+
+def legacy_click(target):
+    """서명 없는 /click 경로: 준비된 응답을 돌려주고 필요하면 클릭을 셉니다."""
+    if target.item_id is not None and not CLICK_REQUIRE_TOKEN:
+        record_click(target.item_id)
+    return target
+
+
+def signed_click(token):
+    """GET /c/<token>: 검증 → 리다이렉트 응답. 위조/만료는 세기 전에 NOT_FOUND.
+
+    재사용된 토큰은 같은 곳으로 보내되 세지 않습니다.
+    """
+    if click_signer is None:
+        return NOT_FOUND
+    now = time.time()
+    result, claims = click_signer.verify(token, now)
+    metrics.inc("adserver_clicks_total", (("result", result),))
+    if claims is None:
+        return NOT_FOUND
+    target = click_signer.resolve(claims, snapshots.current())
+    if result == OK and target.item_id is not None:
+        record_click(target.item_id)
+        if claims.experiment is not None:
+            experiment_log.append(claims.experiment, claims.arm, "click")
+    return target
+
+
+def admin_payload_key():
+    """/admin 캐시 키: 설정 세대와 카운터 플러시 버전.
+
+    리포트 저장소 버전은 행마다 올라가므로 넣지 않습니다. 소재별 CTR 은
+    플러시 주기마다 한 번만 다시 조회합니다.
+    """
+    return (snapshots.current(), counters.version)
+
+
+def _proxied(config):
+    return assets.rewrite(config) if ASSET_PROXY_ENABLED else config
+
+
+def _experimented(config, snapshot, assignment=None):
+    """A/B 실험이 있으면 배정되지 않은 arm 의 소재를 뺀 설정 (없으면 그대로)."""
+    return snapshot.experiments.apply(config, snapshot, assignment) if snapshot.experiments else config
+
+
+# 설정 세대(와 카운터 플러시)마다 한 번만 직렬화/압축하는 /api/ad-config 응답 본문
+# (실험이 있으면 control arm 기준, client 별 배정은 config_payload)
+ad_config_payloads = PayloadCache(
+    lambda key: dump_json(_experimented(_proxied(key[0].as_dict(counters.totals("click"))), key[0]))
+)
+
+# A/B 실험 노출/클릭 기록 (arm 별 CTR/신뢰구간은 /api/experiments)
+experiment_log = ExperimentLog()
+
+# 증분 설정 피드: 클릭 수를 뺀 설정 문서의 최근 revision 들과 since 응답 본문
+# (?since=<revision> 은 unchanged / patch / full, wait= 로 long-poll, SSE 도 같은 피드)
+config_feed = ConfigFeed(
+    lambda key: (key[0].generation, _experimented(_proxied(key[0].as_dict()), key[0])),
+    depth=int(os.environ.get("AD_FEED_DEPTH", "16")),
+)
+snapshots.subscribe(config_feed.notify)
+
+# long-poll 한 번의 최대 대기와 SSE 연결 하나의 최대 유지 시간 (서버리스 실행 시간 제한 안쪽)
+FEED_MAX_WAIT = float(os.environ.get("AD_FEED_MAX_WAIT", "25"))
+FEED_STREAM_SECONDS = float(os.environ.get("AD_FEED_STREAM_SECONDS", "280"))
+FEED_KEEPALIVE = 15.0
+INVALID_WAIT_BODY = dump_json({"error": "wait must be a number of seconds"})
+
+
+def feed_key():
+    """피드 키: 설정 세대와 이미지 프록시 버전 (클릭 수는 피드에 넣지 않음)."""
+    return (snapshots.current(), assets.version)
+
+
+def _feed_args(args):
+    """?since=&wait= → (since, wait 초). wait 가 유한한 숫자가 아니면 None."""
+    try:
+        wait = float(args.get("wait") or 0)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(wait):
+        return None
+    return args.get("since"), min(wait, FEED_MAX_WAIT)
+
+
+def feed_since(args):
+    """?since=<revision>[&wait=<초>] → (status, 응답 본문). wait 가 숫자가 아니면 400.
+
+    wait 가 있고 since 가 최신이면 새 revision 이 생기거나 wait 초가 지날 때까지 기다립니다.
+    """
+    parsed = _feed_args(args)
+    if parsed is None:
+        return 400, INVALID_WAIT_BODY
+    since, wait = parsed
+    if wait > 0:
+        config_feed.wait(since, wait, feed_key)
+    else:
+        config_feed.refresh(feed_key())
+    return 200, config_feed.body(since)
+
+
+async def feed_since_async(args):
+    """feed_since 의 ASGI 판 (long-poll 대기가 스레드를 잡지 않음)."""
+    parsed = _feed_args(args)
+    if parsed is None:
+        return 400, INVALID_WAIT_BODY
+    since, wait = parsed
+    if wait > 0:
+        await config_feed.wait_async(since, wait, feed_key)
+    else:
+        config_feed.refresh(feed_key())
+    return 200, config_feed.body(since)
+
+
+def feed_stream(since, clock=time.monotonic):
+    """SSE 이벤트 바이트를 차례로 내는 제너레이터 (Flask 스트리밍 응답용).
+
+    since 이후 변경이 있으면 바로, 이후 새 revision 마다 config 이벤트를 보내고
+    변경이 없으면 FEED_KEEPALIVE 초마다 주석 줄을 보냅니다.
+    """
+    deadline = clock() + FEED_STREAM_SECONDS
+    yield b"retry: 1000\n\n"
+    while True:
+        revision = config_feed.refresh(feed_key())
+        if revision != since:
+            yield sse_event(config_feed, since)
+            since = revision
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        if config_feed.wait(since, min(FEED_KEEPALIVE, remaining), feed_key) == since:
+            yield SSE_KEEPALIVE
+
+
+async def feed_stream_async(since):
+    """feed_stream 의 비동기 제너레이터 판 (ASGI). 스레드 없이 교체 신호를 기다립니다."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + FEED_STREAM_SECONDS
+    yield b"retry: 1000\n\n"
+    while True:
+        revision = config_feed.refresh(feed_key())
+        if revision != since:
+            yield sse_event(config_feed, since)
+            since = revision
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return
+        if await config_feed.wait_async(since, min(FEED_KEEPALIVE, remaining), feed_key) == since:
+            yield SSE_KEEPALIVE
+
+
+# /admin HTML 은 (설정 세대, 카운터 플러시 버전) 키로 캐시 (소재별 CTR 은 플러시마다 다시 조회)
+admin_payloads = PayloadCache(
+    lambda key: render_admin(key[0], counters.totals("click"), reports.query(group_by=("item",))),
+    mimetype="text/html",
+)
+
+
+def resolve_rotation(position, tenant=None, locale=None, platform=None, accept_language=None):
+    """요청 속성으로 인벤토리 인덱스에서 로테이션을 찾습니다.
+
+    locale 이 없으면 Accept-Language 의 첫 태그를 씁니다.
+    """
+    if not locale and accept_language:
+        locale = _first_language(accept_language)
+    return snapshots.current().inventory.resolve(tenant or DEFAULT_TENANT, position, locale, platform)
+
+
+def serve_ad(rotation, now, context=None, user=None, client=None):
+    """로테이션에서 소재를 골라 응답 본문을 돌려주고 노출을 기록합니다.
+
+    빈도 제한/일일 예산이 걸린 소재는 pacing 이 허용할 때만 고릅니다.
+    클릭 서명이 켜져 있으면 tracking_url 을 이번 노출의 서명된 토큰 URL 로 바꿉니다.
+    A/B 실험이 걸린 배너는 ``client``(없으면 user)의 arm 소재 중에서 고르고
+    노출을 기록합니다. 클릭 토큰에도 arm 을 넣습니다.
+    """
+    banner = rotation.banner
+    snapshot = snapshots.current()
+    experiment = snapshot.experiments.for_placement(banner.tenant, banner.position)
+    exclude, index = 0, None
+    if experiment is not None:
+        client = client or user
+        index = experiment.assign(client) if client else None
+        exclude = rotation.exclusion(experiment.hidden[index or 0])
+    if not rotation.paced:
+        item = rotation.select(now, context, exclude=exclude)
+    else:
+        item = rotation.select(now, context, admit=lambda item: pacing.allows(item, user, now), exclude=exclude)
+        if item is not None:
+            pacing.record_impression(item, user, now)
+    arm = None
+    if index is not None and item is not None:
+        arm = (experiment.id, experiment.arms[index].name)
+        experiment_log.append(arm[0], arm[1], "impression")
+    if click_signer is None or item is None:
+        return rotation.body(item)
+    return rotation.tracked_body(item, click_signer.url(rotation.banner, item, snapshot.version, now, arm))
+
+
+def event_batch(content_type):
+    """POST /api/events 본문을 받을 배치. 모르는 Content-Type 이면 None."""
+    decoder = decoder_for(content_type)
+    if decoder is None:
+        return None
+    return events.batch(decoder, snapshots.current(), time.time())
+
+
+def finish_event_batch(batch):
+    """배치를 반영하고 (status, 응답 dict) 를 돌려줍니다."""
+    result = batch.finish()
+    metrics.inc("adserver_events_total", (("result", "accepted"),), result["accepted"])
+    for reason, count in result["reasons"].items():
+        metrics.inc("adserver_events_total", (("result", reason),), count)
+    return 202, result
+
+
+def report(args):
+    """GET /api/reports 인자로 리포트를 조회해 (status, 응답 dict) 를 돌려줍니다.
+
+    start/end 는 epoch 초 또는 ISO 8601 (기본: 최근 24시간), group_by 는
+    item/placement/hour/day 를 쉼표로 (기본: item), item/placement 로 거를 수 있습니다.
+    """
+    try:
+        end = parse_time(args.get("end"))
+        start = parse_time(args.get("start"))
+    except ValueError:
+        return 400, {"error": "invalid start/end"}
+    if end is None:
+        end = time.time() + 1  # 방금 기록된 초까지 포함
+    if start is None:
+        start = end - 86400
+    group_by = tuple(d.strip() for d in (args.get("group_by") or "item").split(",") if d.strip())
+    try:
+        rows = reports.query(int(start), int(end), group_by, args.get("item"), args.get("placement"))
+    except ValueError as exc:
+        return 400, {"error": str(exc)}
+    return 200, {"start": int(start), "end": int(end), "group_by": list(group_by), "rows": rows}
+
+
+def asset_response(digest, if_none_match=None, range_header=None):
+    """GET /asset/<hash> 의 (status, body, headers). 없는 해시면 None."""
+    entry = assets.get(digest)
+    if entry is None:
+        return None
+    return serve_asset(entry[0], entry[1], digest, if_none_match, range_header)
+
+
+def _first_language(accept_language):
+    return accept_language.split(",", 1)[0].split(";", 1)[0].strip() or None
+
+
+def targeting_context(args, header):
+    """요청 인자(mapping)와 헤더 조회 함수로 타기팅 컨텍스트를 만듭니다.
+
+    os 는 ``os`` 또는 ``platform``, 국가는 ``country`` 또는 Vercel 의
+    X-Vercel-IP-Country 헤더, 앱 버전은 ``version`` 인자에서 읽습니다.
+    """
+    locale = args.get("locale")
+    if not locale:
+        accept_language = header("Accept-Language")
+        locale = _first_language(accept_language) if accept_language else None
+    return TargetingContext(
+        os=args.get("os") or args.get("platform"),
+        locale=locale,
+        country=args.get("country") or header("X-Vercel-IP-Country"),
+        version=args.get("version"),
+    )
+
+
+_tenant_payloads = {}
+
+# (테넌트, 실험 배정) 별 응답 캐시 수 상한 (넘으면 비움)
+ASSIGNMENT_CACHE_SIZE = 256
+_assignment_payloads = {}
+
+
+def _assigned_payload(key, tenant, client):
+    """실험 배정별 응답 본문. 배정 조합 수만큼만 캐시하고 사용자별 상태는 없음."""
+    assignment = key[0].experiments.assign(client)
+    cache_key = (tenant, assignment)
+    cache = _assignment_payloads.get(cache_key)
+    if cache is None:
+        if len(_assignment_payloads) >= ASSIGNMENT_CACHE_SIZE:
+            _assignment_payloads.clear()
+        if tenant is None:
+            def render(key):
+                config = _proxied(key[0].as_dict(counters.totals("click")))
+                return dump_json(_experimented(config, key[0], assignment))
+        else:
+            def render(key):
+                config = _proxied(key[0].tenant_dict(tenant, counters.totals("click")))
+                return dump_json(_experimented(config, key[0], assignment))
+        cache = _assignment_payloads.setdefault(cache_key, PayloadCache(render))
+    return cache.get(key)
+
+
+def config_payload(client=None):
+    """/api/ad-config 응답 본문. 실험이 있고 client 가 있으면 그 배정의 본문."""
+    key = payload_key()
+    if not client or not key[0].experiments:
+        return ad_config_payloads.get(key)
+    return _assigned_payload(key, None, client)
+
+
+def tenant_payload(tenant, client=None):
+    """테넌트별 설정 응답 본문. 현재 스냅샷에 없는 테넌트면 None."""
+    key = payload_key()
+    if tenant not in key[0].tenants:
+        return None
+    if client and key[0].experiments:
+        return _assigned_payload(key, tenant, client)
+    cache = _tenant_payloads.get(tenant)
+    if cache is None:
+        cache = _tenant_payloads.setdefault(tenant, PayloadCache(
+            lambda key: dump_json(_experimented(
+                _proxied(key[0].tenant_dict(tenant, counters.totals("click"))), key[0],
+            ))
+        ))
+    return cache.get(key)
+
+
+async def admin_api(method, action, authorization, body=b""):
+    """/api/admin/<action> → (status, 응답 dict, 추가 헤더).
+
+    GET config / GET history / POST creatives / POST rollback / POST reload.
+    모두 ``Authorization: Bearer <AD_ADMIN_TOKEN>`` 이 필요합니다.
+    """
+    if editor.token is None:
+        return 404, {"error": "admin API is disabled (set AD_ADMIN_TOKEN)"}, {}
+    if not authorized(authorization, editor.token):
+        return 401, {"error": "unauthorized"}, {"WWW-Authenticate": 'Bearer realm="adserver-admin"'}
+    loop = asyncio.get_running_loop()
+    try:
+        if method == "GET" and action == "config":
+            return 200, await loop.run_in_executor(None, editor.current), {}
+        if method == "GET" and action == "history":
+            return 200, await loop.run_in_executor(None, editor.history), {}
+        if method == "POST" and action == "reload":
+            snapshot = await loop.run_in_executor(None, reload_config)
+            return 200, {"generation": snapshot.generation}, {}
+        if method == "POST" and action == "creatives":
+            request = parse_body(body)
+            result = await editor.submit(
+                request.get("operations"), request.get("base_revision"), str(request.get("note") or ""),
+            )
+            return 200, result, {}
+        if method == "POST" and action == "rollback":
+            request = parse_body(body)
+            result = await editor.rollback(request.get("revision"), request.get("base_revision"))
+            return 200, result, {}
+    except EditError as exc:
+        return 422, {"error": "validation failed", "errors": exc.errors}, {}
+    except ConflictError as exc:
+        return 409, {"error": str(exc), "revision": exc.actual}, {}
+    except ReadOnlyStore as exc:
+        return 409, {"error": str(exc)}, {}
+    return 404, {"error": "unknown admin action"}, {}
+
+
+def experiment_results():
+    """GET /api/experiments: 현재 세대 실험들의 arm 별 노출/클릭/CTR/95% 신뢰구간.
+
+    실험 클릭은 arm 이 담긴 서명된 토큰으로만 세므로, AD_CLICK_SECRET 이
+    없으면 clicks/CTR 을 0 대신 None 으로 내고 그 이유를 note 에 적습니다.
+    """
+    snapshot = snapshots.current()
+    tracked = click_signer is not None
+    result = {
+        "generation": snapshot.generation,
+        "clicks_tracked": tracked,
+        "experiments": experiment_log.results(snapshot.experiments, clicks_tracked=tracked),
+    }
+    if not tracked:
+        result["note"] = "experiment clicks are counted only from signed click tokens; set AD_CLICK_SECRET"
+    return result
+
+
+HOME = {
+    "status": "ok",
+    "message": "Screen Capture Defender Ad Server",
+    "endpoints": {
+        "ad_config": "/api/ad-config.json",
+        "ad_config_feed": "/api/ad-config?since=<revision>",
+        "ad_config_stream": "/api/ad-config/stream",
+        "ad_select": "/api/ad/<position>",
+        "tenant_config": "/api/tenants/<tenant>/ad-config",
+        "events": "/api/events",
+        "reports": "/api/reports",
+        "experiments": "/api/experiments",
+        "admin": "/admin",
+        "admin_api": "/api/admin/<config|history|creatives|rollback|reload>"
+    }
+}
+
+AD_CONFIG_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Expose-Headers': 'ETag',
+    'Cache-Control': 's-maxage=60, stale-while-revalidate',
+}
+
+AD_SELECT_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Cache-Control': 'no-store',
+}
+
+EVENTS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Cache-Control': 'no-store',
+}
+
+FEED_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Cache-Control': 'no-cache',
+}
+
+STREAM_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no',
+}
+
+REPORT_HEADERS = {'Cache-Control': 'no-store'}
+
+ADMIN_HEADERS = {'Cache-Control': 'no-cache'}
+
+ASSET_HEADERS = {'Cache-Control': 'public, max-age=31536000, immutable'}
+
+ADMIN_API_HEADERS = {'Cache-Control': 'no-store'}
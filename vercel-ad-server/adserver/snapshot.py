@@ -0,0 +1,415 @@
+"""광고 설정 스냅샷.
+
+설정 저장소(adserver.stores)를 콜드 스타트 시 한 번만 파싱해 불변 레코드로
+만들어 두고, 명시적인 리로드 또는 소스 지문(fingerprint) 변경이 있을
+때만 다시 빌드합니다.
+"""
+
+import hashlib
+import itertools
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+from adserver.experiments import ExperimentSet, parse_experiments
+from adserver.inventory import InventoryIndex
+from adserver.pacing import parse_cap
+from adserver.redirects import RedirectTable
+from adserver.targeting import format_rules, parse_rules
+
+logger = logging.getLogger("adserver")
+
+# ═══════════════════════════════════════════════════════════════════════
+# 기본값
+# ═══════════════════════════════════════════════════════════════════════
+
+POSITIONS = ("top", "bottom")
+
+# 기존 top_banner/bottom_banner 설정이 속하는 테넌트
+DEFAULT_TENANT = "default"
+
+PLACEHOLDERS = {
+    "top": {
+        "image_url": "https://via.placeholder.com/900x100/1a1a2e/00d4ff?text=Top+Banner",
+        "click_url": "https://vercel.com",
+    },
+    "bottom": {
+        "image_url": "https://via.placeholder.com/900x100/1a1a2e/00d4ff?text=Bottom+Banner",
+        "click_url": "https://vercel.com",
+    },
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 불변 레코드
+# ═══════════════════════════════════════════════════════════════════════
+
+class _Frozen:
+    """생성 후 속성 변경을 막는 __slots__ 레코드 베이스."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class AdItem(_Frozen):
+    """배너 한 칸에 들어가는 광고 소재."""
+
+    __slots__ = (
+        "id", "index", "image_url", "click_url", "weight", "start", "end", "locales", "platforms",
+        "targeting", "frequency_cap", "daily_impressions", "daily_clicks",
+    )
+
+    def __init__(self, id, index, image_url, click_url, weight=1.0, start=None, end=None,
+                 locales=(), platforms=(), targeting=(), frequency_cap=None, daily_impressions=0,
+                 daily_clicks=0):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "index", index)
+        object.__setattr__(self, "image_url", image_url)
+        object.__setattr__(self, "click_url", click_url)
+        object.__setattr__(self, "weight", weight)
+        object.__setattr__(self, "start", start)
+        object.__setattr__(self, "end", end)
+        # 비어 있으면 모든 로케일/플랫폼에 노출
+        object.__setattr__(self, "locales", tuple(locales))
+        object.__setattr__(self, "platforms", tuple(platforms))
+        # 타기팅 규칙 (adserver.targeting.Rule 튜플, 비어 있으면 제한 없음)
+        object.__setattr__(self, "targeting", tuple(targeting))
+        # 사용자별 (횟수, 창 초) 빈도 제한과 일일 노출/클릭 예산 (0 이면 무제한)
+        object.__setattr__(self, "frequency_cap", frequency_cap)
+        object.__setattr__(self, "daily_impressions", daily_impressions)
+        object.__setattr__(self, "daily_clicks", daily_clicks)
+
+    @property
+    def paced(self):
+        """빈도 제한이나 일일 예산이 있으면 True."""
+        return self.frequency_cap is not None or bool(self.daily_impressions or self.daily_clicks)
+
+    def is_live(self, now):
+        """일정(start <= now < end) 안에 있으면 True."""
+        return (self.start is None or self.start <= now) and (self.end is None or now < self.end)
+
+    def as_dict(self, clicks=None):
+        data = {"image_url": self.image_url, "click_url": self.click_url}
+        if self.weight != 1.0:
+            data["weight"] = self.weight
+        if self.start is not None:
+            data["start"] = self.start
+        if self.end is not None:
+            data["end"] = self.end
+        if self.locales:
+            data["locales"] = list(self.locales)
+        if self.platforms:
+            data["platforms"] = list(self.platforms)
+        if self.targeting:
+            data["targeting"] = format_rules(self.targeting)
+        if self.frequency_cap is not None:
+            data["frequency_cap"] = f"{self.frequency_cap[0]}/{self.frequency_cap[1]}s"
+        if self.daily_impressions:
+            data["daily_impressions"] = self.daily_impressions
+        if self.daily_clicks:
+            data["daily_clicks"] = self.daily_clicks
+        if clicks is not None:
+            data["clicks"] = clicks.get(self.id, 0)
+        return data
+
+
+class Banner(_Frozen):
+    """테넌트 하나의 게재 위치(placement)별 배너 설정.
+
+    기본 테넌트의 top/bottom 이 기존 top_banner/bottom_banner 입니다.
+    """
+
+    __slots__ = ("tenant", "position", "key", "enabled", "items")
+
+    def __init__(self, position, enabled, items, tenant=DEFAULT_TENANT):
+        object.__setattr__(self, "tenant", tenant)
+        object.__setattr__(self, "position", position)
+        object.__setattr__(self, "key", f"{position}_banner")
+        object.__setattr__(self, "enabled", enabled)
+        object.__setattr__(self, "items", tuple(items))
+
+    def tracking_url(self, item):
+        """클릭 집계를 거치는 리다이렉트 URL."""
+        if self.tenant == DEFAULT_TENANT:
+            return f"/click/{self.position}/{item.index}"
+        return f"/click/{self.tenant}/{self.position}/{item.index}"
+
+    def as_dict(self, clicks=None):
+        return {
+            "enabled": self.enabled,
+            "items": [item.as_dict(clicks) for item in self.items],
+            "clicks": sum(clicks.get(item.id, 0) for item in self.items) if clicks else 0,
+        }
+
+
+class ConfigSnapshot(_Frozen):
+    """한 세대(generation)의 전체 광고 설정."""
+
+    __slots__ = (
+        "generation", "fingerprint", "version", "built_at", "banners", "placements", "tenants",
+        "items", "item_placements", "redirects", "inventory", "experiments",
+    )
+
+    def __init__(self, generation, fingerprint, banners, built_at=None, experiments=None):
+        placements = {(banner.tenant, banner.position): banner for banner in banners}
+        tenants = {}
+        for banner in placements.values():
+            tenants.setdefault(banner.tenant, []).append(banner)
+        object.__setattr__(self, "generation", generation)
+        object.__setattr__(self, "fingerprint", fingerprint)
+        object.__setattr__(self, "built_at", time.time() if built_at is None else built_at)
+        object.__setattr__(self, "placements", placements)
+        object.__setattr__(self, "tenants", {t: tuple(b) for t, b in tenants.items()})
+        # 소재 id → AdItem (이벤트 검증/리포트용)
+        object.__setattr__(self, "items", {
+            item.id: item for banner in placements.values() for item in banner.items
+        })
+        # 소재 id → 리포트용 게재 위치 이름 ("top", 다른 테넌트는 "tenant/placement")
+        object.__setattr__(self, "item_placements", {
+            item.id: banner.position if banner.tenant == DEFAULT_TENANT else f"{banner.tenant}/{banner.position}"
+            for banner in placements.values() for item in banner.items
+        })
+        # 기존 호환 뷰: 기본 테넌트의 위치별 배너
+        object.__setattr__(self, "banners", {
+            banner.position: banner for banner in self.tenants.get(DEFAULT_TENANT, ())
+        })
+        # 게재 위치별 A/B 실험 (없으면 빈 집합)
+        object.__setattr__(self, "experiments", experiments if experiments is not None else ExperimentSet())
+        object.__setattr__(self, "version", _content_version(placements, self.experiments))
+        object.__setattr__(self, "redirects", RedirectTable(placements.values()))
+        object.__setattr__(self, "inventory", InventoryIndex(placements.values(), generation))
+
+    def banner(self, position, tenant=DEFAULT_TENANT):
+        """테넌트/위치 이름으로 배너를 찾습니다. 없으면 None."""
+        return self.placements.get((tenant, position))
+
+    def as_dict(self, clicks=None):
+        """기존 /api/ad-config 응답과 같은 모양의 새 dict를 만듭니다.
+
+        ``clicks`` 로 {item_id: 클릭 수} 를 넘기면 배너/아이템별 클릭 수를 채웁니다.
+        """
+        return {banner.key: banner.as_dict(clicks) for banner in self.banners.values()}
+
+    def tenant_dict(self, tenant, clicks=None):
+        """테넌트 하나의 전체 게재 위치 설정. 없는 테넌트면 None."""
+        banners = self.tenants.get(tenant)
+        if banners is None:
+            return None
+        placements = {}
+        for banner in banners:
+            data = banner.as_dict(clicks)
+            for item, item_data in zip(banner.items, data["items"]):
+                item_data["id"] = item.id
+                item_data["tracking_url"] = banner.tracking_url(item)
+            placements[banner.position] = data
+        return {"tenant": tenant, "generation": self.generation, "placements": placements}
+
+
+def _content_version(placements, experiments=()):
+    digest = hashlib.blake2b(digest_size=8)
+    for experiment in experiments:
+        digest.update(repr(experiment.as_dict()).encode())
+    for banner in placements.values():
+        digest.update(f"{banner.tenant}\0{banner.key}\0{banner.enabled}\0".encode())
+        for item in banner.items:
+            digest.update(
+                f"{item.id}\0{item.image_url}\0{item.click_url}\0"
+                f"{item.weight}\0{item.start}\0{item.end}\0"
+                f"{item.locales}\0{item.platforms}\0{format_rules(item.targeting)}\0"
+                f"{item.frequency_cap}\0{item.daily_impressions}\0{item.daily_clicks}\0".encode()
+            )
+    return digest.hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 스냅샷 빌드 / 보관
+# ═══════════════════════════════════════════════════════════════════════
+
+def parse_time(value):
+    """epoch 초 또는 ISO 8601 문자열을 epoch 초로 바꿉니다. 시간대가 없으면 UTC."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_weight(value):
+    """가중치를 float 로. 유한한 0 이상 값이 아니면 ValueError (모든 저장소 공통)."""
+    weight = float(1.0 if value in (None, "") else value)
+    if not math.isfinite(weight) or weight < 0:
+        raise ValueError(f"invalid weight: {value!r}")
+    return weight
+
+
+def _is_enabled(value):
+    if isinstance(value, str):
+        return value.lower() != "false"
+    return value is None or bool(value)
+
+
+def _tags(value):
+    """"ko, en-US" 또는 ["ko", "en-US"] → ("ko", "en-us")."""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(sorted({str(tag).strip().lower() for tag in value if str(tag).strip()}))
+
+
+def _build_banner(tenant, position, block, default_id, placeholder=None):
+    raw_items = [
+        item for item in block.get("items", ())
+        if item.get("image_url") and _is_enabled(item.get("enabled"))
+    ]
+    if not raw_items and placeholder:
+        raw_items = [placeholder]
+    items = [
+        AdItem(
+            str(item.get("id") or default_id(index)),
+            index,
+            item["image_url"],
+            item.get("click_url") or "",
+            weight=parse_weight(item.get("weight")),
+            start=parse_time(item.get("start")),
+            end=parse_time(item.get("end")),
+            locales=_tags(item.get("locales")),
+            platforms=_tags(item.get("platforms")),
+            targeting=parse_rules(item.get("targeting")),
+            frequency_cap=parse_cap(item.get("frequency_cap")),
+            daily_impressions=int(item.get("daily_impressions") or 0),
+            daily_clicks=int(item.get("daily_clicks") or 0),
+        )
+        for index, item in enumerate(raw_items)
+    ]
+    return Banner(position, bool(block.get("enabled", True)), items, tenant=tenant)
+
+
+def document_blocks(document):
+    """문서의 (tenant, position, 배너 블록, 기본 id 함수) 를 스냅샷 배너 순서로."""
+    for position in POSITIONS:
+        yield (
+            DEFAULT_TENANT, position, document.get(f"{position}_banner") or {},
+            lambda index, position=position: f"{position}-{index + 1}",
+        )
+    for tenant, tenant_block in (document.get("tenants") or {}).items():
+        for placement, block in (tenant_block.get("placements") or {}).items():
+            if tenant == DEFAULT_TENANT and placement in POSITIONS:
+                continue  # 기본 테넌트의 top/bottom 은 위에서 처리
+            yield tenant, placement, block, lambda index, t=tenant, p=placement: f"{t}:{p}-{index + 1}"
+
+
+def assign_item_ids(document):
+    """id 가 없는 소재에 스냅샷이 붙이는 것과 같은 기본 id 를 문서에 적습니다 (제자리 수정).
+
+    쓰기 API 가 소재를 지우거나 끼워 넣어도 남은 소재의 id 가 밀리지 않게 합니다.
+    """
+    for _, _, block, default_id in document_blocks(document):
+        items = block.get("items") or ()
+        live = [item for item in items if item.get("image_url") and _is_enabled(item.get("enabled"))]
+        for index, item in enumerate(live):
+            if not item.get("id"):
+                item["id"] = default_id(index)
+        used = {item.get("id") for item in items}
+        number = len(live)
+        for item in items:
+            if not item.get("id"):
+                while default_id(number) in used:
+                    number += 1
+                item["id"] = default_id(number)
+                used.add(item["id"])
+    return document
+
+
+def build_snapshot(document, generation=0, fingerprint=""):
+    """설정 문서를 불변 스냅샷으로 변환합니다.
+
+    ``top_banner``/``bottom_banner`` 는 기본 테넌트의 top/bottom 이 되고,
+    ``tenants`` 아래에 {"<tenant>": {"placements": {"<name>": {...}}}} 로
+    다른 앱/게재 위치를 추가할 수 있습니다. ``enabled`` 가 false 인 소재는
+    빠지고, 남은 소재의 index 가 클릭 URL의 슬롯 번호가 됩니다.
+    ``experiments`` 는 게재 위치별 A/B 실험입니다 (adserver.experiments).
+    """
+    banners = [
+        _build_banner(
+            tenant, position, block, default_id,
+            PLACEHOLDERS.get(position) if tenant == DEFAULT_TENANT else None,
+        )
+        for tenant, position, block, default_id in document_blocks(document)
+    ]
+    experiments = parse_experiments(
+        document.get("experiments"), {(banner.tenant, banner.position): banner for banner in banners},
+    )
+    return ConfigSnapshot(generation, fingerprint, banners, experiments=experiments)
+
+
+class SnapshotHolder:
+    """현재 스냅샷을 보관하고 필요할 때만 원자적으로 교체합니다.
+
+    ``check_interval`` 이 0보다 크면 그 간격(초)마다 저장소 지문을 확인해
+    바뀐 경우에만 다시 빌드합니다. 0이면 ``refresh()``/``reload()`` 를
+    명시적으로 호출할 때만 다시 빌드합니다.
+    """
+
+    def __init__(self, store, check_interval=0.0):
+        self.store = store
+        self.check_interval = check_interval
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._next_check = 0.0
+        self._snapshot = None
+        self.reload()
+
+    def current(self):
+        """현재 스냅샷을 반환합니다. 요청 경로에서 호출하는 빠른 경로입니다."""
+        if self.check_interval > 0 and time.monotonic() >= self._next_check:
+            try:
+                return self.refresh()
+            except Exception:
+                # 저장소를 못 읽으면 기존 스냅샷으로 계속 서비스합니다
+                logger.exception("config refresh failed; keeping generation %s",
+                                 self._snapshot.generation)
+        return self._snapshot
+
+    def refresh(self):
+        """저장소 지문이 바뀐 경우에만 다시 빌드합니다."""
+        self._next_check = time.monotonic() + self.check_interval
+        if self.store.fingerprint() != self._snapshot.fingerprint:
+            return self.reload()
+        return self._snapshot
+
+    def reload(self):
+        """저장소를 다시 읽어 새 세대의 스냅샷으로 교체합니다."""
+        with self._lock:
+            fingerprint = self.store.fingerprint()
+            snapshot = build_snapshot(self.store.load(), next(self._generations), fingerprint)
+            self._snapshot = snapshot
+            self._next_check = time.monotonic() + self.check_interval
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(snapshot)
+        return snapshot
+
+    def subscribe(self, listener):
+        """스냅샷이 교체될 때마다 ``listener(snapshot)`` 을 호출합니다."""
+        self._listeners.append(listener)
+        return listener
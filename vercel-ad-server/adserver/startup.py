@@ -0,0 +1,54 @@
+"""콜드 스타트 계측.
+
+``AD_STARTUP_PROFILE=1`` 이면 Flask/모듈 import 시간, 첫 설정 빌드 시간,
+첫 응답까지의 시간을 기록해 진단 엔드포인트와 JSON 로그 한 줄로
+내보냅니다. 꺼져 있으면 기록 호출은 아무것도 하지 않습니다.
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("adserver.startup")
+
+
+class StartupProfile:
+    """구간별 소요 시간(ms)을 모으는 기록기."""
+
+    def __init__(self, started, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get("AD_STARTUP_PROFILE", "") in ("1", "true")
+        self.enabled = enabled
+        self.started = started
+        self.timings = {}
+        self.first_response_done = False
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.timings[name] = round(seconds * 1000, 3)
+
+    def since_start(self, name):
+        """모듈 import 시작 시점부터 지금까지를 기록합니다."""
+        self.record(name, time.perf_counter() - self.started)
+
+    @contextmanager
+    def timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def first_response(self, route):
+        """첫 응답 때 한 번만 기록하고 구조화 로그를 남깁니다."""
+        if self.first_response_done:
+            return
+        self.first_response_done = True
+        self.since_start("first_response")
+        self.timings["first_route"] = route
+        logger.warning("startup %s", json.dumps(self.as_dict(), sort_keys=True))
+
+    def as_dict(self):
+        return {"event": "startup", "pid": os.getpid(), "enabled": self.enabled, "timings_ms": dict(self.timings)}
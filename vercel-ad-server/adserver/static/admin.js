@@ -0,0 +1,216 @@
+let topBannerCount = 1;
+let bottomBannerCount = 1;
+
+function showTab(tabName) {
+    document.querySelectorAll('.tab-content').forEach(el => el.classList.remove('active'));
+    document.querySelectorAll('.tab-btn').forEach(el => el.classList.remove('active'));
+    document.getElementById('tab-' + tabName).classList.add('active');
+    event.target.classList.add('active');
+}
+
+function updatePreview() {
+    // 상단 배너 미리보기
+    for (let i = 1; i <= topBannerCount; i++) {
+        const imgInput = document.getElementById('top_img_' + i);
+        const previewBox = document.getElementById('top_preview_' + i);
+        if (imgInput && previewBox) {
+            if (imgInput.value) {
+                previewBox.innerHTML = '<img src="' + imgInput.value + '" onerror="this.parentElement.innerHTML=\'<span class=placeholder>이미지를 불러올 수 없습니다</span>\'">';
+            } else {
+                previewBox.innerHTML = '<span class="placeholder">이미지 URL을 입력하면 미리보기가 표시됩니다</span>';
+            }
+        }
+    }
+
+    // 하단 배너 미리보기
+    for (let i = 1; i <= bottomBannerCount; i++) {
+        const imgInput = document.getElementById('bottom_img_' + i);
+        const previewBox = document.getElementById('bottom_preview_' + i);
+        if (imgInput && previewBox) {
+            if (imgInput.value) {
+                previewBox.innerHTML = '<img src="' + imgInput.value + '" onerror="this.parentElement.innerHTML=\'<span class=placeholder>이미지를 불러올 수 없습니다</span>\'">';
+            } else {
+                previewBox.innerHTML = '<span class="placeholder">이미지 URL을 입력하면 미리보기가 표시됩니다</span>';
+            }
+        }
+    }
+
+    // 환경변수 업데이트
+    generateEnvVars();
+}
+
+function addBannerField(position) {
+    let count, container;
+    if (position === 'top') {
+        topBannerCount++;
+        count = topBannerCount;
+        container = document.getElementById('top-banners');
+    } else {
+        bottomBannerCount++;
+        count = bottomBannerCount;
+        container = document.getElementById('bottom-banners');
+    }
+
+    const html = `
+        <hr style="border: 0; border-top: 1px solid #333; margin: 20px 0;">
+        <div class="form-group">
+            <label>이미지 #${count} URL</label>
+            <input type="text" id="${position}_img_${count}" placeholder="https://i.imgur.com/example.png" oninput="updatePreview()">
+        </div>
+        <div class="form-group">
+            <label>클릭 링크 #${count}</label>
+            <input type="text" id="${position}_link_${count}" placeholder="https://example.com" oninput="updatePreview()">
+        </div>
+        <div class="preview-box" id="${position}_preview_${count}">
+            <span class="placeholder">이미지 URL을 입력하면 미리보기가 표시됩니다</span>
+        </div>
+    `;
+    container.insertAdjacentHTML('beforeend', html);
+}
+
+function generateEnvVars() {
+    let envVars = [];
+
+    // 상단 배너
+    const topEnabled = document.getElementById('top_enabled').checked;
+    envVars.push('TOP_BANNER_ENABLED=' + topEnabled);
+
+    for (let i = 1; i <= topBannerCount; i++) {
+        const img = document.getElementById('top_img_' + i)?.value || '';
+        const link = document.getElementById('top_link_' + i)?.value || '';
+        if (img) {
+            envVars.push('TOP_BANNER_IMG_' + i + '=' + img);
+            envVars.push('TOP_BANNER_LINK_' + i + '=' + link);
+        }
+    }
+
+    // 하단 배너
+    const bottomEnabled = document.getElementById('bottom_enabled').checked;
+    envVars.push('BOTTOM_BANNER_ENABLED=' + bottomEnabled);
+
+    for (let i = 1; i <= bottomBannerCount; i++) {
+        const img = document.getElementById('bottom_img_' + i)?.value || '';
+        const link = document.getElementById('bottom_link_' + i)?.value || '';
+        if (img) {
+            envVars.push('BOTTOM_BANNER_IMG_' + i + '=' + img);
+            envVars.push('BOTTOM_BANNER_LINK_' + i + '=' + link);
+        }
+    }
+
+    document.getElementById('env-output').textContent = envVars.join('\n');
+}
+
+function copyEnvVars() {
+    const envText = document.getElementById('env-output').textContent;
+    navigator.clipboard.writeText(envText).then(() => {
+        alert('환경변수가 클립보드에 복사되었습니다!\n\nVercel Dashboard > Settings > Environment Variables에 붙여넣기 하세요.');
+    });
+}
+
+// 관리 쓰기 API 에서 불러온 설정 (리비전과 위치별 원본 소재)
+let loadedConfig = null;
+
+function adminToken() {
+    let token = sessionStorage.getItem('adminToken');
+    if (!token) {
+        token = prompt('관리 API 토큰 (AD_ADMIN_TOKEN)');
+        if (token) sessionStorage.setItem('adminToken', token);
+    }
+    return token;
+}
+
+function adminFetch(path, options) {
+    const token = adminToken();
+    if (!token) return Promise.reject('토큰이 필요합니다');
+    options = options || {};
+    options.headers = Object.assign({ 'Content-Type': 'application/json', 'Authorization': 'Bearer ' + token },
+                                    options.headers || {});
+    return fetch(path, options).then(response => response.json().then(result => {
+        if (response.status === 401) sessionStorage.removeItem('adminToken');
+        return { ok: response.ok, result: result };
+    }));
+}
+
+function loadFromServer() {
+    // 저장된 설정으로 편집기를 채움 (폼에 없는 필드는 저장 시 그대로 유지)
+    const output = document.getElementById('save-output');
+    output.textContent = '불러오는 중...';
+    return adminFetch('/api/admin/config').then(({ ok, result }) => {
+        if (!ok) {
+            output.textContent = '불러오기 실패: ' + result.error;
+            return;
+        }
+        loadedConfig = { revision: result.revision, items: {} };
+        ['top', 'bottom'].forEach(position => {
+            const block = result.document[position + '_banner'] || {};
+            const items = block.items || [];
+            loadedConfig.items[position] = items;
+            document.getElementById(position + '_enabled').checked = block.enabled !== false;
+            while ((position === 'top' ? topBannerCount : bottomBannerCount) < items.length) {
+                addBannerField(position);
+            }
+            const count = position === 'top' ? topBannerCount : bottomBannerCount;
+            for (let i = 1; i <= count; i++) {
+                const item = items[i - 1] || {};
+                document.getElementById(position + '_img_' + i).value = item.image_url || '';
+                document.getElementById(position + '_link_' + i).value = item.click_url || '';
+            }
+        });
+        updatePreview();
+        output.textContent = '불러옴: 리비전 ' + result.revision;
+    }).catch(error => {
+        output.textContent = '불러오기 실패: ' + error;
+    });
+}
+
+function editedItems(position, count) {
+    // 폼의 n 번째 칸은 불러온 n 번째 소재를 고친 것: id/가중치/타기팅/예산/일정은 유지
+    const originals = loadedConfig.items[position] || [];
+    const items = [];
+    for (let i = 1; i <= count; i++) {
+        const img = document.getElementById(position + '_img_' + i)?.value || '';
+        const link = document.getElementById(position + '_link_' + i)?.value || '';
+        if (img) {
+            items.push(Object.assign({}, originals[i - 1] || {}, { image_url: img, click_url: link }));
+        }
+    }
+    return items;
+}
+
+function saveToServer() {
+    // 관리 쓰기 API: 불러온 리비전을 기준으로 상단/하단 배너를 한 리비전으로 저장
+    const output = document.getElementById('save-output');
+    if (!loadedConfig) {
+        loadFromServer().then(() => {
+            if (loadedConfig) output.textContent += '\n저장된 설정을 불러왔습니다. 확인 후 다시 저장하세요.';
+        });
+        return;
+    }
+    output.textContent = '이미지 확인 및 저장 중...';
+    adminFetch('/api/admin/creatives', {
+        method: 'POST',
+        body: JSON.stringify({
+            base_revision: loadedConfig.revision,
+            note: 'admin editor',
+            operations: [
+                { op: 'replace', placement: 'top', enabled: document.getElementById('top_enabled').checked,
+                  items: editedItems('top', topBannerCount) },
+                { op: 'replace', placement: 'bottom', enabled: document.getElementById('bottom_enabled').checked,
+                  items: editedItems('bottom', bottomBannerCount) },
+            ],
+        }),
+    }).then(({ ok, result }) => {
+        if (ok) {
+            output.textContent = '저장됨: 리비전 ' + result.revision + ' (세대 ' + result.generation + ')';
+            loadFromServer();
+        } else {
+            const errors = (result.errors || []).map(e => '- ' + (e.image_url ? e.image_url + ': ' : '') + e.error);
+            output.textContent = '저장 실패: ' + result.error + (errors.length ? '\n' + errors.join('\n') : '');
+        }
+    }).catch(error => {
+        output.textContent = '저장 실패: ' + error;
+    });
+}
+
+// 초기화
+generateEnvVars();
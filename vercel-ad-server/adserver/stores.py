@@ -0,0 +1,283 @@
+"""광고 설정 저장소.
+
+모든 저장소는 같은 인터페이스를 가집니다.
+
+- ``fingerprint()``: 내용이 바뀌었는지 싸게 확인할 수 있는 문자열
+- ``load()``: {"top_banner": {"enabled": ..., "items": [...]}, ...} 문서
+
+SQLite 저장소는 쓰기도 지원합니다 (``commit()``/``history()``/``document_at()``,
+관리 쓰기 API 가 사용).
+
+``AD_CONFIG_STORE`` 환경변수로 고릅니다: ``env`` (기본값),
+``file:/path/config.json``, ``sqlite:/path/config.db``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from adserver.snapshot import POSITIONS
+
+logger = logging.getLogger("adserver")
+
+
+def _fingerprint(pairs):
+    digest = hashlib.blake2b(digest_size=16)
+    for key, value in sorted(pairs):
+        digest.update(f"{key}={value}\0".encode())
+    return digest.hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 환경변수
+# ═══════════════════════════════════════════════════════════════════════
+
+class EnvStore:
+    """환경변수(TOP_BANNER_*, BOTTOM_BANNER_*, AD_EXPERIMENTS)에서 설정을 읽는 저장소."""
+
+    def __init__(self, environ=None):
+        self.environ = os.environ if environ is None else environ
+        self._prefixes = tuple(f"{position.upper()}_BANNER_" for position in POSITIONS) + ("AD_EXPERIMENTS",)
+
+    def fingerprint(self):
+        return _fingerprint(
+            (key, value) for key, value in self.environ.items()
+            if key.startswith(self._prefixes)
+        )
+
+    def load(self):
+        """{PREFIX}IMG_n 이 있는 모든 n 을 번호 순으로 읽습니다 (개수 제한 없음).
+
+        소재별로 LINK_n, WEIGHT_n, START_n, END_n, TARGETING_n, FREQUENCY_CAP_n,
+        DAILY_IMPRESSIONS_n, DAILY_CLICKS_n 을 함께 쓸 수 있습니다.
+        A/B 실험은 AD_EXPERIMENTS 에 JSON 목록으로 둡니다 (소재 id 는 top-1 형식).
+        """
+        environ = self.environ
+        document = {}
+        for position in POSITIONS:
+            prefix = f"{position.upper()}_BANNER_"
+            numbers = sorted(
+                int(key[len(prefix) + 4:]) for key in environ
+                if key.startswith(prefix + "IMG_") and key[len(prefix) + 4:].isdigit()
+            )
+            items = []
+            for i in numbers:
+                img = environ.get(f"{prefix}IMG_{i}")
+                if not img:
+                    continue
+                item = {
+                    "id": f"{position}-{i}",
+                    "image_url": img,
+                    "click_url": environ.get(f"{prefix}LINK_{i}", ""),
+                }
+                for field in ("weight", "start", "end", "targeting", "frequency_cap",
+                              "daily_impressions", "daily_clicks"):
+                    value = environ.get(f"{prefix}{field.upper()}_{i}")
+                    if value:
+                        item[field] = value
+                items.append(item)
+            document[f"{position}_banner"] = {
+                "enabled": environ.get(f"{prefix}ENABLED", "true").lower() == "true",
+                "items": items,
+            }
+        experiments = environ.get("AD_EXPERIMENTS")
+        if experiments:
+            document["experiments"] = json.loads(experiments)
+        return document
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# JSON 파일
+# ═══════════════════════════════════════════════════════════════════════
+
+class JsonFileStore:
+    """JSON 파일 하나에 설정 문서를 두는 저장소.
+
+    지문은 파일의 (mtime, size) 라서 stat 한 번으로 변경을 감지합니다.
+    파일을 고칠 때는 임시 파일에 쓴 뒤 rename 하면 반쯤 쓰인 파일을 읽지
+    않습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def fingerprint(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return "missing"
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return {}
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# SQLite
+# ═══════════════════════════════════════════════════════════════════════
+
+class ConflictError(Exception):
+    """다른 쓰기가 먼저 커밋되어 기준 리비전이 맞지 않을 때."""
+
+    def __init__(self, expected, actual):
+        super().__init__(f"config revision is {actual}, expected {expected}")
+        self.expected = expected
+        self.actual = actual
+
+
+class SQLiteStore:
+    """SQLite 의 한 행에 설정 문서와 리비전 번호를 두는 저장소.
+
+    커밋한 리비전은 ``ad_config_history`` 에 모두 남아 어느 리비전으로든
+    되돌릴 수 있습니다 (되돌리기도 새 리비전으로 커밋).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ad_config ("
+                " id INTEGER PRIMARY KEY CHECK (id = 1),"
+                " revision INTEGER NOT NULL,"
+                " document TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ad_config_history ("
+                " revision INTEGER PRIMARY KEY,"
+                " document TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " note TEXT NOT NULL DEFAULT '')"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def fingerprint(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT revision FROM ad_config WHERE id = 1").fetchone()
+        return f"rev:{row[0]}" if row else "empty"
+
+    def revision(self):
+        """현재 리비전 (아직 없으면 0)."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT revision FROM ad_config WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def load(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT document FROM ad_config WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save(self, document):
+        """문서를 저장하고 리비전을 올립니다."""
+        return self.commit(document)
+
+    def commit(self, document, expected=None, note=""):
+        """문서를 한 트랜잭션으로 새 리비전으로 커밋하고 그 리비전을 돌려줍니다.
+
+        ``expected`` 가 있으면 현재 리비전이 같을 때만 씁니다 (아니면 ConflictError).
+        """
+        conn = self._connect()
+        try:
+            # 쓰기 잠금을 먼저 잡아 리비전 확인과 쓰기 사이에 다른 커밋이 끼지 않게
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT revision, document FROM ad_config WHERE id = 1").fetchone()
+            current = row[0] if row else 0
+            if expected is not None and expected != current:
+                raise ConflictError(expected, current)
+            now = time.time()
+            if row is not None:
+                # 이력 테이블 이전에 저장된 리비전도 되돌릴 수 있게 남김
+                conn.execute(
+                    "INSERT OR IGNORE INTO ad_config_history (revision, document, created) VALUES (?, ?, ?)",
+                    (current, row[1], now),
+                )
+            revision = current + 1
+            text = json.dumps(document, ensure_ascii=False)
+            conn.execute(
+                "INSERT INTO ad_config (id, revision, document) VALUES (1, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET revision = excluded.revision, document = excluded.document",
+                (revision, text),
+            )
+            conn.execute(
+                "INSERT INTO ad_config_history (revision, document, created, note) VALUES (?, ?, ?, ?)",
+                (revision, text, now, note),
+            )
+            conn.commit()
+            return revision
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def history(self, limit=50):
+        """최근 리비전부터 [{"revision", "created", "note"}]."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT revision, created, note FROM ad_config_history ORDER BY revision DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [{"revision": r, "created": created, "note": note} for r, created, note in rows]
+
+    def document_at(self, revision):
+        """리비전의 문서. 이력에 없으면 None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT document FROM ad_config_history WHERE revision = ?", (revision,),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def store_from_env(environ=None):
+    """AD_CONFIG_STORE 값에 맞는 저장소를 만듭니다."""
+    environ = os.environ if environ is None else environ
+    spec = environ.get("AD_CONFIG_STORE", "env")
+    kind, _, path = spec.partition(":")
+    if kind == "env":
+        return EnvStore(environ)
+    if kind == "file" and path:
+        return JsonFileStore(path)
+    if kind == "sqlite" and path:
+        return SQLiteStore(path)
+    raise ValueError(f"unknown AD_CONFIG_STORE: {spec!r}")
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 변경 감시
+# ═══════════════════════════════════════════════════════════════════════
+
+class ConfigWatcher:
+    """백그라운드에서 저장소 지문을 폴링해 바뀌면 스냅샷을 교체합니다."""
+
+    def __init__(self, holder, interval=1.0):
+        self.holder = holder
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ad-config-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.holder.refresh()
+            except Exception:
+                # 쓰는 도중의 파일 등: 기존 스냅샷을 유지하고 다음 주기에 다시 시도
+                logger.exception("config reload failed; keeping current snapshot")
+                time.sleep(self.interval)
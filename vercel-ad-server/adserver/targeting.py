@@ -0,0 +1,275 @@
+"""타기팅 규칙 DSL 과 비트셋 매처.
+
+소재마다 규칙 문자열을 둘 수 있습니다. 절은 ``;`` 로 구분하고 모두
+만족해야 합니다.
+
+    os in windows,macos; country not in CN; version >= 2.1; hour in 9-18
+
+- 속성: ``os``, ``locale``, ``country``, ``version``, ``hour``
+- 연산자: ``in``, ``not in``, ``==``, ``!=`` (모든 속성),
+  ``>=``, ``>``, ``<=``, ``<`` (version)
+- hour 값은 ``시작-끝`` 범위(끝 미포함, 자정을 넘는 ``22-6`` 가능)
+
+설정을 읽을 때 게재 위치별로 속성값 → 소재 비트마스크 테이블로
+컴파일해 두므로, 요청 하나를 소재 수백 개와 맞춰 보는 일이 속성 수만큼의
+dict 조회와 정수 AND 몇 번으로 끝납니다.
+"""
+
+import bisect
+import os
+import time
+
+ATTRIBUTES = ("os", "locale", "country", "version", "hour")
+CATEGORICAL = ("os", "locale", "country")
+
+# 시각 타기팅에 쓰는 UTC 기준 시차 (기본: 한국 표준시)
+UTC_OFFSET_HOURS = float(os.environ.get("AD_TARGETING_UTC_OFFSET", "9"))
+
+
+class TargetingError(ValueError):
+    """규칙 문자열을 해석할 수 없을 때."""
+
+
+class Rule:
+    """속성 하나에 대한 조건 하나."""
+
+    __slots__ = ("attribute", "op", "values")
+
+    def __init__(self, attribute, op, values):
+        self.attribute = attribute
+        self.op = op
+        self.values = values
+
+    def __repr__(self):
+        return f"Rule({self.attribute!r}, {self.op!r}, {self.values!r})"
+
+    def __str__(self):
+        if self.attribute == "hour":
+            values = ",".join(f"{start}-{end}" for start, end in self.values)
+        elif self.attribute == "version":
+            values = ",".join(".".join(map(str, v)) for v in self.values)
+        else:
+            values = ",".join(self.values)
+        return f"{self.attribute} {self.op} {values}"
+
+
+def parse_version(text):
+    """"2.10.1" → (2, 10, 1). 숫자가 아닌 꼬리는 무시합니다."""
+    parts = []
+    for part in str(text).strip().lstrip("vV").split("."):
+        digits = ""
+        for ch in part:
+            if not ch.isdigit():
+                break
+            digits += ch
+        if not digits:
+            break
+        parts.append(int(digits))
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    if not parts:
+        raise TargetingError(f"invalid version: {text!r}")
+    return tuple(parts)
+
+
+def _parse_hours(text):
+    ranges = []
+    for part in text.split(","):
+        start, sep, end = part.strip().partition("-")
+        try:
+            start = int(start)
+            end = int(end) if sep else start + 1
+        except ValueError:
+            raise TargetingError(f"invalid hour range: {part!r}") from None
+        if not (0 <= start <= 23 and 0 <= end <= 24):
+            raise TargetingError(f"invalid hour range: {part!r}")
+        ranges.append((start, end))
+    return tuple(ranges)
+
+
+def _hour_set(ranges):
+    hours = set()
+    for start, end in ranges:
+        if start < end:
+            hours.update(range(start, end))
+        else:  # 자정을 넘는 범위
+            hours.update(range(start, 24))
+            hours.update(range(0, end))
+    return hours
+
+
+_OPS = ("not in", ">=", "<=", "==", "!=", "in", ">", "<")
+
+
+def parse_clause(clause):
+    text = clause.strip()
+    attribute, _, rest = text.partition(" ")
+    attribute = attribute.lower()
+    if attribute not in ATTRIBUTES:
+        raise TargetingError(f"unknown attribute in {clause!r}")
+    rest = rest.strip()
+    for op in _OPS:
+        if rest.startswith(op):
+            raw = rest[len(op):].strip()
+            break
+    else:
+        raise TargetingError(f"unknown operator in {clause!r}")
+    if not raw:
+        raise TargetingError(f"missing value in {clause!r}")
+    op = {"==": "in", "!=": "not in"}.get(op, op)
+    if attribute == "hour":
+        if op not in ("in", "not in"):
+            raise TargetingError(f"hour only supports in/not in: {clause!r}")
+        return Rule(attribute, op, _parse_hours(raw))
+    if attribute == "version":
+        return Rule(attribute, op, tuple(parse_version(v) for v in raw.split(",")))
+    if op not in ("in", "not in"):
+        raise TargetingError(f"{attribute} only supports in/not in: {clause!r}")
+    return Rule(attribute, op, tuple(sorted({v.strip().lower() for v in raw.split(",") if v.strip()})))
+
+
+def parse_rules(value):
+    """규칙 문자열(또는 절 문자열 리스트)을 Rule 튜플로 바꿉니다."""
+    if not value:
+        return ()
+    clauses = value.split(";") if isinstance(value, str) else value
+    return tuple(parse_clause(clause) for clause in clauses if clause.strip())
+
+
+def format_rules(rules):
+    return "; ".join(str(rule) for rule in rules)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 요청 컨텍스트
+# ═══════════════════════════════════════════════════════════════════════
+
+class TargetingContext:
+    """매칭에 쓰는 요청 속성 (없는 값은 None)."""
+
+    __slots__ = ("os", "locale", "country", "version", "hour")
+
+    def __init__(self, os=None, locale=None, country=None, version=None, hour=None):
+        self.os = os.lower() if os else None
+        self.locale = locale.lower() if locale else None
+        self.country = country.lower() if country else None
+        try:
+            self.version = parse_version(version) if version else None
+        except TargetingError:
+            self.version = None
+        if hour is None:
+            hour = int((time.time() / 3600 + UTC_OFFSET_HOURS) % 24)
+        self.hour = hour
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 비트셋 매처
+# ═══════════════════════════════════════════════════════════════════════
+
+def _rule_accepts_version(rule, compare):
+    """compare(b) → -1/0/1 (요청 버전 vs 규칙 값 b) 로 규칙을 평가합니다."""
+    results = [compare(value) for value in rule.values]
+    if rule.op == "in":
+        return any(r == 0 for r in results)
+    if rule.op == "not in":
+        return all(r != 0 for r in results)
+    r = results[0]
+    return {">=": r >= 0, ">": r > 0, "<=": r <= 0, "<": r < 0}[rule.op]
+
+
+class TargetingMatcher:
+    """소재 목록의 규칙을 속성별 비트마스크 테이블로 컴파일한 매처.
+
+    비트 i 는 ``items[i]`` 를 뜻합니다. 속성마다 "값 → 그 값을 허용하는
+    소재 비트마스크" 를 미리 만들어 두고, 요청 시에는 속성별 마스크를
+    AND 로 교차합니다.
+    """
+
+    __slots__ = ("all_mask", "trivial", "_categorical", "_hours", "_breakpoints", "_version_masks",
+                 "_version_unknown")
+
+    def __init__(self, items):
+        items = list(items)
+        self.all_mask = (1 << len(items)) - 1
+        self.trivial = not any(item.targeting for item in items)
+        # 속성별 (비트, 그 소재의 규칙 리스트). 규칙 없는 소재는 unconstrained 마스크로
+        constrained = {attribute: [] for attribute in ATTRIBUTES}
+        unconstrained = dict.fromkeys(ATTRIBUTES, self.all_mask)
+        for bit, item in enumerate(items):
+            by_attribute = {}
+            for rule in item.targeting:
+                by_attribute.setdefault(rule.attribute, []).append(rule)
+            for attribute, rules in by_attribute.items():
+                constrained[attribute].append((bit, rules))
+                unconstrained[attribute] &= ~(1 << bit)
+
+        self._categorical = {
+            attribute: self._compile_categorical(constrained[attribute], unconstrained[attribute])
+            for attribute in CATEGORICAL
+        }
+        self._hours = self._compile_hours(constrained["hour"], unconstrained["hour"])
+        self._compile_versions(constrained["version"], unconstrained["version"])
+
+    @staticmethod
+    def _mask(constrained, base, accepts):
+        mask = base
+        for bit, rules in constrained:
+            if all(accepts(rule) for rule in rules):
+                mask |= 1 << bit
+        return mask
+
+    def _compile_categorical(self, constrained, base):
+        mentioned = {value for _, rules in constrained for rule in rules for value in rule.values}
+        table = {
+            value: self._mask(constrained, base, lambda rule, v=value: (v in rule.values) == (rule.op == "in"))
+            for value in mentioned
+        }
+        # 규칙에 나오지 않은 값(또는 값 없음): 'not in' 규칙만 있는 소재는 통과
+        default = self._mask(constrained, base, lambda rule: rule.op == "not in")
+        return table, default
+
+    def _compile_hours(self, constrained, base):
+        hour_sets = {id(rule): _hour_set(rule.values) for _, rules in constrained for rule in rules}
+        return [
+            self._mask(constrained, base,
+                       lambda rule, h=hour: (h in hour_sets[id(rule)]) == (rule.op == "in"))
+            for hour in range(24)
+        ]
+
+    def _compile_versions(self, constrained, base):
+        points = sorted({value for _, rules in constrained for rule in rules for value in rule.values})
+        position = {value: j for j, value in enumerate(points)}
+        # 구간 r: 짝수 2i 는 (points[i-1], points[i]) 사이, 홀수 2i+1 은 points[i] 와 같음
+        masks = []
+        for region in range(2 * len(points) + 1):
+            i, exact = divmod(region, 2)
+
+            def compare(value, i=i, exact=exact):
+                j = position[value]
+                if exact:
+                    return (i > j) - (i < j)
+                return -1 if j >= i else 1
+
+            masks.append(self._mask(constrained, base, lambda rule: _rule_accepts_version(rule, compare)))
+        self._breakpoints = points
+        self._version_masks = masks
+        # 버전을 모르는 요청에는 버전 규칙이 없는 소재만
+        self._version_unknown = base
+
+    def match(self, context):
+        """context 를 만족하는 소재들의 비트마스크."""
+        if self.trivial:
+            return self.all_mask
+        mask = self.all_mask
+        for attribute in CATEGORICAL:
+            table, default = self._categorical[attribute]
+            value = getattr(context, attribute)
+            mask &= default if value is None else table.get(value, default)
+        mask &= self._hours[context.hour]
+        version = context.version
+        if version is None:
+            return mask & self._version_unknown
+        points = self._breakpoints
+        i = bisect.bisect_left(points, version)
+        region = 2 * i + 1 if i < len(points) and points[i] == version else 2 * i
+        return mask & self._version_masks[region]
@@ -0,0 +1,100 @@
+"""/click/<position>/<index> 요청당 비용 마이크로 벤치마크.
+
+기존 구현(요청마다 get_ad_config() 재구성 + redirect())과 스냅샷의
+리다이렉트 테이블을 같은 Flask 테스트 클라이언트로 비교합니다.
+
+    python bench/click_redirect.py [-n 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+from flask import Flask, redirect  # noqa: E402
+
+
+def legacy_get_ad_config():
+    """기준선: 변경 전 get_ad_config() 와 같은 방식으로 매번 재구성."""
+    config = {}
+    for position in ("top", "bottom"):
+        prefix = f"{position.upper()}_BANNER_"
+        block = {
+            "enabled": os.environ.get(f"{prefix}ENABLED", "true").lower() == "true",
+            "items": [],
+            "clicks": 0,
+        }
+        for i in range(1, 6):
+            img = os.environ.get(f"{prefix}IMG_{i}")
+            link = os.environ.get(f"{prefix}LINK_{i}", "")
+            if img:
+                block["items"].append({"image_url": img, "click_url": link})
+        if not block["items"]:
+            block["items"] = [{"image_url": "https://via.placeholder.com/900x100", "click_url": "https://vercel.com"}]
+        config[f"{position}_banner"] = block
+    return config
+
+
+def legacy_app():
+    app = Flask("legacy")
+
+    @app.route("/click/<position>/<int:index>")
+    def ad_click(position, index):
+        config = legacy_get_ad_config()
+        key = f"{position}_banner"
+        if key in config and 0 <= index < len(config[key]["items"]):
+            return redirect(config[key]["items"][index].get("click_url", "https://google.com"))
+        return "Link not found", 404
+
+    return app
+
+
+def measure(label, func, n):
+    for _ in range(min(n, 500)):
+        func()
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / n * 1e6:9.2f} us/req")
+    return elapsed / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/click 요청당 비용 비교")
+    parser.add_argument("-n", type=int, default=20000, help="요청 수")
+    args = parser.parse_args()
+
+    for i in range(1, 6):
+        os.environ.setdefault(f"TOP_BANNER_IMG_{i}", f"https://example.com/top{i}.png")
+        os.environ.setdefault(f"TOP_BANNER_LINK_{i}", f"https://example.com/top/{i}")
+
+    # 같은 클라이언트의 반복 요청이 빈도 제한(429)에 걸리지 않도록 필터를 끔
+    os.environ.setdefault("AD_FILTER", "0")
+    import index
+    from adserver.runtime import record_click
+
+    old_client = legacy_app().test_client()
+    new_client = index.app.test_client()
+    snapshot = index.snapshots.current()
+
+    print("# 핸들러 내부 조회")
+    before = measure("legacy lookup", lambda: legacy_get_ad_config()["top_banner"]["items"][3], args.n)
+    after = measure("redirect table lookup", lambda: snapshot.redirects.lookup("top", 3).to_response(), args.n)
+    print(f"{'speedup':<32} {before / after:9.1f}x")
+    # 클릭 기록 (카운터 샤드 + 일일 예산, 리포트 행은 플러시 때 배치로)
+    measure("record_click", lambda: record_click("top-4"), args.n)
+
+    print("# 테스트 클라이언트 전체 요청")
+    before = measure("legacy /click/top/3", lambda: old_client.get("/click/top/3"), args.n // 4)
+    after = measure("snapshot /click/top/3", lambda: new_client.get("/click/top/3"), args.n // 4)
+    measure("snapshot /click/top/99 (404)", lambda: new_client.get("/click/top/99"), args.n // 4)
+    print(f"{'speedup':<32} {before / after:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""서명된 클릭 토큰 발급/검증 처리량 벤치마크.
+
+  1) HMAC 만: 요청마다 hmac.new() vs 미리 해시한 내부/외부 패드 복사
+  2) ClickSigner.verify: 정상 / 위조(MAC 불일치) / 만료 / 형식 오류 토큰
+  3) Flask 테스트 클라이언트로 GET /c/<token> vs 서명 없는 /click/<position>/<index>
+
+의 초당 처리 수를 잽니다. 만료/형식 오류는 HMAC 계산 전에 거절되므로
+위조 토큰보다 빨라야 합니다.
+
+    python bench/click_tokens.py [-n 100000]
+"""
+
+import argparse
+import hashlib
+import hmac
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+from adserver.clicks import EXPIRED, FORGED, MALFORMED, OK, REPLAY, ClickSigner, KeySchedule  # noqa: E402
+from adserver.snapshot import AdItem  # noqa: E402
+
+VERSION = "0123456789abcdef"  # snapshot.version 모양
+SECRET = "bench-secret"
+
+
+def rate(func, n):
+    for _ in range(min(n, 1000)):
+        func()
+    started = time.perf_counter()
+    for _ in range(n):
+        func()
+    return n / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=100000, help="측정 반복 횟수")
+    parser.add_argument("--http", type=int, default=5000, help="Flask 경로 반복 횟수")
+    args = parser.parse_args()
+
+    now = time.time()
+    item = AdItem("creative-42", 3, "https://cdn.example.com/a.png", "https://example.com")
+    signer = ClickSigner([SECRET], replay_size=args.n * 4)
+    token = signer.issue("default", "top", item, VERSION, now)
+    message = token.encode()
+    schedule = KeySchedule(SECRET)
+
+    print(f"token length: {len(token)} chars")
+    print(f"{'case':<28} {'ops/s':>12}")
+    rows = [
+        ("hmac.new per call", lambda: hmac.new(SECRET.encode(), message, hashlib.sha256).digest()),
+        ("precomputed key schedule", lambda: schedule.sign(message)),
+        ("issue", lambda: signer.issue("default", "top", item, VERSION, now)),
+    ]
+    for label, func in rows:
+        print(f"{label:<28} {rate(func, args.n):>12,.0f}")
+
+    # 정상 토큰은 한 번만 OK, 이후는 재사용 → 매번 새 토큰으로 잼
+    fresh = [signer.issue("default", "top", item, VERSION, now) for _ in range(args.n)]
+    started = time.perf_counter()
+    for token in fresh:
+        result, _ = signer.verify(token, now)
+    assert result == OK, result
+    print(f"{'verify ok':<28} {args.n / (time.perf_counter() - started):>12,.0f}")
+
+    forged = fresh[0][:-3] + ("AAA" if fresh[0][-3:] != "AAA" else "BBB")
+    expired = signer.issue("default", "top", item, VERSION, now - 2 * signer.ttl)
+    cases = [
+        ("verify replay", fresh[0], REPLAY),
+        ("verify forged", forged, FORGED),
+        ("verify expired", expired, EXPIRED),
+        ("verify malformed", "not-a-token-at-all!!", MALFORMED),
+    ]
+    for label, token, expected in cases:
+        assert signer.verify(token, now)[0] == expected, label
+        print(f"{label:<28} {rate(lambda: signer.verify(token, now), args.n):>12,.0f}")
+
+    os.environ["AD_CLICK_SECRET"] = SECRET
+    os.environ.setdefault("AD_FILTER", "0")  # 반복 클릭이 빈도 제한(429)에 걸리지 않도록
+    from index import app  # noqa: E402
+    client = app.test_client()
+    body = client.get("/api/ad/top").json
+    urls = [client.get("/api/ad/top").json["item"]["tracking_url"] for _ in range(args.http)]
+    started = time.perf_counter()
+    for url in urls:
+        response = client.get(url)
+    assert response.status_code == 302
+    signed = args.http / (time.perf_counter() - started)
+    forged_url = urls[0][:-3] + ("AAA" if urls[0][-3:] != "AAA" else "BBB")
+    print(f"{'flask /c/<token>':<28} {signed:>12,.0f}")
+    print(f"{'flask /c/<forged>':<28} {rate(lambda: client.get(forged_url), args.http):>12,.0f}")
+    legacy = f"/click/{body['position']}/0"
+    print(f"{'flask /click (unsigned)':<28} {rate(lambda: client.get(legacy), args.http):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""vercel.json 의 모든 라우트에 대한 콜드/웜 지연 시간 벤치마크.
+
+콜드: 라우트마다 새 파이썬 프로세스에서 api/index.py 를 import 하고 첫
+요청을 WSGI 로 보냅니다 (AD_STARTUP_PROFILE=1 로 구간별 시간도 수집).
+웜: 한 프로세스에서 같은 요청을 반복합니다.
+
+    python bench/cold_start.py [--cold-runs 5] [--warm-requests 2000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+os.environ.setdefault("AD_FILTER", "0")  # 반복 요청이 빈도 제한(429)/UA 필터에 걸리지 않도록
+
+# (.*) 가 들어간 rewrite 소스를 실제로 요청할 경로. /c 와 /asset 은 서명 키나
+# 프록시된 이미지가 없으면 404 (검증/조회 경로 자체의 지연), /api/admin 은
+# AD_ADMIN_TOKEN 이 없으면 404 입니다. 상태 코드는 결과 표에 함께 찍힙니다.
+SAMPLE_PATHS = {
+    "/admin/static/(.*)": "/admin/static/admin.css",
+    "/api/ad/(.*)": "/api/ad/top",
+    "/api/tenants/(.*)": "/api/tenants/default/ad-config",
+    "/api/admin/(.*)": "/api/admin/config",
+    "/api/diagnostics/(.*)": "/api/diagnostics/startup",
+    "/click/(.*)": "/click/top/0",
+    "/c/(.*)": "/c/AQEBAAAAAAAAAAAAAAAAAAAAdG9wAHRvcC0xAAAAAAAAAAAAAAAAAAAA",
+    "/asset/(.*)": "/asset/" + "0" * 32,
+}
+
+# GET 이 아닌 라우트: 경로 → (메서드, 본문, Content-Type)
+SAMPLE_BODIES = {
+    "/api/events": (
+        "POST",
+        b'{"type": "impression", "item": "top-1"}\n{"type": "view", "item": "top-1", "value": 1200}\n',
+        "application/x-ndjson",
+    ),
+}
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import index
+imported = time.perf_counter()
+client = index.app.test_client()
+method, body, content_type = json.loads(sys.argv[3])
+response = client.open(sys.argv[2], method=method, data=body.encode("latin-1"), content_type=content_type)
+done = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (done - imported) * 1000,
+    "total_ms": (done - started) * 1000,
+    "startup": index.startup.as_dict()["timings_ms"],
+}))
+"""
+
+
+def route_paths():
+    with open(os.path.join(ROOT, "vercel.json")) as fp:
+        rewrites = json.load(fp)["rewrites"]
+    return [SAMPLE_PATHS.get(rule["source"], rule["source"]) for rule in rewrites]
+
+
+def sample_request(path):
+    """(메서드, 본문, Content-Type)."""
+    return SAMPLE_BODIES.get(path, ("GET", b"", None))
+
+
+def request(client, path):
+    method, body, content_type = sample_request(path)
+    return client.open(path, method=method, data=body, content_type=content_type)
+
+
+def cold(path, runs):
+    env = dict(os.environ, AD_STARTUP_PROFILE="1")
+    method, body, content_type = sample_request(path)
+    spec = json.dumps([method, body.decode("latin-1"), content_type])
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, os.path.join(ROOT, "api"), path, spec],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def warm(client, path, n):
+    for _ in range(min(n, 200)):
+        request(client, path)
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        request(client, path)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드/웜 지연 시간 측정")
+    parser.add_argument("--cold-runs", type=int, default=5)
+    parser.add_argument("--warm-requests", type=int, default=2000)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    os.environ["AD_STARTUP_PROFILE"] = "1"
+    import index
+    client = index.app.test_client()
+
+    report = {}
+    paths = route_paths()
+    width = max(28, *(len(path) for path in paths))
+    print(f"{'route':<{width}} {'status':>6} {'cold import':>12} {'cold 1st req':>13} {'warm p50':>10} {'warm p99':>10}  (ms)")
+    for path in paths:
+        runs = cold(path, args.cold_runs)
+        p50, p99 = warm(client, path, args.warm_requests)
+        row = {
+            "status": runs[0]["status"],
+            "cold_import_ms": statistics.median(r["import_ms"] for r in runs),
+            "cold_first_request_ms": statistics.median(r["first_request_ms"] for r in runs),
+            "cold_startup_ms": runs[0]["startup"],
+            "warm_p50_ms": p50,
+            "warm_p99_ms": p99,
+        }
+        report[path] = row
+        print(f"{path:<{width}} {row['status']:>6} {row['cold_import_ms']:>12.2f} "
+              f"{row['cold_first_request_ms']:>13.2f} {p50:>10.3f} {p99:>10.3f}")
+
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""POST /api/events 수집 처리량 벤치마크 (events/sec).
+
+NDJSON 과 바이너리 배치를 만들어
+  1) 디코딩 + 검증 + 윈도우 합산만 (프로세스 안)
+  2) Flask 테스트 클라이언트로 POST /api/events 전체 경로
+의 초당 이벤트 수를 잽니다.
+
+    python bench/event_ingest.py [--batch 1000] [--batches 50] [--chunk 65536]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+from adserver.events import (  # noqa: E402
+    BINARY, KINDS, NDJSON, BinaryDecoder, EventAggregator, NdjsonDecoder, encode_binary,
+)
+
+
+def synthetic_store(items):
+    """합성 인벤토리를 JSON 설정 파일로 쓰고 경로를 돌려줍니다."""
+    document = {
+        "top_banner": {"items": [
+            {"id": f"c{i}", "image_url": f"https://cdn.example.com/{i}.png", "click_url": "https://example.com"}
+            for i in range(items)
+        ]},
+    }
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(document, f)
+    return path
+
+
+def synthetic_events(count, items, now, rng):
+    events = []
+    for _ in range(count):
+        kind = rng.choice(KINDS)
+        events.append((kind, f"c{rng.randrange(items)}", 1, int(now - rng.randrange(600)),
+                       rng.randrange(5000) if kind == "view" else 0))
+    return events
+
+
+def encode_ndjson(events):
+    return b"".join(
+        json.dumps({"type": kind, "item": item_id, "generation": generation, "ts": ts, "value": value},
+                   separators=(",", ":")).encode() + b"\n"
+        for kind, item_id, generation, ts, value in events
+    )
+
+
+def chunks(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1000, help="배치당 이벤트 수")
+    parser.add_argument("--batches", type=int, default=50, help="측정할 배치 수")
+    parser.add_argument("--items", type=int, default=200, help="소재 수")
+    parser.add_argument("--chunk", type=int, default=65536, help="본문 청크 크기 (바이트)")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    now = time.time()
+    os.environ["AD_CONFIG_STORE"] = "file:" + synthetic_store(args.items)
+    from index import app  # noqa: E402
+    from adserver.runtime import snapshots  # noqa: E402
+    client = app.test_client()
+    snapshot = snapshots.current()
+    events = synthetic_events(args.batch, args.items, now, rng)
+    bodies = {"ndjson": encode_ndjson(events), "binary": encode_binary(events)}
+    decoders = {"ndjson": NdjsonDecoder, "binary": BinaryDecoder}
+    content_types = {"ndjson": NDJSON, "binary": BINARY}
+    total = args.batch * args.batches
+
+    print(f"{'format':>8} {'bytes/event':>12} {'in-process ev/s':>16} {'flask ev/s':>12}")
+    for name, body in bodies.items():
+        parts = chunks(body, args.chunk)
+        aggregator = EventAggregator()
+        started = time.perf_counter()
+        for _ in range(args.batches):
+            result = aggregator.ingest(decoders[name](), parts, snapshot, now)
+        in_process = total / (time.perf_counter() - started)
+        assert result["accepted"] == args.batch, result
+
+        started = time.perf_counter()
+        for _ in range(args.batches):
+            response = client.post("/api/events", data=body, content_type=content_types[name])
+        flask = total / (time.perf_counter() - started)
+        assert response.status_code == 202 and response.json["accepted"] == args.batch, response.json
+
+        print(f"{name:>8} {len(body) / args.batch:>12.1f} {in_process:>16,.0f} {flask:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""ASGI 경로와 WSGI(Flask) 경로의 로컬 부하 테스트.
+
+각 앱을 별도 프로세스의 로컬 HTTP 서버로 띄우고(WSGI: wsgiref 스레드
+서버, ASGI: uvicorn 이 있으면 uvicorn, 없으면 내장 asyncio 서버),
+asyncio 클라이언트로 동시 요청을 보내 requests/sec 와 p50/p99 지연을
+비교합니다.
+
+    python bench/load_asgi_wsgi.py [-c 64] [-n 5000] [--path /click/top/0]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 같은 클라이언트의 반복 요청이 빈도 제한(429)에 걸리지 않도록 필터를 끔
+os.environ.setdefault("AD_FILTER", "0")
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 서버
+# ═══════════════════════════════════════════════════════════════════════
+
+def serve_wsgi(port):
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    sys.path.insert(0, os.path.join(ROOT, "api"))
+    import index
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    make_server("127.0.0.1", port, index.app, ThreadingWSGIServer, QuietHandler).serve_forever()
+
+
+async def _handle(app, reader, writer):
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        writer.close()
+        return
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, _ = lines[0].split(" ", 2)
+    path, _, query = target.partition("?")
+    headers = []
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": headers, "server": ("127.0.0.1", 0), "client": None, "scheme": "http",
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            out = [f"HTTP/1.1 {message['status']} -\r\n".encode()]
+            out += [name + b": " + value + b"\r\n" for name, value in message["headers"]]
+            out.append(b"connection: close\r\n\r\n")
+            writer.write(b"".join(out))
+        elif message["type"] == "http.response.body":
+            writer.write(message.get("body", b""))
+
+    await app(scope, receive, send)
+    await writer.drain()
+    writer.close()
+
+
+def serve_asgi(port):
+    sys.path.insert(0, ROOT)
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+    if uvicorn is not None:
+        uvicorn.run("adserver.asgi:app", host="127.0.0.1", port=port, log_level="warning")
+        return
+
+    from adserver.asgi import app
+
+    async def main():
+        server = await asyncio.start_server(
+            lambda r, w: _handle(app, r, w), "127.0.0.1", port, backlog=1024,
+        )
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 부하 생성기
+# ═══════════════════════════════════════════════════════════════════════
+
+async def _request(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return data[9:12]
+
+
+async def _load(port, path, concurrency, total):
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                await _request(port, path)
+            except OSError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, sorted(latencies), errors
+
+
+def _wait_for_port(port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run(kind, args):
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, __file__, "--serve", kind, "--port", str(port)])
+    try:
+        _wait_for_port(port)
+        asyncio.run(_load(port, args.path, args.concurrency, min(args.requests, 200)))
+        elapsed, latencies, errors = asyncio.run(
+            _load(port, args.path, args.concurrency, args.requests)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{kind:<5} {len(latencies) / elapsed:>10.0f} {p50:>9.2f} {p99:>9.2f} {errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASGI vs WSGI 부하 테스트")
+    parser.add_argument("-c", "--concurrency", type=int, default=64)
+    parser.add_argument("-n", "--requests", type=int, default=5000)
+    parser.add_argument("--path", default="/click/top/0")
+    parser.add_argument("--serve", choices=("wsgi", "asgi"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve == "wsgi":
+        return serve_wsgi(args.port)
+    if args.serve == "asgi":
+        return serve_asgi(args.port)
+
+    print(f"{args.path}  concurrency={args.concurrency} requests={args.requests}")
+    print(f"{'app':<5} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    run("wsgi", args)
+    run("asgi", args)
+
+
+if __name__ == "__main__":
+    main()
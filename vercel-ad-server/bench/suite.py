@@ -0,0 +1,315 @@
+"""라우트 혼합 부하/회귀 벤치마크 모음.
+
+설정 폴링, 광고 선택, 클릭, 관리 페이지 요청을 정해진 비율로 섞어
+
+  1) 프로세스 안: Flask 테스트 클라이언트를 스레드 여러 개로
+  2) 로컬 HTTP: wsgiref 스레드 서버(bench/load_asgi_wsgi.py --serve)에 asyncio 클라이언트로
+
+보내고 혼합/동시성별 requests/sec, p50/p99 지연, 요청당 할당량
+(tracemalloc 최대치 - 시작값, 프로세스 안에서만)을 잽니다.
+
+결과는 JSON 으로 저장하고, 저장된 기준선(baseline)과 비교해 처리량이
+threshold % 넘게 줄거나 p99/할당량이 threshold % 넘게 늘면 회귀로
+표시하고 종료 코드 1 을 돌려줍니다. 기준선은 측정한 머신에서만 의미가
+있으므로 저장소에 넣지 않고 ``--update-baseline`` 으로 만듭니다.
+
+    python bench/suite.py [--modes inprocess,http] [--mixes config,click,admin,mixed]
+                          [-c 1,16] [-n 2000] [--out results.json]
+                          [--baseline bench/baseline.json] [--threshold 10] [--update-baseline]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "bench")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "api"))
+sys.path.insert(0, BENCH_DIR)
+# 같은 클라이언트의 반복 요청이 빈도 제한(429)에 걸리지 않도록 필터를 끄고,
+# 이미지 프록시가 네트워크로 나가지 않도록 원래 URL 을 씀
+os.environ.setdefault("AD_FILTER", "0")
+os.environ.setdefault("AD_ASSET_PROXY", "0")
+
+from load_asgi_wsgi import _free_port, _wait_for_port  # noqa: E402
+
+ROUTES = {
+    "config": "/api/ad-config.json",
+    "ad": "/api/ad/top",
+    "click": "/click/top/0",
+    "admin": "/admin",
+}
+
+MIXES = {
+    "config": {"config": 1},
+    "click": {"click": 1},
+    "admin": {"admin": 1},
+    "mixed": {"config": 70, "ad": 20, "click": 8, "admin": 2},
+}
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (bench)", "Accept-Encoding": "gzip, br"}
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def parse_mix(text):
+    """"config=60,click=40" → {"config": 60, "click": 40}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown route in mix: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def plan(mix, total, seed=1):
+    """혼합 비율대로 뽑은 라우트 이름 목록 (시드 고정)."""
+    names = list(mix)
+    return random.Random(seed).choices(names, weights=[mix[name] for name in names], k=total)
+
+
+def summarize(latencies, elapsed, errors):
+    """지연 목록(초) → {"rps", "p50_ms", "p99_ms", "errors"}."""
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"rps": 0.0, "p50_ms": None, "p99_ms": None, "errors": errors}
+    return {
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+        "errors": errors,
+    }
+
+
+def _result(samples, elapsed):
+    """[(route, 지연, 오류 여부)] → 전체 요약 + 라우트별 요약."""
+    result = summarize([s[1] for s in samples if not s[2]], elapsed, sum(s[2] for s in samples))
+    result["routes"] = {}
+    for name in sorted({s[0] for s in samples}):
+        picked = [s for s in samples if s[0] == name]
+        route = summarize([s[1] for s in picked if not s[2]], elapsed, sum(s[2] for s in picked))
+        route.pop("rps")
+        result["routes"][name] = route
+    return result
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 프로세스 안 (Flask 테스트 클라이언트)
+# ═══════════════════════════════════════════════════════════════════════
+
+def run_inprocess(app, routes, concurrency):
+    shards = [routes[i::concurrency] for i in range(concurrency)]
+    samples = [[] for _ in shards]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(shard, out):
+        client = app.test_client()
+        barrier.wait()
+        for name in shard:
+            started = time.perf_counter()
+            status = client.get(ROUTES[name], headers=HEADERS).status_code
+            out.append((name, time.perf_counter() - started, status >= 400))
+
+    threads = [threading.Thread(target=worker, args=args) for args in zip(shards, samples)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return _result([s for out in samples for s in out], time.perf_counter() - started)
+
+
+def measure_allocations(app, mix, samples):
+    """라우트별 요청 하나의 tracemalloc 최대 할당량(바이트) 평균과 혼합 가중 평균."""
+    client = app.test_client()
+    per_route = {}
+    tracemalloc.start()
+    try:
+        for name in mix:
+            for _ in range(10):
+                client.get(ROUTES[name], headers=HEADERS)
+            total = 0
+            for _ in range(samples):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                client.get(ROUTES[name], headers=HEADERS)
+                total += tracemalloc.get_traced_memory()[1] - before
+            per_route[name] = round(total / samples)
+    finally:
+        tracemalloc.stop()
+    weight = sum(mix.values())
+    return round(sum(per_route[name] * w for name, w in mix.items()) / weight), per_route
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 로컬 HTTP (wsgiref 스레드 서버)
+# ═══════════════════════════════════════════════════════════════════════
+
+async def _request(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = "".join(f"{name}: {value}\r\n" for name, value in HEADERS.items())
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{head}Connection: close\r\n\r\n".encode())
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return int(data[9:12])
+
+
+async def _load_http(port, routes, concurrency):
+    pending = iter(routes)
+    samples = []
+
+    async def worker():
+        for name in pending:
+            started = time.perf_counter()
+            try:
+                failed = await _request(port, ROUTES[name]) >= 400
+            except (OSError, ValueError):
+                failed = True
+            samples.append((name, time.perf_counter() - started, failed))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+class HttpServer:
+    """bench/load_asgi_wsgi.py --serve 로 띄운 별도 프로세스 서버."""
+
+    def __init__(self, kind="wsgi"):
+        self.port = _free_port()
+        self.process = subprocess.Popen([
+            sys.executable, os.path.join(BENCH_DIR, "load_asgi_wsgi.py"),
+            "--serve", kind, "--port", str(self.port),
+        ])
+        _wait_for_port(self.port)
+
+    def run(self, routes, concurrency):
+        asyncio.run(_load_http(self.port, routes[:200], concurrency))  # 워밍업
+        samples, elapsed = asyncio.run(_load_http(self.port, routes, concurrency))
+        return _result(samples, elapsed)
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 기준선 비교
+# ═══════════════════════════════════════════════════════════════════════
+
+def compare(current, baseline, threshold):
+    """(표 행 목록, 회귀 설명 목록). threshold 는 % 단위."""
+    limit = threshold / 100.0
+    rows, regressions = [], []
+    for key, result in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        changes = {}
+        for metric, worse_if_higher in (("rps", False), ("p99_ms", True), ("alloc_bytes", True)):
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            changes[metric] = change
+            if (change > limit) if worse_if_higher else (change < -limit):
+                regressions.append(f"{key} {metric}: {old} → {new} ({change:+.1%})")
+        rows.append((key, changes))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", default="inprocess,http", help="inprocess, http 중 쉼표로")
+    parser.add_argument("--mixes", default=",".join(MIXES), help="미리 정한 혼합 이름들 (쉼표로)")
+    parser.add_argument("--mix", type=parse_mix, help='추가 혼합 "config=60,click=40" (이름: custom)')
+    parser.add_argument("-c", "--concurrency", default="1,16", help="동시성 값들 (쉼표로)")
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="혼합/동시성당 요청 수")
+    parser.add_argument("--alloc-samples", type=int, default=200, help="라우트별 할당량 측정 요청 수")
+    parser.add_argument("--server", choices=("wsgi", "asgi"), default="wsgi", help="HTTP 모드 서버")
+    parser.add_argument("--out", help="결과 JSON 경로")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="비교할 기준선 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="회귀 판정 기준 (%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="이번 결과를 기준선으로 저장")
+    args = parser.parse_args()
+
+    mixes = {name: MIXES[name] for name in args.mixes.split(",") if name}
+    if args.mix:
+        mixes["custom"] = args.mix
+    modes = [mode for mode in args.modes.split(",") if mode]
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    from index import app  # noqa: E402
+
+    report = {
+        "meta": {
+            "python": platform.python_version(), "platform": platform.platform(),
+            "timestamp": int(time.time()), "requests": args.requests, "server": args.server,
+        },
+        "results": {},
+    }
+    server = HttpServer(args.server) if "http" in modes else None
+    print(f"{'mode/mix/c':<28} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'alloc B':>9} {'errors':>7}")
+    try:
+        for mix_name, mix in mixes.items():
+            routes = plan(mix, args.requests)
+            alloc = per_route = None
+            if "inprocess" in modes:
+                alloc, per_route = measure_allocations(app, mix, args.alloc_samples)
+            for mode in modes:
+                for concurrency in levels:
+                    if mode == "inprocess":
+                        result = run_inprocess(app, routes, concurrency)
+                        result["alloc_bytes"] = alloc
+                        for name, size in per_route.items():
+                            result["routes"][name]["alloc_bytes"] = size
+                    else:
+                        result = server.run(routes, concurrency)
+                    key = f"{mode}/{mix_name}/c{concurrency}"
+                    report["results"][key] = result
+                    print(f"{key:<28} {result['rps']:>10,.0f} {result['p50_ms'] or 0:>9.2f} "
+                          f"{result['p99_ms'] or 0:>9.2f} {result.get('alloc_bytes') or '-':>9} "
+                          f"{result['errors']:>7}")
+    finally:
+        if server is not None:
+            server.close()
+
+    if args.out:
+        with open(args.out, "w") as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+    if args.update_baseline:
+        with open(args.baseline, "w") as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline} (run with --update-baseline)")
+        return 0
+
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    rows, regressions = compare(report, baseline, args.threshold)
+    print(f"\nvs baseline {args.baseline} (threshold {args.threshold:g}%)")
+    print(f"{'mode/mix/c':<28} {'req/s':>9} {'p99':>9} {'alloc':>9}")
+    for key, changes in rows:
+        cells = [f"{changes[m]:+.1%}" if m in changes else "-" for m in ("rps", "p99_ms", "alloc_bytes")]
+        print(f"{key:<28} {cells[0]:>9} {cells[1]:>9} {cells[2]:>9}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""타기팅 매칭 마이크로 벤치마크.
+
+소재 10/1k/10k 개의 합성 인벤토리에서, 요청마다 모든 소재의 규칙을
+평가하는 단순 구현과 컴파일된 비트셋 매처(TargetingMatcher)를 비교합니다.
+두 방식의 결과가 같은지도 함께 확인합니다.
+
+    python bench/targeting.py [-n 2000] [--sizes 10,1000,10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from adserver.snapshot import AdItem  # noqa: E402
+from adserver.targeting import TargetingContext, TargetingMatcher, _hour_set, parse_rules  # noqa: E402
+
+OSES = ("windows", "macos", "linux", "android", "ios")
+LOCALES = ("ko", "en", "ja", "zh", "de", "fr")
+COUNTRIES = ("kr", "us", "jp", "cn", "de", "fr", "gb", "br", "in", "vn")
+VERSIONS = ("1.0", "1.5", "2.0", "2.1", "2.5", "3.0", "3.2")
+
+
+def synthetic_rules(rng):
+    clauses = []
+    if rng.random() < 0.5:
+        clauses.append(f"os {rng.choice(('in', 'not in'))} {','.join(rng.sample(OSES, rng.randint(1, 3)))}")
+    if rng.random() < 0.3:
+        clauses.append(f"locale in {','.join(rng.sample(LOCALES, rng.randint(1, 2)))}")
+    if rng.random() < 0.5:
+        clauses.append(f"country {rng.choice(('in', 'not in'))} {','.join(rng.sample(COUNTRIES, rng.randint(1, 4)))}")
+    if rng.random() < 0.4:
+        clauses.append(f"version {rng.choice(('>=', '<', '>', '<='))} {rng.choice(VERSIONS)}")
+    if rng.random() < 0.3:
+        start = rng.randrange(24)
+        clauses.append(f"hour in {start}-{(start + rng.randint(1, 12)) % 24}")
+    return "; ".join(clauses)
+
+
+def synthetic_items(count, rng):
+    return [
+        AdItem(f"c{i}", i, f"https://cdn.example.com/{i}.png", "https://example.com",
+               targeting=parse_rules(synthetic_rules(rng)))
+        for i in range(count)
+    ]
+
+
+def synthetic_contexts(count, rng):
+    return [
+        TargetingContext(
+            os=rng.choice(OSES + (None,)),
+            locale=rng.choice(LOCALES + (None,)),
+            country=rng.choice(COUNTRIES + ("zz", None)),
+            version=rng.choice(VERSIONS + ("2.2", "0.9", "4", None)),
+            hour=rng.randrange(24),
+        )
+        for _ in range(count)
+    ]
+
+
+def _accepts(rule, value):
+    """기준선: 요청 값 하나로 규칙 하나를 직접 평가."""
+    if value is None:
+        return rule.op == "not in" and rule.attribute != "version"
+    if rule.attribute == "hour":
+        return (value in _hour_set(rule.values)) == (rule.op == "in")
+    if rule.op == "in":
+        return value in rule.values
+    if rule.op == "not in":
+        return value not in rule.values
+    bound = rule.values[0]
+    return {">=": value >= bound, ">": value > bound, "<=": value <= bound, "<": value < bound}[rule.op]
+
+
+def naive_match(items, context):
+    mask = 0
+    for bit, item in enumerate(items):
+        if all(_accepts(rule, getattr(context, rule.attribute)) for rule in item.targeting):
+            mask |= 1 << bit
+    return mask
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=2000, help="크기별 요청 수")
+    parser.add_argument("--sizes", default="10,1000,10000", help="소재 수 목록 (쉼표 구분)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'creatives':>10} {'compile ms':>11} {'naive µs/req':>13} {'bitset µs/req':>14} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        items = synthetic_items(size, rng)
+        contexts = synthetic_contexts(args.n, rng)
+
+        started = time.perf_counter()
+        matcher = TargetingMatcher(items)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        # 기준선은 큰 인벤토리에서 느리므로 요청 수를 줄여 측정
+        naive_contexts = contexts[:max(20, args.n * 10 // max(size, 10))]
+        started = time.perf_counter()
+        expected = [naive_match(items, context) for context in naive_contexts]
+        naive = (time.perf_counter() - started) / len(naive_contexts)
+
+        started = time.perf_counter()
+        for context in contexts:
+            matcher.match(context)
+        bitset = (time.perf_counter() - started) / len(contexts)
+
+        got = [matcher.match(context) for context in naive_contexts]
+        if got != expected:
+            sys.exit(f"mismatch at {size} creatives")
+        print(f"{size:>10} {compile_ms:>11.1f} {naive * 1e6:>13.1f} {bitset * 1e6:>14.2f} {naive / bitset:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""pytest 공통 설정: 저장소 루트를 import 경로에 넣습니다 (api/index.py 와 같은 방식)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,139 @@
+"""ASGI 앱 라우팅: Flask 앱과 같은 상태 코드/본문을 내는지."""
+
+import asyncio
+import io
+import json
+import os
+import sys
+
+import pytest
+
+# adserver.runtime 은 import 할 때 환경변수로 구성됩니다: 네트워크/백그라운드 스레드 없이
+os.environ.update({
+    "AD_ASSET_PROXY": "0",
+    "AD_FILTER": "0",
+    "AD_COUNTER_FLUSH_INTERVAL": "0",
+    "AD_PACING_SYNC_INTERVAL": "0",
+})
+
+# Flask 앱(api/index.py)과 비교하는 테스트용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from adserver.asgi import app  # noqa: E402
+from adserver.editing import MAX_BODY  # noqa: E402
+from adserver.runtime import config_feed, counters, feed_key  # noqa: E402
+
+
+def call(method, path, query=b"", headers=(), body=b"", disconnect=False):
+    """(status, headers dict, body). disconnect 면 본문 뒤에 곧바로 연결을 끊습니다."""
+    scope = {
+        "type": "http", "method": method, "path": path, "query_string": query,
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 50000),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        if disconnect:
+            return {"type": "http.disconnect"}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asyncio.wait_for(app(scope, receive, send), 10))
+    start = sent[0]
+    return (
+        start["status"],
+        {name.decode(): value.decode() for name, value in start["headers"]},
+        b"".join(message.get("body", b"") for message in sent[1:]),
+    )
+
+
+def test_home_and_unknown_paths():
+    status, _, body = call("GET", "/")
+    assert status == 200 and json.loads(body)["status"] == "ok"
+    assert call("GET", "/nope")[0] == 404
+    assert call("PUT", "/")[0] == 405
+
+
+def test_ad_config_etag_and_conditional_get():
+    status, headers, body = call("GET", "/api/ad-config")
+    assert status == 200 and "top_banner" in json.loads(body)
+    status, _, body = call("GET", "/api/ad-config", headers=[("If-None-Match", headers["etag"])])
+    assert status == 304 and body == b""
+    assert call("HEAD", "/api/ad-config")[2] == b""
+
+
+def test_click_redirects_and_rejects_non_ascii_digits():
+    status, headers, _ = call("GET", "/click/top/0")
+    assert status == 302 and headers["location"].startswith("http")
+    assert call("GET", "/click/default/top/0")[0] == 302
+    assert call("GET", "/click/top/99")[0] == 404
+    # "²".isdigit() 는 True 지만 int() 는 실패: 500 이 아니라 404
+    assert call("GET", "/click/top/²")[0] == 404
+    assert call("GET", "/click/top/-1")[0] == 404
+
+
+def test_clicks_are_counted_on_flush():
+    counters.flush()
+    before = counters.totals("click")
+    call("GET", "/click/top/0")
+    counters.flush()
+    after = counters.totals("click")
+    assert sum(after.values()) == sum(before.values()) + 1
+
+
+def test_ad_selection_and_tenants():
+    status, _, body = call("GET", "/api/ad/top")
+    assert status == 200 and json.loads(body)["position"] == "top"
+    assert call("GET", "/api/ad/sidebar")[0] == 404
+    assert call("GET", "/api/tenants/default/ad-config")[0] == 200
+    assert call("GET", "/api/tenants/nope/ad-config")[0] == 404
+
+
+def test_events_post():
+    body = b'{"type": "impression", "item": "top-1"}\n'
+    status, _, result = call("POST", "/api/events", headers=[("Content-Type", "application/x-ndjson")], body=body)
+    assert status == 202 and json.loads(result)["accepted"] == 1
+    assert call("POST", "/api/events", headers=[("Content-Type", "image/png")])[0] == 415
+
+
+def test_feed_full_and_unchanged():
+    status, _, body = call("GET", "/api/ad-config", query=b"since=unknown")
+    assert status == 200 and "full" in json.loads(body)
+    revision = config_feed.refresh(feed_key())
+    status, _, body = call("GET", "/api/ad-config", query=f"since={revision}&wait=0.05".encode())
+    assert status == 200 and json.loads(body)["unchanged"] is True
+
+
+def test_long_poll_stops_when_the_client_disconnects():
+    revision = config_feed.refresh(feed_key())
+    status, _, _ = call("GET", "/api/ad-config", query=f"since={revision}&wait=30".encode(), disconnect=True)
+    assert status == 499
+    assert not config_feed._async_waiters
+
+
+def test_admin_body_limit_is_the_same_on_wsgi_and_asgi():
+    import index
+
+    body = b"x" * (MAX_BODY + 1)
+    assert call("POST", "/api/admin/creatives", body=body)[0] == 413
+    client = index.app.test_client()
+    assert client.post("/api/admin/creatives", data=body).status_code == 413
+    # Content-Length 없이 (chunked) 보내도 상한까지만 읽음
+    response = client.post("/api/admin/creatives", input_stream=io.BytesIO(body))
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("wait", [b"soon", b"nan", b"inf"])
+def test_feed_rejects_an_invalid_wait_instead_of_serving_the_plain_config(wait):
+    import index
+
+    status, _, body = call("GET", "/api/ad-config", query=b"since=x&wait=" + wait)
+    assert status == 400 and "wait" in json.loads(body)["error"]
+    response = index.app.test_client().get("/api/ad-config?since=x&wait=" + wait.decode())
+    assert response.status_code == 400 and "top_banner" not in response.get_json()
@@ -0,0 +1,91 @@
+"""이미지 프록시: 내용 주소 LRU, 프리페치/주소 바꾸기, Range/304 응답."""
+
+import pytest
+
+from adserver.assets import AssetCache, AssetProxy, serve_asset
+from adserver.snapshot import build_snapshot
+
+DOCUMENT = {
+    "top_banner": {"items": [
+        {"image_url": "https://img.example/a.png", "click_url": "https://example.com/a"},
+        {"image_url": "https://img.example/page.html", "click_url": "https://example.com/b"},
+    ]},
+    # http(s) 가 아닌 주소는 받지 않음
+    "bottom_banner": {"items": [{"image_url": "/static/bottom.png", "click_url": "https://example.com/c"}]},
+}
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url):
+        self.calls.append(url)
+        if url.endswith(".html"):
+            return b"<html></html>", "text/html"
+        return b"PNG:" + url.encode(), "image/png"
+
+
+def prefetched(cache=None):
+    fetcher = FakeFetcher()
+    proxy = AssetProxy(AssetCache() if cache is None else cache, fetcher, workers=1)
+    snapshot = build_snapshot(DOCUMENT)
+    for future in proxy.prefetch(snapshot):
+        future.result()
+    return proxy, fetcher, snapshot
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = AssetCache(max_bytes=10, directory=str(tmp_path))
+    first = cache.put(b"aaaa", "image/png")
+    second = cache.put(b"bbbb", "image/png")
+    cache.get(first)
+    cache.put(b"cccc", "image/png")
+    assert first in cache and second not in cache
+    assert cache.size == 8
+    assert not (tmp_path / second).exists()
+    assert cache.get(first) == (b"aaaa", "image/png")
+
+
+def test_rewrite_points_fetched_images_at_the_proxy():
+    proxy, fetcher, snapshot = prefetched()
+    config = proxy.rewrite(snapshot.as_dict({}))
+    urls = [item["image_url"] for item in config["top_banner"]["items"]]
+    assert urls[0].startswith("/asset/")
+    # 이미지가 아닌 응답은 저장하지 않고 원래 주소 유지
+    assert urls[1] == "https://img.example/page.html"
+    assert proxy.version == 1
+    # 이미 받은 URL 은 다시 받지 않음 (실패한 URL 만 다음 세대에 다시 시도)
+    for future in proxy.prefetch(snapshot):
+        future.result()
+    assert fetcher.calls.count("https://img.example/a.png") == 1
+    assert fetcher.calls.count("https://img.example/page.html") == 2
+    assert proxy.url_for("/static/bottom.png") == "/static/bottom.png"
+
+
+def test_evicted_original_is_fetched_again():
+    proxy, fetcher, _ = prefetched(AssetCache(max_bytes=1))
+    digest = proxy.url_for("https://img.example/a.png").rsplit("/", 1)[1]
+    proxy.cache.put(b"x" * 10, "image/png")
+    assert digest not in proxy.cache
+    assert proxy.get(digest) == (b"PNG:https://img.example/a.png", "image/png")
+    assert fetcher.calls.count("https://img.example/a.png") == 2
+
+
+@pytest.mark.parametrize("range_header, status, body, content_range", [
+    ("bytes=2-4", 206, b"234", "bytes 2-4/10"),
+    ("bytes=-3", 206, b"789", "bytes 7-9/10"),
+    ("bytes=8-", 206, b"89", "bytes 8-9/10"),
+    ("bytes=12-", 416, b"", "bytes */10"),
+    ("bytes=a-b", 200, b"0123456789", None),
+])
+def test_single_byte_ranges(range_header, status, body, content_range):
+    result = serve_asset(b"0123456789", "image/png", "d1", range_header=range_header)
+    assert result[:2] == (status, body)
+    assert dict(result[2]).get("Content-Range") == content_range
+
+
+def test_matching_etag_answers_304():
+    status, body, headers = serve_asset(b"0123", "image/png", "d1", if_none_match='"d1"')
+    assert (status, body) == (304, b"")
+    assert dict(headers)["Cache-Control"].endswith("immutable")
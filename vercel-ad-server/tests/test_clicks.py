@@ -0,0 +1,87 @@
+"""서명된 클릭 토큰: 발급/검증, 재사용, 키 교체, 내용 버전별 리다이렉트."""
+
+from adserver.clicks import EXPIRED, FORGED, MALFORMED, OK, REPLAY, UNKNOWN_KEY, ClickSigner
+from adserver.snapshot import build_snapshot
+
+NOW = 1_700_000_000
+
+
+def snapshot(click_url="https://example.com/a", generation=1):
+    return build_snapshot({"top_banner": {"items": [
+        {"id": "a", "image_url": "https://cdn.example.com/a.png", "click_url": click_url},
+        {"id": "b", "image_url": "https://cdn.example.com/b.png", "click_url": "https://example.com/b"},
+    ]}}, generation=generation)
+
+
+def issue(signer, snap, index=0, now=NOW, arm=None):
+    banner = snap.placements[("default", "top")]
+    return signer.issue("default", "top", banner.items[index], snap.version, now, arm)
+
+
+def location(target):
+    return dict(target.headers)["Location"]
+
+
+def test_valid_token_counts_once_then_replays():
+    signer = ClickSigner(["secret"])
+    token = issue(signer, snapshot())
+    result, claims = signer.verify(token, NOW + 1)
+    assert result == OK and (claims.position, claims.index, claims.item_id) == ("top", 0, "a")
+    assert signer.verify(token, NOW + 2)[0] == REPLAY
+
+
+def test_forged_expired_malformed_and_unknown_key_are_rejected():
+    signer = ClickSigner(["secret"], ttl=60)
+    token = issue(signer, snapshot())
+    forged = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+    assert signer.verify(forged, NOW) == (FORGED, None)
+    assert signer.verify(token, NOW + 3600) == (EXPIRED, None)
+    assert signer.verify(issue(signer, snapshot(), now=NOW + 3600), NOW) == (EXPIRED, None)
+    assert signer.verify("short", NOW) == (MALFORMED, None)
+    assert signer.verify("!" * 40, NOW)[0] == MALFORMED
+    assert ClickSigner(["other"]).verify(token, NOW)[0] in (UNKNOWN_KEY, FORGED)
+
+
+def test_key_rotation_verifies_tokens_from_the_old_key():
+    old = ClickSigner(["old"])
+    rotated = ClickSigner(["new", "old"])
+    assert rotated.verify(issue(old, snapshot()), NOW)[0] == OK
+    assert old.verify(issue(rotated, snapshot()), NOW)[0] in (UNKNOWN_KEY, FORGED)
+
+
+def test_experiment_arm_round_trips():
+    signer = ClickSigner(["secret"])
+    _, claims = signer.verify(issue(signer, snapshot(), arm=("hero", "b")), NOW)
+    assert (claims.experiment, claims.arm) == ("hero", "b")
+
+
+def test_token_from_another_instance_resolves_to_the_creative_it_showed():
+    before, after = snapshot(), snapshot("https://example.com/changed")
+    # 인스턴스 A 는 예전 설정으로 토큰 발급 (세대 7)
+    a = ClickSigner(["secret"])
+    a.remember(snapshot(generation=7))
+    token = issue(a, before)
+    # 인스턴스 B 는 같은 설정을 세대 1 로, 바뀐 설정을 세대 2 로 가짐
+    b = ClickSigner(["secret"])
+    b.remember(before)
+    b.remember(after)
+    _, claims = b.verify(token, NOW)
+    assert location(b.resolve(claims, after)) == "https://example.com/a"
+
+
+def test_evicted_version_falls_back_to_the_current_slot_with_the_same_item():
+    signer = ClickSigner(["secret"], history=1)
+    old = snapshot()
+    token = issue(signer, old, index=1)
+    current = snapshot("https://example.com/changed")
+    signer.remember(current)
+    _, claims = signer.verify(token, NOW)
+    assert location(signer.resolve(claims, current)) == "https://example.com/b"
+    # 자리의 소재가 바뀌었으면 엉뚱한 곳으로 보내지 않음
+    other = build_snapshot({"top_banner": {"items": [
+        {"id": "z", "image_url": "https://cdn.example.com/z.png", "click_url": "https://example.com/z"},
+    ]}})
+    signer.remember(other)
+    token = issue(signer, old)
+    _, claims = signer.verify(token, NOW)
+    assert signer.resolve(claims, other).status == 404
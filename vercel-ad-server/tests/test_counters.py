@@ -0,0 +1,118 @@
+"""카운터 샤드 플러시와 싱크 오류 복구."""
+
+import logging
+import threading
+
+from adserver.counters import CounterStage, MemorySink, SQLiteSink
+
+
+class RecordingSink(MemorySink):
+    """배치마다 받은 증가분을 기록하는 싱크."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def write(self, deltas):
+        self.batches.append(dict(deltas))
+        super().write(deltas)
+
+
+class FlakySink(MemorySink):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def write(self, deltas):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("sink down")
+        super().write(deltas)
+
+
+def test_flush_merges_thread_shards_into_one_batch():
+    sink = RecordingSink()
+    stage = CounterStage(sink, flush_interval=0)
+
+    def clicks():
+        for _ in range(100):
+            stage.increment("click", "top-1")
+
+    threads = [threading.Thread(target=clicks) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stage.increment("impression", "top-1", 5)
+
+    assert stage.totals("click") == {}
+    assert stage.flush() == 805
+    assert sink.batches == [{("click", "top-1"): 800, ("impression", "top-1"): 5}]
+    assert stage.totals("click") == {"top-1": 800}
+    assert stage.version == 1
+    # 비어 있으면 싱크를 부르지 않고 버전도 그대로
+    assert stage.flush() == 0
+    assert len(sink.batches) == 1 and stage.version == 1
+
+
+def test_finished_threads_shards_are_dropped_after_drain():
+    stage = CounterStage(MemorySink(), flush_interval=0)
+    threads = [threading.Thread(target=stage.increment, args=("click", "a")) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stage.increment("click", "a")
+    assert len(stage._shards) == 21
+    assert stage.flush() == 21
+    assert len(stage._shards) == 1  # 현재 스레드 것만 남음
+
+
+def test_sink_failure_keeps_deltas_for_next_flush(caplog):
+    sink = FlakySink(failures=2)
+    stage = CounterStage(sink, flush_interval=0)
+    stage.increment("click", "a", 3)
+
+    with caplog.at_level(logging.ERROR, logger="adserver"):
+        assert stage.flush() == 0
+    assert "counter flush failed" in caplog.text
+    assert stage.pending() == 3 and stage.version == 0
+
+    stage.increment("click", "a")
+    stage.increment("click", "b")
+    assert stage.flush() == 0
+    assert stage.pending() == 5
+
+    assert stage.flush() == 5
+    assert sink.totals == {("click", "a"): 4, ("click", "b"): 1}
+    assert stage.totals("click") == {"a": 4, "b": 1}
+    assert stage.pending() == 0 and stage.version == 1
+
+
+def test_sqlite_sink_accumulates_and_reloads(tmp_path):
+    path = str(tmp_path / "counts.db")
+    stage = CounterStage(SQLiteSink(path), flush_interval=0)
+    stage.increment("click", "a", 2)
+    stage.flush()
+    stage.increment("click", "a")
+    stage.flush()
+    assert CounterStage(SQLiteSink(path), flush_interval=0).totals("click") == {"a": 3}
+
+
+def test_listeners_see_each_batch_once_after_the_sink_accepts_it():
+    sink = FlakySink(failures=1)
+    stage = CounterStage(sink, flush_interval=0)
+    batches = []
+    stage.subscribe(lambda deltas, now: batches.append(dict(deltas)))
+
+    @stage.subscribe
+    def broken(deltas, now):
+        raise RuntimeError("listener bug")
+
+    stage.increment("click", "a", 2)
+    stage.flush()
+    assert batches == []
+    stage.flush()
+    assert batches == [{("click", "a"): 2}]
+    # 리스너 오류는 이미 쓴 배치를 되돌리지 않음
+    assert stage.pending() == 0 and sink.totals == {("click", "a"): 2}
@@ -0,0 +1,107 @@
+"""관리 쓰기 API: 연산 적용/검증, 이미지 확인, 리비전 커밋과 되돌리기."""
+
+import asyncio
+
+import pytest
+
+from adserver.editing import ConfigEditor, EditError, apply_operations, authorized, item_errors
+from adserver.snapshot import SnapshotHolder
+from adserver.stores import ConflictError, SQLiteStore
+
+
+def item(name, **fields):
+    return dict({"image_url": f"https://cdn.example.com/{name}.png", "click_url": "https://example.com"}, **fields)
+
+
+DOCUMENT = {"top_banner": {"enabled": True, "items": [item("a"), item("b", weight=2)]}}
+
+
+def fetcher(url):
+    if "broken" in url:
+        raise OSError("404")
+    return b"<html>", "text/html" if "page" in url else "image/png"
+
+
+@pytest.fixture
+def editor(tmp_path):
+    store = SQLiteStore(str(tmp_path / "config.db"))
+    store.commit(DOCUMENT)
+    holder = SnapshotHolder(store)
+    return ConfigEditor(holder, fetcher, token="t0ken")
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_authorized_needs_the_bearer_token():
+    assert authorized("Bearer t0ken", "t0ken")
+    assert not authorized("Bearer wrong", "t0ken")
+    assert not authorized("t0ken", "t0ken")
+    assert not authorized("Bearer t0ken", None)
+
+
+@pytest.mark.parametrize("weight", ["inf", "nan", -1, "heavy"])
+def test_item_weight_must_be_finite_and_non_negative(weight):
+    errors = item_errors(item("a", weight=weight))
+    assert len(errors) == 1 and errors[0].startswith("invalid weight")
+
+
+def test_operations_create_update_delete_and_keep_the_original():
+    updated = apply_operations(DOCUMENT, [
+        {"op": "create", "placement": "top", "item": item("c")},
+        {"op": "update", "id": "top-2", "item": {"weight": 5, "click_url": None}},
+        {"op": "delete", "id": "top-1"},
+        {"op": "create", "placement": "sidebar", "tenant": "acme", "item": item("d")},
+    ])
+    assert [entry["id"] for entry in updated["top_banner"]["items"]] == ["top-2", "top-3"]
+    assert updated["top_banner"]["items"][0]["weight"] == 5
+    assert "click_url" not in updated["top_banner"]["items"][0]
+    assert updated["tenants"]["acme"]["placements"]["sidebar"]["items"][0]["id"] == "acme:sidebar-1"
+    assert "id" not in DOCUMENT["top_banner"]["items"][0]
+
+
+def test_invalid_operations_report_every_error_and_write_nothing():
+    with pytest.raises(EditError) as caught:
+        apply_operations(DOCUMENT, [
+            {"op": "create", "placement": "top", "item": item("c", weight="inf")},
+            {"op": "delete", "id": "missing"},
+            {"op": "explode"},
+        ])
+    assert [error["operation"] for error in caught.value.errors] == [0, 1, 2]
+
+
+def test_submit_checks_new_images_and_commits_one_revision(editor):
+    result = run(editor.submit([{"op": "create", "placement": "top", "item": item("c")}], base=1))
+    assert result["revision"] == 2 and result["validated_images"] == 1
+    assert len(editor.holder.current().placements[("default", "top")].items) == 3
+
+    with pytest.raises(EditError) as caught:
+        run(editor.submit([
+            {"op": "create", "placement": "top", "item": item("broken")},
+            {"op": "create", "placement": "top", "item": item("page")},
+        ]))
+    assert {error["image_url"].rsplit("/", 1)[1] for error in caught.value.errors} == {"broken.png", "page.png"}
+    assert editor.current()["revision"] == 2
+
+
+def test_submit_rejects_a_stale_base_revision(editor):
+    with pytest.raises(ConflictError):
+        run(editor.submit([{"op": "delete", "id": "top-1"}], base=0))
+    with pytest.raises(EditError):
+        run(editor.submit([{"op": "delete", "id": "top-1"}], base=True))
+
+
+def test_rollback_recommits_an_old_revision(editor):
+    run(editor.submit([{"op": "delete", "id": "top-1"}]))
+    result = run(editor.rollback(1, base=2))
+    assert result["revision"] == 3
+    assert len(editor.holder.current().placements[("default", "top")].items) == 2
+    assert editor.history()["history"][0]["note"] == "rollback to 1"
+
+
+@pytest.mark.parametrize("revision", [True, False, "1", 1.0, None, 99])
+def test_rollback_rejects_booleans_and_unknown_revisions(editor, revision):
+    with pytest.raises(EditError):
+        run(editor.rollback(revision))
+    assert editor.current()["revision"] == 1
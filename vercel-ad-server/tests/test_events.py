@@ -0,0 +1,95 @@
+"""이벤트 배치 수집: NDJSON/바이너리 디코딩, 이벤트별 거절 사유, 윈도우 집계."""
+
+import json
+
+import pytest
+
+from adserver.events import (
+    BINARY,
+    NDJSON,
+    BodyTooLarge,
+    EventAggregator,
+    decoder_for,
+    encode_binary,
+)
+from adserver.snapshot import build_snapshot
+
+NOW = 1_700_000_030.0
+SNAPSHOT = build_snapshot({"top_banner": {"items": [
+    {"id": "top-1", "image_url": "https://cdn.example.com/a.png", "click_url": "https://example.com"},
+]}}, generation=1)
+
+
+def ndjson(*events):
+    return b"".join(json.dumps(event).encode() + b"\n" for event in events)
+
+
+def ingest(body, content_type=NDJSON, chunk=7, aggregator=None):
+    aggregator = aggregator or EventAggregator(window=60)
+    chunks = [body[i:i + chunk] for i in range(0, len(body), chunk)]
+    return aggregator.ingest(decoder_for(content_type), chunks, SNAPSHOT, NOW), aggregator
+
+
+def test_ndjson_split_across_chunks_is_folded_per_window():
+    body = ndjson(
+        {"type": "impression", "item": "top-1"},
+        {"type": "impression", "item": "top-1", "ts": NOW - 5},
+        {"type": "view", "item": "top-1", "value": 1500},
+    )
+    result, aggregator = ingest(body[:-1])  # 마지막 줄은 개행 없이 끝나도 됨
+    assert result["accepted"] == 3 and result["rejected"] == 0
+    assert aggregator.windows() == [
+        {"start": 1_700_000_040 - 60, "kind": "impression", "item": "top-1", "count": 2, "value": 0},
+        {"start": 1_700_000_040 - 60, "kind": "view", "item": "top-1", "count": 1, "value": 1500},
+    ]
+
+
+def test_binary_round_trip_matches_ndjson():
+    events = [("impression", "top-1", 1, NOW, 0), ("view", "top-1", 1, NOW, 800)]
+    result, aggregator = ingest(encode_binary(events), BINARY, chunk=5)
+    assert result["accepted"] == 2
+    assert [row["value"] for row in aggregator.windows()] == [0, 800]
+
+
+def test_bad_events_are_rejected_one_by_one_with_reasons():
+    body = ndjson(
+        {"type": "impression", "item": "top-1"},
+        {"type": "impression", "item": "top-1", "value": 1e400},
+        {"type": "impression", "item": "top-1", "ts": float("nan")},
+        {"type": "impression", "item": "nope"},
+        {"type": "explode", "item": "top-1"},
+        {"type": "impression", "item": "top-1", "ts": NOW + 3600},
+        {"type": "impression", "item": "top-1", "ts": NOW - 86400 * 2},
+        {"type": "impression", "item": "top-1", "generation": -1},
+    ) + b"{not json\n"
+    result, _ = ingest(body)
+    assert result["accepted"] == 1
+    assert result["reasons"] == {
+        "value": 1, "ts": 1, "item": 1, "kind": 1, "future": 1, "stale": 1, "generation": 1, "malformed": 1,
+    }
+
+
+def test_generation_from_another_instance_is_accepted():
+    # 세대 번호는 프로세스마다 따로 셈: 다른 인스턴스에서 받은 더 큰 값도 받아들임
+    result, _ = ingest(ndjson({"type": "impression", "item": "top-1", "generation": 2}))
+    assert result == {"accepted": 1, "rejected": 0, "reasons": {}, "version": SNAPSHOT.version}
+
+
+def test_bad_binary_magic_discards_the_rest():
+    result, aggregator = ingest(b"NOPE" + b"\0" * 40, BINARY)
+    assert result["accepted"] == 0 and aggregator.windows() == []
+
+
+def test_body_limit_and_unknown_content_type():
+    assert decoder_for("image/png") is None
+    batch = EventAggregator().batch(decoder_for(NDJSON), SNAPSHOT, NOW)
+    with pytest.raises(BodyTooLarge):
+        batch.feed(b" " * (4 * 1024 * 1024 + 1))
+
+
+def test_listeners_receive_each_folded_batch():
+    aggregator = EventAggregator(window=60)
+    batches = []
+    aggregator.subscribe(batches.append)
+    ingest(ndjson({"type": "click", "item": "top-1"}), aggregator=aggregator)
+    assert batches == [{(1_700_000_040 - 60, "click", "top-1"): [1, 0]}]
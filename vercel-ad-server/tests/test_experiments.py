@@ -0,0 +1,87 @@
+"""A/B 실험: 해시 버킷 배정, 설정 검증, arm 별 소재 필터, Wilson 구간."""
+
+import pytest
+
+from adserver.experiments import BUCKETS, ExperimentError, ExperimentLog, bucket, wilson
+from adserver.snapshot import build_snapshot
+
+
+def document(**experiment):
+    return {
+        "top_banner": {"items": [
+            {"id": "a", "image_url": "https://img.example/a.png", "click_url": "https://example.com/a"},
+            {"id": "b", "image_url": "https://img.example/b.png", "click_url": "https://example.com/b"},
+            {"id": "c", "image_url": "https://img.example/c.png", "click_url": "https://example.com/c"},
+        ]},
+        "experiments": [dict({
+            "id": "hero", "placement": "top",
+            "arms": [{"name": "control", "items": ["a"]}, {"name": "b", "items": ["b"]}],
+        }, **experiment)],
+    }
+
+
+def test_bucket_is_deterministic_and_seeded():
+    assert bucket("client-1", 7) == bucket("client-1", 7)
+    assert 0 <= bucket("client-1", 7) < BUCKETS
+    assert [bucket(f"c{i}", 1) for i in range(50)] != [bucket(f"c{i}", 2) for i in range(50)]
+
+
+def test_assignment_follows_arm_weights_and_traffic():
+    snapshot = build_snapshot(document(traffic=50, arms=[
+        {"name": "control", "items": ["a"], "weight": 1},
+        {"name": "b", "items": ["b"], "weight": 3},
+    ]))
+    experiment = snapshot.experiments.for_placement("default", "top")
+    counts = {None: 0, 0: 0, 1: 0}
+    for i in range(20000):
+        counts[experiment.assign(f"client-{i}")] += 1
+    assert counts[None] == pytest.approx(10000, rel=0.05)
+    assert counts[1] == pytest.approx(3 * counts[0], rel=0.1)
+    assert snapshot.experiments.assign(None) == (None,)
+
+
+def test_apply_hides_other_arms_but_keeps_unassigned_items():
+    snapshot = build_snapshot(document())
+    config = snapshot.experiments.apply(snapshot.as_dict({}), snapshot, (1,))
+    items = config["top_banner"]["items"]
+    assert [(item["id"], item["tracking_url"]) for item in items] == [("b", "/click/top/1"), ("c", "/click/top/2")]
+    assert config["experiments"] == {"hero": "b"}
+    # 미참여는 control 만, 결과에는 들어가지 않음
+    control = snapshot.experiments.apply(snapshot.as_dict({}), snapshot)
+    assert [item["id"] for item in control["top_banner"]["items"]] == ["a", "c"]
+    assert "experiments" not in control
+
+
+@pytest.mark.parametrize("experiment", [
+    {"placement": "missing"},
+    {"arms": [{"name": "control", "items": ["a"]}]},
+    {"arms": [{"name": "control", "items": ["a"]}, {"name": "b", "items": ["zzz"]}]},
+    {"arms": [{"name": "control", "items": ["a"], "weight": "nan"}, {"name": "b", "items": ["b"]}]},
+    {"arms": [{"name": "control", "items": ["a"], "weight": 0}, {"name": "b", "items": ["b"], "weight": 0}]},
+    {"traffic": 0},
+])
+def test_invalid_experiments_are_rejected(experiment):
+    with pytest.raises(ExperimentError):
+        build_snapshot(document(**experiment))
+
+
+def test_wilson_interval():
+    [(ctr, low, high), empty] = wilson([100, 0], [10, 0])
+    assert ctr == 0.1
+    assert low == pytest.approx(0.0552, abs=1e-4)
+    assert high == pytest.approx(0.1744, abs=1e-4)
+    assert empty == (None, None, None)
+
+
+def test_results_report_each_arm():
+    snapshot = build_snapshot(document())
+    log = ExperimentLog()
+    for _ in range(4):
+        log.append("hero", "b", "impression")
+    log.append("hero", "b", "click")
+    [result] = log.results(snapshot.experiments)
+    assert [(arm["name"], arm["impressions"], arm["clicks"], arm["ctr"]) for arm in result["arms"]] == [
+        ("control", 0, 0, None), ("b", 4, 1, 0.25),
+    ]
+    [untracked] = log.results(snapshot.experiments, clicks_tracked=False)
+    assert untracked["arms"][1]["clicks"] is None and untracked["arms"][1]["ctr"] is None
@@ -0,0 +1,63 @@
+"""빌드 시점 정적 내보내기: 파일 내용, vercel.json 규칙 병합."""
+
+import json
+
+from adserver.export import export, export_files, export_rules, merge_vercel
+from adserver.snapshot import build_snapshot
+
+DOCUMENT = {
+    "top_banner": {"enabled": True, "items": [
+        {"id": "top-1", "image_url": "https://img.example/a.png", "click_url": "https://example.com/a"},
+        {"id": "top-2", "image_url": "https://img.example/b.png", "click_url": "https://example.com/b",
+         "daily_clicks": 10},
+    ]},
+    "bottom_banner": {"enabled": True, "items": [
+        {"id": "bottom-1", "image_url": "https://img.example/c.png", "click_url": "https://example.com/c"},
+    ]},
+    "tenants": {"acme": {"placements": {"hero": {"enabled": True, "items": [
+        {"id": "hero-1", "image_url": "https://img.example/h.png", "click_url": "https://acme.example"},
+    ]}}}},
+}
+
+
+def test_tenant_export_is_independent_of_process_generation():
+    first = export_files(build_snapshot(DOCUMENT, generation=1))
+    second = export_files(build_snapshot(DOCUMENT, generation=7))
+    body = first["_export/tenants/acme/ad-config.json"]
+    assert body == second["_export/tenants/acme/ad-config.json"]
+    config = json.loads(body)
+    assert "generation" not in config
+    assert config["version"] == build_snapshot(DOCUMENT).version
+
+
+def test_click_budgeted_slots_stay_on_the_function():
+    _, redirects, _ = export_rules(build_snapshot(DOCUMENT))
+    assert {(rule["source"], rule["destination"]) for rule in redirects} == {
+        ("/click/top/0", "https://example.com/a"),
+        ("/click/bottom/0", "https://example.com/c"),
+        ("/click/acme/hero/0", "https://acme.example"),
+    }
+
+
+def test_merge_replaces_previously_generated_rules():
+    rewrites, redirects, headers = export_rules(build_snapshot(DOCUMENT))
+    config = {"rewrites": [{"source": "/api/ad-config", "destination": "/api/index"}]}
+    once = merge_vercel(config, rewrites, redirects, headers)
+    twice = merge_vercel(once, rewrites, redirects, headers)
+    assert twice == once
+    # 정적 rewrite 가 함수 rewrite 보다 앞
+    assert once["rewrites"][0]["destination"] == "/_export/ad-config.json"
+    assert once["rewrites"][-1] == {"source": "/api/ad-config", "destination": "/api/index"}
+
+
+def test_export_writes_files_and_vercel_json(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(DOCUMENT))
+    vercel_path = tmp_path / "vercel.json"
+    vercel_path.write_text(json.dumps({"rewrites": []}))
+    files, redirects = export(
+        str(tmp_path / "public"), str(vercel_path), environ={"AD_CONFIG_STORE": f"file:{config_path}"},
+    )
+    assert redirects == 3
+    assert files == len(list(path for path in (tmp_path / "public").rglob("*") if path.is_file()))
+    assert json.loads(vercel_path.read_text())["redirects"][0]["statusCode"] == 302
@@ -0,0 +1,103 @@
+"""증분 설정 피드: revision, since 응답, 본문 캐시, long-poll 대기."""
+
+import asyncio
+import json
+import threading
+import time
+
+from adserver.feed import ConfigFeed, apply_patch, document_revision, merge_patch
+
+OLD = {"top_banner": {"enabled": True, "items": [{"id": "a"}]}, "bottom_banner": {"enabled": True}}
+NEW = {"top_banner": {"enabled": False, "items": [{"id": "a"}, {"id": "b"}]}}
+
+
+def feed_of(*documents):
+    """key 가 문서 index 인 피드. 차례로 refresh 해서 이력을 채웁니다."""
+    feed = ConfigFeed(lambda key: (key + 1, documents[key]), depth=4)
+    for key in range(len(documents)):
+        feed.refresh(key)
+    return feed
+
+
+def test_merge_patch_round_trips():
+    patch = merge_patch(OLD, NEW)
+    assert patch["bottom_banner"] is None
+    assert apply_patch(OLD, patch) == NEW
+
+
+def test_revision_is_a_content_hash():
+    assert document_revision(OLD) == document_revision(json.loads(json.dumps(OLD)))
+    assert document_revision(OLD) != document_revision(NEW)
+    # 다른 프로세스(다른 세대 번호)에서도 같은 문서면 같은 revision
+    assert feed_of(OLD).revision == ConfigFeed(lambda key: (99, OLD)).refresh("x")
+
+
+def test_since_answers_unchanged_patch_or_full():
+    feed = feed_of(OLD, NEW)
+    old, new = document_revision(OLD), document_revision(NEW)
+    assert feed.response(new) == {"revision": new, "generation": 2, "unchanged": True}
+    patched = feed.response(old)
+    assert patched["since"] == old and apply_patch(OLD, patched["patch"]) == NEW
+    assert feed.response("unknown")["full"] == NEW
+    assert feed.response(None)["full"] == NEW
+
+
+def test_same_content_does_not_bump_revision():
+    feed = ConfigFeed(lambda key: (key, OLD))
+    revision = feed.refresh(1)
+    assert feed.refresh(2) == revision and feed.generation == 2
+
+
+def test_body_cache_is_bounded_by_history_not_by_client_input():
+    feed = feed_of(OLD, NEW)
+    full = feed.body("first-unknown")
+    for i in range(500):
+        assert feed.body(f"random-{i}") == full
+    feed.body(document_revision(OLD))
+    feed.body(document_revision(NEW))
+    assert len(feed._bodies) == 3
+
+
+def test_wait_returns_as_soon_as_the_revision_changes():
+    documents = [OLD]
+    feed = ConfigFeed(lambda key: (key, documents[key]))
+    old = feed.refresh(0)
+    key = [0]
+
+    def swap():
+        time.sleep(0.05)
+        documents.append(NEW)
+        key[0] = 1
+        feed.notify()
+
+    threading.Thread(target=swap).start()
+    started = time.monotonic()
+    assert feed.wait(old, 5, lambda: key[0]) == document_revision(NEW)
+    assert time.monotonic() - started < 2
+
+
+def test_wait_times_out_when_nothing_changes():
+    feed = feed_of(OLD)
+    assert feed.wait(feed.revision, 0.05, lambda: 0) == feed.revision
+
+
+def test_wait_async_wakes_on_notify():
+    documents = [OLD]
+    feed = ConfigFeed(lambda key: (key, documents[key]))
+    old = feed.refresh(0)
+    key = [0]
+
+    async def main():
+        def swap():
+            documents.append(NEW)
+            key[0] = 1
+            feed.notify()
+
+        asyncio.get_running_loop().call_later(0.05, lambda: threading.Thread(target=swap).start())
+        started = time.monotonic()
+        revision = await feed.wait_async(old, 5, lambda: key[0])
+        return revision, time.monotonic() - started
+
+    revision, elapsed = asyncio.run(main())
+    assert revision == document_revision(NEW) and elapsed < 0.9
+    assert not feed._async_waiters
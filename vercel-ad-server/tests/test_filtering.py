@@ -0,0 +1,85 @@
+"""봇/남용 필터: UA 거부 목록, IP 대역, 슬라이딩 윈도우 빈도 제한."""
+
+import pytest
+
+from adserver.filtering import (
+    DEFAULT_UA_DENY,
+    IP_RANGE,
+    RATE,
+    USER_AGENT,
+    IpPrefixMatcher,
+    SlidingWindowLimiter,
+    UserAgentMatcher,
+    client_address,
+    filters_from_env,
+)
+
+BROWSER = "Mozilla/5.0 (Linux; Android 12; CUBOT P50) AppleWebKit/537.36 Chrome/120 Mobile Safari/537.36"
+
+
+@pytest.mark.parametrize("user_agent, denied", [
+    (BROWSER, False),
+    ("Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)", True),
+    ("curl/8.4.0", True),
+    ("python-requests/2.31", True),
+    ("", True),
+    (None, True),
+])
+def test_default_user_agent_deny_list(user_agent, denied):
+    assert UserAgentMatcher(DEFAULT_UA_DENY).denied(user_agent) is denied
+
+
+def test_literal_patterns_are_escaped():
+    matcher = UserAgentMatcher(["a.b"], literal=True)
+    assert matcher.denied("x a.b y")
+    assert not matcher.denied("axb")
+
+
+def test_ip_prefixes_cover_v4_v6_and_mapped_addresses():
+    matcher = IpPrefixMatcher(["10.0.0.0/8", "192.0.2.7", "2001:db8::/32"])
+    assert matcher.denied("10.200.1.1")
+    assert matcher.denied("192.0.2.7") and not matcher.denied("192.0.2.8")
+    assert matcher.denied("2001:db8:1::1") and not matcher.denied("2001:db9::1")
+    assert matcher.denied("::ffff:10.1.2.3")
+    assert not matcher.denied("not-an-ip")
+    assert not IpPrefixMatcher([])
+
+
+def test_sliding_window_weights_previous_window():
+    limiter = SlidingWindowLimiter(limit=4, window=60)
+    assert all(limiter.allow("a", 10) for _ in range(4))
+    assert not limiter.allow("a", 59)
+    # 다음 창의 3/4 지점: 직전 창 4개의 1/4 만 남아 3개 더 허용
+    assert [limiter.allow("a", 105) for _ in range(4)] == [True, True, True, False]
+    # 두 창 이상 지나면 초기화
+    assert limiter.allow("a", 300)
+
+
+def test_limiter_evicts_least_recently_used_keys():
+    limiter = SlidingWindowLimiter(limit=1, window=60, max_keys=2)
+    limiter.allow("a", 0)
+    limiter.allow("b", 0)
+    limiter.allow("a", 1)
+    limiter.allow("c", 2)
+    assert len(limiter) == 2
+    # 최근에 쓴 a 는 남아 한도 초과 그대로, 지워진 b 는 다시 허용
+    assert not limiter.allow("a", 3)
+    assert limiter.allow("b", 3)
+
+
+def test_filters_check_cheapest_reason_first():
+    filters = filters_from_env({"AD_FILTER_IP_DENY": "203.0.113.0/24", "AD_FILTER_CLICK_RATE": "1/60s"})
+    click = filters["click"]
+    assert click.check("203.0.113.9", "curl/8", 0) == USER_AGENT
+    assert click.check("203.0.113.9", BROWSER, 0) == IP_RANGE
+    assert click.check("198.51.100.1", BROWSER, 0) is None
+    assert click.check("198.51.100.1", BROWSER, 1) == RATE
+    # 이벤트 경로는 자기 한도를 따로 가짐
+    assert filters["events"].check("198.51.100.1", BROWSER, 1) is None
+    assert filters_from_env({"AD_FILTER": "0"}) == {}
+
+
+def test_client_address_prefers_first_forwarded_hop():
+    assert client_address("198.51.100.1, 10.0.0.1", "10.0.0.2", "10.0.0.3") == "198.51.100.1"
+    assert client_address(None, "10.0.0.2", "10.0.0.3") == "10.0.0.2"
+    assert client_address("", None, "10.0.0.3") == "10.0.0.3"
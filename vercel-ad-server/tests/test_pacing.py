@@ -0,0 +1,207 @@
+"""빈도 제한/일일 예산 판정과 Redis 프로토콜(RESP) 경로."""
+
+import io
+import socket
+import threading
+
+import pytest
+
+from adserver.pacing import FakeRedis, PacingController, RedisBackend, RespConnection
+from adserver.snapshot import build_snapshot
+
+NOW = 1_700_000_000.0
+
+
+def snapshot(**item):
+    return build_snapshot({"top_banner": {"items": [
+        dict({"id": "hero", "image_url": "https://cdn.example.com/a.png", "click_url": "https://example.com"}, **item),
+    ]}})
+
+
+def controller(backend, snap):
+    pacing = PacingController(backend, sync_interval=0)
+    pacing.update(snap)
+    return pacing
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# 판정 (FakeRedis 백엔드)
+# ═══════════════════════════════════════════════════════════════════════
+
+def test_frequency_cap_per_user():
+    snap = snapshot(frequency_cap="2/1h")
+    item = snap.placements[("default", "top")].items[0]
+    pacing = controller(RedisBackend(FakeRedis()), snap)
+    for _ in range(2):
+        assert pacing.allows(item, "alice", NOW)
+        pacing.record_impression(item, "alice", NOW)
+    assert not pacing.allows(item, "alice", NOW)
+    assert pacing.allows(item, "bob", NOW)
+    # 창이 지나면 다시 노출
+    assert pacing.allows(item, "alice", NOW + 3600 + 600)
+
+
+def test_frequency_cap_shared_across_instances():
+    snap = snapshot(frequency_cap="1/24h")
+    item = snap.placements[("default", "top")].items[0]
+    redis = FakeRedis()
+    first, second = controller(RedisBackend(redis), snap), controller(RedisBackend(redis), snap)
+    first.record_impression(item, "alice", NOW)
+    assert second.allows(item, "alice", NOW)
+    first.sync(NOW)
+    second.sync(NOW)
+    assert not second.allows(item, "alice", NOW)
+    assert any(command[0] == "BITFIELD" for command in redis.commands)
+
+
+def test_daily_click_budget_synced_through_redis():
+    snap = snapshot(daily_clicks=3)
+    item = snap.placements[("default", "top")].items[0]
+    redis = FakeRedis()
+    first, second = controller(RedisBackend(redis), snap), controller(RedisBackend(redis), snap)
+    for _ in range(2):
+        first.record_click("hero", NOW)
+    second.record_click("hero", NOW)
+    assert first.allows(item, None, NOW) and second.allows(item, None, NOW)
+    first.sync(NOW)
+    second.sync(NOW)
+    assert not second.allows(item, None, NOW)
+    first.sync(NOW)
+    assert not first.allows(item, None, NOW)
+    # 다음 날에는 예산이 새로 열림
+    assert first.allows(item, None, NOW + 86400)
+
+
+def test_daily_impressions_are_paced_over_the_day():
+    snap = snapshot(daily_impressions=1000)
+    item = snap.placements[("default", "top")].items[0]
+    pacing = controller(RedisBackend(FakeRedis()), snap)
+    midnight = (NOW // 86400) * 86400 - pacing.offset
+    early = midnight + 86400 * 0.0125  # 하루의 1.25% + slack 5% → 예산 62.5
+    served = 0
+    while pacing.allows(item, None, early) and served < 1000:
+        pacing.record_impression(item, None, early)
+        served += 1
+    assert served == 63
+
+
+def test_failed_sync_keeps_local_increments():
+    snap = snapshot(daily_clicks=2)
+    item = snap.placements[("default", "top")].items[0]
+    redis = FakeRedis()
+
+    class Down(RedisBackend):
+        def exchange(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+    pacing = controller(Down(redis), snap)
+    pacing.record_click("hero", NOW)
+    with pytest.raises(ConnectionError):
+        pacing.sync(NOW)
+    pacing.backend = RedisBackend(redis)
+    pacing.record_click("hero", NOW)
+    pacing.sync(NOW)
+    assert redis.data[f"adserver:pacing:click:hero:{pacing._day(NOW)}"] == b"2"
+    assert not pacing.allows(item, None, NOW)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# RESP 인코딩/디코딩
+# ═══════════════════════════════════════════════════════════════════════
+
+def encode_reply(value):
+    if isinstance(value, Exception):
+        return b"-%s\r\n" % str(value).encode()
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode_reply(v) for v in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def parse(data):
+    connection = RespConnection()
+    connection._file = io.BytesIO(data)
+    return connection._read()
+
+
+def test_resp_command_encoding_round_trips_binary_arguments():
+    command = ("BITFIELD", "key", "INCRBY", "u32", "#3", 7, b"\x00\r\n$*")
+    assert parse(RespConnection._encode(command)) == [
+        b"BITFIELD", b"key", b"INCRBY", b"u32", b"#3", b"7", b"\x00\r\n$*",
+    ]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (b"+OK\r\n", b"OK"),
+    (b":42\r\n", 42),
+    (b"$-1\r\n", None),
+    (b"*-1\r\n", None),
+    (b"$5\r\na\r\nbc\r\n", b"a\r\nbc"),
+    (b"*3\r\n:1\r\n$-1\r\n*1\r\n$1\r\nx\r\n", [1, None, [b"x"]]),
+])
+def test_resp_reply_parsing(raw, expected):
+    assert parse(raw) == expected
+
+
+def test_resp_error_and_closed_connection():
+    with pytest.raises(RuntimeError, match="WRONGTYPE"):
+        parse(b"-WRONGTYPE bad\r\n")
+    with pytest.raises(ConnectionError):
+        parse(b"")
+
+
+@pytest.fixture
+def resp_server():
+    """FakeRedis 로 응답하는 최소 RESP 서버 (받은 명령을 기록)."""
+    redis = FakeRedis()
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        conn, _ = listener.accept()
+        reader = RespConnection()
+        reader._file = conn.makefile("rb")
+        with conn:
+            while True:
+                try:
+                    command = [part.decode() for part in reader._read()]
+                except ConnectionError:
+                    return
+                if command[0] in ("AUTH", "SELECT"):
+                    redis.commands.append(tuple(command))
+                    conn.sendall(b"+OK\r\n")
+                    continue
+                try:
+                    reply = redis.pipeline([tuple(command)])[0]
+                except Exception as exc:
+                    reply = RuntimeError(f"ERR {exc}")
+                conn.sendall(encode_reply(reply))
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield redis, listener.getsockname()[1]
+    listener.close()
+
+
+def test_redis_backend_over_resp_socket(resp_server):
+    redis, port = resp_server
+    connection = RespConnection.from_url(f"redis://:s%40cret@127.0.0.1:{port}/2")
+    snap = snapshot(frequency_cap="1/24h", daily_clicks=1)
+    item = snap.placements[("default", "top")].items[0]
+    pacing = controller(RedisBackend(connection), snap)
+    pacing.record_impression(item, "alice", NOW)
+    pacing.record_click("hero", NOW)
+    pacing.sync(NOW)
+    connection.close()
+
+    assert redis.commands[:2] == [("AUTH", "s@cret"), ("SELECT", "2")]
+    # 소켓 너머에서 받아 온 전역 값으로 판정
+    assert not pacing.allows(item, "alice", NOW)
+    assert not pacing.allows(item, "bob", NOW)  # 일일 클릭 예산 소진
+    fresh = controller(RedisBackend(redis), snap)
+    # 스케치는 처음 판정할 때 생기고 그 다음 동기화부터 전역 값을 받음
+    assert fresh.allows(item, "alice", NOW)
+    fresh.sync(NOW)
+    assert not fresh.allows(item, "alice", NOW)
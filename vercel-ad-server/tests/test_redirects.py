@@ -0,0 +1,41 @@
+"""클릭 리다이렉트 테이블: 슬롯 조회, 404, werkzeug 와 같은 응답."""
+
+from werkzeug.utils import redirect
+
+from adserver.redirects import NOT_FOUND, prepare_redirect
+from adserver.snapshot import build_snapshot
+
+DOCUMENT = {
+    "top_banner": {"items": [
+        {"image_url": "https://img.example/a.png", "click_url": "https://example.com/a"},
+        {"image_url": "https://img.example/b.png", "click_url": "https://example.com/b"},
+    ]},
+    "tenants": {"acme": {"placements": {"top": {"items": [
+        {"image_url": "https://img.example/h.png", "click_url": "https://acme.example"},
+    ]}}}},
+}
+
+
+def test_lookup_by_tenant_position_and_index():
+    table = build_snapshot(DOCUMENT).redirects
+    assert dict(table.lookup("top", 1).headers)["Location"] == "https://example.com/b"
+    assert table.lookup("top", 1).item_id == "top-2"
+    acme = table.lookup("top", 0, "acme")
+    assert dict(acme.headers)["Location"] == "https://acme.example"
+
+
+def test_unknown_slots_share_the_404_response():
+    table = build_snapshot(DOCUMENT).redirects
+    assert table.lookup("top", 2) is NOT_FOUND
+    assert table.lookup("top", -1) is NOT_FOUND
+    assert table.lookup("missing", 0) is NOT_FOUND
+    assert table.lookup("top", 1, "acme") is NOT_FOUND
+
+
+def test_prepared_redirect_matches_werkzeug():
+    location = "https://example.com/검색?q=a&b=<c>"
+    prepared = prepare_redirect(location).to_response()
+    expected = redirect(location)
+    assert prepared.status_code == expected.status_code == 302
+    assert prepared.get_data() == expected.get_data()
+    assert prepared.headers["Location"] == "https://example.com/%EA%B2%80%EC%83%89?q=a&b=%3Cc%3E"
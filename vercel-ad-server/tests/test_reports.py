@@ -0,0 +1,69 @@
+"""리포트 컬럼 저장소: 행 검증, 범위 조회, group-by, 세그먼트 파일."""
+
+import pytest
+
+from adserver.reports import MAX_COUNT, EventStore, ReportError
+
+
+def test_query_groups_by_item_with_ctr():
+    store = EventStore()
+    store.append_many([
+        (100, "impression", "top-1", "top", 4, 0),
+        (110, "click", "top-1", "top", 1, 0),
+        (120, "view", "top-1", "top", 2, 1500),
+        (130, "impression", "top-2", "top", 3, 0),
+    ])
+    assert store.query() == [
+        {"item": "top-1", "impressions": 4, "clicks": 1, "views": 2, "view_ms": 1500, "ctr": 0.25},
+        {"item": "top-2", "impressions": 3, "clicks": 0, "views": 0, "view_ms": 0, "ctr": 0.0},
+    ]
+
+
+def test_unknown_kind_rejects_whole_batch():
+    store = EventStore()
+    with pytest.raises(ValueError):
+        store.append_many([(100, "impression", "top-1"), (101, "hover", "top-1")])
+    # 잘못된 행 앞의 행도 넣지 않아 컬럼 길이가 어긋나지 않음
+    assert store.rows == 0
+    assert store.version == 0
+
+
+def test_counts_are_clamped_to_column_range():
+    store = EventStore()
+    store.append_many([(100, "impression", "top-1", "top", -5, 0), (101, "impression", "top-2", "top", 2 ** 40, 0)])
+    rows = {row["item"]: row["impressions"] for row in store.query()}
+    assert rows == {"top-1": 0, "top-2": MAX_COUNT}
+
+
+def test_time_range_is_half_open():
+    store = EventStore()
+    store.append_many([(ts, "impression", "top-1") for ts in (100, 200, 300)])
+    assert store.query(start=200, end=300)[0]["impressions"] == 1
+    assert store.query(start=301) == []
+
+
+def test_filters_and_hourly_groups():
+    store = EventStore()
+    store.append_many([
+        (3600, "impression", "top-1", "top"),
+        (3700, "impression", "top-1", "bottom"),
+        (7300, "impression", "top-1", "top"),
+    ])
+    rows = store.query(group_by=("hour",), placement="top")
+    assert [(row["hour"], row["impressions"]) for row in rows] == [(3600, 1), (7200, 1)]
+    assert store.query(item="missing") == []
+    with pytest.raises(ReportError):
+        store.query(group_by=("country",))
+
+
+def test_sealed_segments_reload_from_directory(tmp_path):
+    store = EventStore(directory=str(tmp_path), segment_rows=2)
+    store.append_many([(ts, "click", "top-1", "top") for ts in range(5)])
+    store.flush()
+    assert len(list(tmp_path.glob("segment-*.col"))) == 3
+
+    reopened = EventStore(directory=str(tmp_path))
+    assert reopened.rows == 5
+    assert reopened.query(start=1, end=4) == [
+        {"item": "top-1", "impressions": 0, "clicks": 3, "views": 0, "view_ms": 0, "ctr": None},
+    ]
@@ -0,0 +1,55 @@
+"""미리 인코딩한 응답: ETag/304, 인코딩 협상, 1칸 캐시."""
+
+import gzip
+
+import pytest
+
+from adserver.responses import MIN_COMPRESS_SIZE, EncodedPayload, PayloadCache, dump_json
+
+BODY = dump_json({"items": ["x" * MIN_COMPRESS_SIZE]})
+
+
+def test_matching_etag_answers_304_without_body():
+    payload = EncodedPayload(BODY)
+    status, body, headers = payload.negotiate(f'"{payload.etag}"', "gzip")
+    assert (status, body) == (304, b"")
+    assert ("ETag", f'"{payload.etag}"') in headers
+    assert ("Vary", "Accept-Encoding") in headers
+
+
+@pytest.mark.parametrize("if_none_match", ["*", 'W/"{etag}"', '"other", "{etag}-gzip"'])
+def test_if_none_match_forms(if_none_match):
+    payload = EncodedPayload(BODY)
+    assert payload.matches(if_none_match.format(etag=payload.etag))
+
+
+def test_gzip_is_negotiated_with_its_own_etag():
+    payload = EncodedPayload(BODY)
+    status, body, headers = payload.negotiate(None, "deflate, gzip;q=0.5")
+    assert status == 200
+    assert gzip.decompress(body) == BODY
+    assert dict(headers)["ETag"] == f'"{payload.etag}-gzip"'
+    assert dict(headers)["Content-Encoding"] == "gzip"
+    # q=0 은 거절
+    assert payload.choose_encoding("gzip;q=0") == "identity"
+
+
+def test_small_bodies_are_not_compressed():
+    payload = EncodedPayload(b'{"ok":true}\n')
+    status, body, headers = payload.negotiate(None, "gzip, br")
+    assert body == b'{"ok":true}\n'
+    assert "Content-Encoding" not in dict(headers) and "Vary" not in dict(headers)
+
+
+def test_cache_renders_once_per_key():
+    calls = []
+
+    def render(key):
+        calls.append(key)
+        return dump_json({"key": key})
+
+    cache = PayloadCache(render)
+    first = cache.get(("snapshot", 1))
+    assert cache.get(("snapshot", 1)) is first
+    assert cache.get(("snapshot", 2)) is not first
+    assert calls == [("snapshot", 1), ("snapshot", 2)]
@@ -0,0 +1,59 @@
+"""별칭 테이블 로테이션과 가중치 검증."""
+
+import pytest
+
+from adserver.rotation import AliasTable, BannerRotation
+from adserver.snapshot import SnapshotHolder, build_snapshot
+from adserver.stores import EnvStore
+
+
+def item(name, **fields):
+    return {"id": name, "image_url": f"https://img.example/{name}.png", "click_url": "https://example.com", **fields}
+
+
+def banner(*items):
+    return build_snapshot({"top_banner": {"enabled": True, "items": list(items)}}).placements[("default", "top")]
+
+
+def test_alias_table_matches_weights():
+    table = AliasTable(["a", "b", "c"], [1, 2, 5])
+    # 균등 격자의 난수로 뽑으면 각 값의 비율이 가중치 비율과 같음
+    steps = 8000
+    counts = {"a": 0, "b": 0, "c": 0}
+    for step in range(steps):
+        counts[table.pick(lambda: (step + 0.5) / steps)] += 1
+    assert counts == {"a": 1000, "b": 2000, "c": 5000}
+
+
+def test_zero_weight_items_are_never_selected():
+    rotation = BannerRotation(banner(item("a", weight=0), item("b")), generation=1)
+    assert [candidate.id for candidate in rotation.candidates] == ["b"]
+    assert {rotation.select(0).id for _ in range(20)} == {"b"}
+
+
+def test_schedule_segments_switch_at_edges():
+    rotation = BannerRotation(banner(item("a", end=100), item("b", start=100)), generation=1)
+    assert rotation.select(99).id == "a"
+    assert rotation.select(100).id == "b"
+
+
+@pytest.mark.parametrize("weight", ["inf", "nan", "-1", -0.5, "heavy"])
+def test_invalid_weight_fails_snapshot_build(weight):
+    with pytest.raises(ValueError):
+        banner(item("a", weight=weight))
+
+
+def test_env_store_with_invalid_weight_keeps_previous_generation():
+    environ = {"TOP_BANNER_IMG_1": "https://img.example/a.png", "TOP_BANNER_WEIGHT_1": "2"}
+    holder = SnapshotHolder(EnvStore(environ))
+    before = holder.current()
+    environ["TOP_BANNER_WEIGHT_1"] = "inf"
+    with pytest.raises(ValueError):
+        holder.refresh()
+    assert holder.current() is before
+    assert before.placements[("default", "top")].items[0].weight == 2.0
+
+
+def test_default_weight_is_one():
+    weights = [entry.weight for entry in banner(item("a"), item("b", weight="")).items]
+    assert weights == [1.0, 1.0]
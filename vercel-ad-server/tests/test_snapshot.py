@@ -0,0 +1,57 @@
+"""불변 설정 스냅샷: 내용 버전, 세대 교체, 불변성."""
+
+import pytest
+
+from adserver.snapshot import SnapshotHolder, build_snapshot
+from adserver.stores import JsonFileStore
+
+DOCUMENT = {
+    "top_banner": {"enabled": True, "items": [
+        {"image_url": "https://img.example/a.png", "click_url": "https://example.com/a"},
+        {"image_url": "https://img.example/off.png", "enabled": False},
+        {"image_url": "https://img.example/b.png", "click_url": "https://example.com/b", "weight": 2},
+    ]},
+}
+
+
+def test_version_depends_on_content_only():
+    first = build_snapshot(DOCUMENT, generation=1, fingerprint="x")
+    second = build_snapshot(DOCUMENT, generation=2, fingerprint="y")
+    assert first.version == second.version
+    changed = {"top_banner": {"enabled": True, "items": [DOCUMENT["top_banner"]["items"][0]]}}
+    assert build_snapshot(changed).version != first.version
+
+
+def test_disabled_items_are_dropped_and_reindexed():
+    banner = build_snapshot(DOCUMENT).banner("top")
+    assert [(item.id, item.index) for item in banner.items] == [("top-1", 0), ("top-2", 1)]
+    assert banner.tracking_url(banner.items[1]) == "/click/top/1"
+
+
+def test_empty_default_positions_fall_back_to_placeholder():
+    bottom = build_snapshot(DOCUMENT).banner("bottom")
+    assert len(bottom.items) == 1
+    assert "placeholder" in bottom.items[0].image_url
+
+
+def test_snapshot_is_immutable():
+    snapshot = build_snapshot(DOCUMENT)
+    with pytest.raises(AttributeError):
+        snapshot.generation = 5
+    with pytest.raises(AttributeError):
+        snapshot.banner("top").items[0].weight = 3
+
+
+def test_holder_rebuilds_only_when_fingerprint_changes(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"top_banner": {"items": []}}')
+    holder = SnapshotHolder(JsonFileStore(str(path)))
+    seen = []
+    holder.subscribe(seen.append)
+    first = holder.current()
+    assert holder.refresh() is first
+    path.write_text('{"top_banner": {"items": [{"image_url": "https://img.example/new.png"}]}}')
+    second = holder.refresh()
+    assert second.generation == first.generation + 1
+    assert seen == [second]
+    assert second.banner("top").items[0].image_url == "https://img.example/new.png"
@@ -0,0 +1,83 @@
+"""타기팅 규칙 파싱과 비트셋 매처 (규칙을 하나씩 평가한 결과와 비교)."""
+
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from adserver.targeting import (
+    TargetingContext,
+    TargetingError,
+    TargetingMatcher,
+    _hour_set,
+    format_rules,
+    parse_rules,
+    parse_version,
+)
+
+RULES = [
+    "",
+    "os in ios,android",
+    "os not in ios; country == KR",
+    "version >= 2.1; version < 3",
+    "version in 1.0,2.5",
+    "version != 2.5; locale in ko",
+    "hour in 22-6",
+    "hour not in 9-18; country != jp",
+]
+
+
+def accepts(rule, context):
+    """규칙 하나를 직접 평가합니다 (매처와 비교용)."""
+    value = getattr(context, rule.attribute)
+    if rule.attribute == "hour":
+        inside = value in _hour_set(rule.values)
+        return inside if rule.op == "in" else not inside
+    if value is None:
+        # 버전을 모르면 버전 규칙이 있는 소재는 모두 제외, 다른 속성은 'not in' 만 통과
+        return rule.attribute != "version" and rule.op == "not in"
+    if rule.op in ("in", "not in"):
+        return (value in rule.values) == (rule.op == "in")
+    bound = rule.values[0]
+    return {">=": value >= bound, ">": value > bound, "<=": value <= bound, "<": value < bound}[rule.op]
+
+
+def test_version_parsing_ignores_trailing_zeros_and_suffixes():
+    assert parse_version("v2.10.0") == (2, 10)
+    assert parse_version("3.1-beta") == (3, 1)
+    with pytest.raises(TargetingError):
+        parse_version("beta")
+
+
+@pytest.mark.parametrize("rules", ["browser in chrome", "os >= ios", "hour in 25", "os in"])
+def test_invalid_rules_are_rejected(rules):
+    with pytest.raises(TargetingError):
+        parse_rules(rules)
+
+
+def test_rules_round_trip_through_format():
+    rules = parse_rules("os == iOS; version >= 2.1; hour in 22-6")
+    assert format_rules(rules) == "os in ios; version >= 2.1; hour in 22-6"
+    assert format_rules(parse_rules(format_rules(rules))) == format_rules(rules)
+
+
+def test_matcher_agrees_with_rule_by_rule_evaluation():
+    items = [SimpleNamespace(targeting=parse_rules(rules)) for rules in RULES]
+    matcher = TargetingMatcher(items)
+    contexts = itertools.product(
+        (None, "ios", "android", "web"), (None, "kr", "jp"), (None, "ko"),
+        (None, "1.0", "2.0.9", "2.1", "2.5", "3.0", "4"), (0, 7, 12, 23),
+    )
+    for os, country, locale, version, hour in contexts:
+        context = TargetingContext(os=os, country=country, locale=locale, version=version, hour=hour)
+        expected = 0
+        for bit, item in enumerate(items):
+            if all(accepts(rule, context) for rule in item.targeting):
+                expected |= 1 << bit
+        assert matcher.match(context) == expected, (os, country, locale, version, hour)
+
+
+def test_items_without_rules_make_a_trivial_matcher():
+    matcher = TargetingMatcher([SimpleNamespace(targeting=()), SimpleNamespace(targeting=())])
+    assert matcher.trivial
+    assert matcher.match(TargetingContext(hour=0)) == 0b11